@@ -0,0 +1,53 @@
+"""
+Compare the ``area`` and ``volume`` of a deforming sphere with those of a
+new vtkMassProperties at each step, and the area of a sphere whose face
+geometry is cached by its normals.
+
+Usage::
+
+    python benchmarks/bench_area.py [n] [steps]
+
+where ``n`` is the resolution of the sphere and ``steps`` the number of
+deformations.
+"""
+import sys
+import timeit
+
+import vtk
+
+import vtki
+
+
+def deform(mesh, steps, measure):
+    """Scale the points of ``mesh`` at each step and measure it"""
+    points = mesh.points.copy()
+    for i in range(steps):
+        mesh.points = points * (1 + 0.01 * i)
+        measure(mesh)
+
+
+def mass_properties(mesh):
+    mprop = vtk.vtkMassProperties()
+    mprop.SetInputData(mesh)
+    mprop.Update()
+    return mprop.GetSurfaceArea(), mprop.GetVolume()
+
+
+def main(n=300, steps=20, repeat=3):
+    sphere = vtki.Sphere(theta_resolution=n, phi_resolution=n)
+    print('Area and volume of a sphere of {} cells over {} deformations '
+          '(best of {})'.format(sphere.n_cells, steps, repeat))
+    measures = [('vtkMassProperties', mass_properties),
+                ('area, volume', lambda mesh: (mesh.area, mesh.volume))]
+    for name, measure in measures:
+        mesh = sphere.copy()
+        time = min(timeit.repeat(lambda: deform(mesh, steps, measure),
+                                 number=1, repeat=repeat))
+        print('{:>20}: {:8.4f} s'.format(name, time))
+    sphere.point_normals
+    time = min(timeit.repeat(lambda: sphere.area, number=1, repeat=repeat))
+    print('{:>20}: {:8.4f} s'.format('cached area', time))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
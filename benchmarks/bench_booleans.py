@@ -0,0 +1,41 @@
+"""
+Compare the boolean operations of ``PolyData`` with and without culling the
+cells of each mesh away from the other mesh, for a small sphere cutting the
+surface of a large sphere.
+
+Usage::
+
+    python benchmarks/bench_booleans.py [n]
+
+where ``n`` is the resolution of the large sphere.
+"""
+import sys
+import timeit
+
+import vtki
+from vtki.pointset import _boolean_operation, _run_boolean
+
+
+def make_spheres(n):
+    """Create a large sphere of resolution ``n`` and a small sphere on its
+    surface"""
+    large = vtki.Sphere(5.0, theta_resolution=n, phi_resolution=n)
+    small = vtki.Sphere(0.6, center=(0.0, 0.0, 5.0))
+    return large, small
+
+
+def main(n=300, repeat=3):
+    large, small = make_spheres(n)
+    print('Boolean operations of a sphere of {} cells and a sphere of {} cells '
+          '(best of {})'.format(large.n_cells, small.n_cells, repeat))
+    for operation in ['union', 'intersection', 'difference']:
+        whole = lambda: _run_boolean(large, small, operation, None)
+        culled = lambda: _boolean_operation(large, small, operation)
+        whole_time = min(timeit.repeat(whole, number=1, repeat=repeat))
+        culled_time = min(timeit.repeat(culled, number=1, repeat=repeat))
+        print('{:>12}: whole {:8.4f} s  culled {:8.4f} s  speedup {:5.2f}'.format(
+            operation, whole_time, culled_time, whole_time / culled_time))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,71 @@
+"""
+Compare the NumPy implementations of ``DataSetFilters.compute_cell_sizes``
+and ``DataSetFilters.cell_centers`` for linear cells against the VTK filters.
+
+Usage::
+
+    python benchmarks/bench_cell_sizes.py [n]
+
+where ``n`` is the number of points along each axis of the synthetic grids.
+"""
+import sys
+import timeit
+
+import vtk
+
+import vtki
+from vtki import examples
+from vtki.filters import _get_output, _to_point_set
+
+
+def make_meshes(n):
+    """Create the hexbeam example and large synthetic meshes of hexahedra,
+    tetrahedra, and triangles"""
+    image = vtki.UniformGrid((n, n, n))
+    append = vtk.vtkAppendFilter()
+    append.AddInputData(_to_point_set(image))
+    append.Update()
+    hexes = _get_output(append)
+    tetra = vtk.vtkDataSetTriangleFilter()
+    tetra.SetInputData(hexes)
+    tetra.Update()
+    sphere = vtki.Sphere(theta_resolution=4*n, phi_resolution=4*n)
+    return [('hexbeam', examples.load_hexbeam()),
+            ('hexahedra', hexes),
+            ('tetrahedra', _get_output(tetra)),
+            ('triangles', sphere)]
+
+
+def vtk_cell_sizes(dataset):
+    alg = vtk.vtkCellSizeFilter()
+    alg.SetInputDataObject(dataset)
+    alg.SetComputeVertexCount(False)
+    alg.Update()
+    return alg.GetOutput()
+
+
+def vtk_cell_centers(dataset):
+    alg = vtk.vtkCellCenters()
+    alg.SetInputDataObject(dataset)
+    alg.SetVertexCells(True)
+    alg.Update()
+    return alg.GetOutput()
+
+
+def main(n=64, repeat=3):
+    print('Cell sizes and centers of {0}x{0}x{0} grids (best of {1})'.format(n, repeat))
+    for name, mesh in make_meshes(n):
+        timings = [
+            ('sizes', 'vtk', lambda: vtk_cell_sizes(mesh)),
+            ('sizes', 'numpy', lambda: mesh.compute_cell_sizes()),
+            ('centers', 'vtk', lambda: vtk_cell_centers(mesh)),
+            ('centers', 'numpy', lambda: mesh.cell_centers()),
+        ]
+        for task, method, func in timings:
+            best = min(timeit.repeat(func, number=1, repeat=repeat))
+            print('{:>11} {:>9} cells {:>8} {:>6}: {:8.4f} s'.format(
+                name, mesh.n_cells, task, method, best))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,52 @@
+"""
+Compare the contouring algorithms available to ``DataSetFilters.contour`` on
+each of the structured dataset types.
+
+Usage::
+
+    python benchmarks/bench_contour.py [n]
+
+where ``n`` is the number of points along each axis of the volumes.
+"""
+import sys
+import timeit
+
+import numpy as np
+
+import vtki
+
+
+def make_volumes(n):
+    """Create a UniformGrid, RectilinearGrid, and StructuredGrid of the same
+    ``n`` by ``n`` by ``n`` volume with a smooth scalar field"""
+    x = np.linspace(-1.0, 1.0, n)
+    xx, yy, zz = np.meshgrid(x, x, x, indexing='ij')
+    image = vtki.UniformGrid((n, n, n), (2.0/(n-1),)*3, (-1.0, -1.0, -1.0))
+    rect = vtki.RectilinearGrid(x, x, x)
+    struct = vtki.StructuredGrid(xx, yy, zz)
+    volumes = [image, rect, struct]
+    # VTK orders the points with X varying fastest
+    values = (np.sin(3*xx) * np.cos(3*yy) + zz**2).ravel(order='F')
+    for grid in volumes:
+        grid.point_arrays['values'] = values
+        grid.set_active_scalar('values')
+    return volumes
+
+
+def main(n=128, repeat=3):
+    methods = [None, 'flying_edges', 'synchronized_templates', 'generic']
+    print('Contouring 10 isosurfaces of {0}x{0}x{0} volumes (best of {1})'.format(n, repeat))
+    for grid in make_volumes(n):
+        for method in methods:
+            func = lambda: grid.contour(isosurfaces=10, method=method)
+            try:
+                func()
+            except TypeError:
+                continue # not supported for this dataset type
+            best = min(timeit.repeat(func, number=1, repeat=repeat))
+            print('{:>16} {:>24}: {:8.4f} s'.format(type(grid).__name__,
+                                                   method or 'auto', best))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
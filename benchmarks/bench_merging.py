@@ -0,0 +1,50 @@
+"""
+Compare ``PolyData.clean`` merging points within a tolerance with
+vtkCleanPolyData, for a sphere whose points are close to each other, and
+merge dense random points.
+
+Usage::
+
+    python benchmarks/bench_merging.py [n] [points]
+
+where ``n`` is the resolution of the sphere and ``points`` the number of
+random points.
+"""
+import sys
+import timeit
+
+import numpy as np
+import vtk
+
+import vtki
+
+
+def clean_polydata(mesh, tolerance):
+    clean = vtk.vtkCleanPolyData()
+    clean.SetInputData(mesh)
+    clean.ToleranceIsAbsoluteOn()
+    clean.SetAbsoluteTolerance(tolerance)
+    clean.Update()
+    return clean.GetOutput()
+
+
+def main(n=300, n_points=100000, repeat=3):
+    sphere = vtki.Sphere(theta_resolution=n, phi_resolution=n)
+    print('Clean a sphere of {} points (best of {})'.format(sphere.n_points, repeat))
+    for tolerance in [0.002, 0.005, 0.01]:
+        for name, clean in [('vtkCleanPolyData', clean_polydata),
+                            ('clean', lambda mesh, tol: mesh.clean(merge_tol=tol,
+                                                                   inplace=False))]:
+            time = min(timeit.repeat(lambda: clean(sphere, tolerance),
+                                     number=1, repeat=repeat))
+            print('{:>20} {:6.3f}: {:8.4f} s  {} points'.format(
+                name, tolerance, time, clean(sphere, tolerance).GetNumberOfPoints()))
+    points = vtki.PolyData(np.random.rand(n_points, 3) * 0.05)
+    time = min(timeit.repeat(lambda: vtki.merge_points(points, 0.01),
+                             number=1, repeat=repeat))
+    print('Merge {} points in a cube of 0.05 within 0.01: {:8.4f} s'.format(
+        n_points, time))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,60 @@
+"""
+Measure the scaling of ``DataSetFilters.contour`` and ``DataSetFilters.slice``
+with the number of threads set by ``vtki.set_num_threads``.
+
+Usage::
+
+    python benchmarks/bench_threads.py [n]
+
+where ``n`` is the number of points along each axis of the synthetic grid.
+"""
+import multiprocessing
+import sys
+import timeit
+
+import numpy as np
+
+import vtki
+
+
+def make_grid(n):
+    """Create an ``n**3`` uniform grid with a smooth scalar field"""
+    grid = vtki.UniformGrid((n, n, n))
+    x, y, z = np.meshgrid(*[np.linspace(-1, 1, n)]*3, indexing='ij')
+    field = np.sin(3*x) * np.cos(3*y) + z**2
+    grid.point_arrays['field'] = field.ravel(order='F')
+    grid.set_active_scalar('field')
+    return grid
+
+
+def thread_counts():
+    """Powers of two up to the number of processors"""
+    counts = [1]
+    while counts[-1] * 2 <= multiprocessing.cpu_count():
+        counts.append(counts[-1] * 2)
+    if counts[-1] != multiprocessing.cpu_count():
+        counts.append(multiprocessing.cpu_count())
+    return counts
+
+
+def main(n=128, repeat=3):
+    grid = make_grid(n)
+    print('SMP backend: {}'.format(vtki.get_smp_backend()))
+    print('Contour and slice of a {0}x{0}x{0} grid (best of {1})'.format(n, repeat))
+    tasks = [
+        ('contour', lambda: grid.contour([0.0, 0.5, 1.0])),
+        ('slice', lambda: grid.slice_orthogonal()),
+    ]
+    for name, func in tasks:
+        serial = None
+        for n_threads in thread_counts():
+            with vtki.num_threads(n_threads):
+                best = min(timeit.repeat(func, number=1, repeat=repeat))
+            if serial is None:
+                serial = best
+            print('{:>8} {:>3} threads: {:8.4f} s  speedup {:5.2f}'.format(
+                name, n_threads, best, serial / best))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -1,3 +1,4 @@
+import gc
 import sys
 import vtk
 import pytest
@@ -405,3 +406,72 @@ def test_axis_rotation_not_in_place():
     p = np.eye(3)
     p_out = vtki.common.axis_rotation(p, 1, False, axis='x')
     assert not np.allclose(p, p_out)
+
+
+def test_get_data_percentile():
+    data = examples.load_uniform()
+    arr = data.point_arrays['Spatial Point Data']
+    percents = [0, 10, 50, 99]
+    values = data.get_data_percentile(percents, arr='Spatial Point Data',
+                                      preference='point')
+    assert np.allclose(values, np.percentile(arr, percents))
+    median = data.get_data_percentile(50, exact=False)
+    assert abs(median - np.median(arr)) < 0.05 * np.ptp(arr)
+    # the sketch is reused until the array is modified
+    sketch, _ = vtki.sketch.sketch_arrays(data, 'Spatial Point Data', 'point')
+    assert vtki.sketch.sketch_arrays(data, 'Spatial Point Data', 'point')[0] is sketch
+    data.GetPointData().GetArray('Spatial Point Data').Modified()
+    assert vtki.sketch.sketch_arrays(data, 'Spatial Point Data', 'point')[0] is not sketch
+
+
+def test_quantile_sketch_merge():
+    values = np.random.RandomState(0).lognormal(size=100000)
+    sketch = vtki.QuantileSketch(k=256).update(values[:60000])
+    sketch.merge(vtki.QuantileSketch(k=256).update(values[60000:]))
+    assert sketch.n == values.size
+    ranks = np.searchsorted(np.sort(values), sketch.quantile([0.1, 0.5, 0.9]))
+    assert np.allclose(ranks / float(values.size), [0.1, 0.5, 0.9], atol=sketch.rank_error)
+
+
+@pytest.mark.parametrize('dataset', [examples.load_uniform(), grid,
+                                     vtki.PolyData(np.random.rand(100, 3))])
+def test_find_closest_point(dataset):
+    points = np.array([dataset.GetPoint(i) for i in range(dataset.n_points)])
+    bounds = np.array(dataset.bounds).reshape(3, 2)
+    query = bounds[:, 0] + np.random.rand(50, 3) * (bounds[:, 1] - bounds[:, 0])
+    index = dataset.find_closest_point(query)
+    dist = np.linalg.norm(points[None] - query[:, None], axis=2)
+    assert np.allclose(dist[np.arange(50), index], dist.min(axis=1))
+    assert dataset.find_closest_point(points[7]) == 7
+    near = dataset.points_within_radius(query[0], 0.5 * dist[0].max())
+    assert np.array_equal(np.sort(near), np.nonzero(dist[0] <= 0.5 * dist[0].max())[0])
+
+
+def test_locator_cache():
+    poly = vtki.PolyData(np.random.rand(10, 3))
+    locator = poly._get_locator('point')
+    assert poly._get_locator('point') is locator
+    # adding data does not rebuild the locator
+    poly.point_arrays['data'] = np.arange(10)
+    assert poly._get_locator('point') is locator
+    poly.points[:] += 5
+    poly.GetPoints().Modified()
+    assert poly._get_locator('point') is not locator
+    assert poly.find_closest_point(poly.points[3]) == 3
+    # the locators do not keep the dataset alive
+    sphere = vtki.Sphere()
+    deleted = []
+    sphere.AddObserver('DeleteEvent', lambda *args: deleted.append(True))
+    sphere._get_locator('cell')
+    sphere.obbTree
+    sphere.find_closest_point([0, 0, 0])
+    del sphere
+    gc.collect()
+    assert deleted
+
+
+def test_find_containing_cell():
+    data = examples.load_uniform()
+    centers = vtki.filters._cell_centers(data)
+    assert np.array_equal(data.find_containing_cell(centers), np.arange(data.n_cells))
+    assert data.find_containing_cell([1e6, 1e6, 1e6]) == -1
@@ -157,3 +157,22 @@ def test_combine_filter():
     # Now apply the geometry filter to combine a plethora of data blocks
     geom = multi.combine()
     assert isinstance(geom, vtki.UnstructuredGrid)
+
+
+def test_combine_merge_points():
+    beam = ex.load_hexbeam()
+    multi = vtki.MultiBlock([beam, beam.copy()])
+    assert multi.combine().n_points == 2 * beam.n_points
+    merged = multi.combine(merge_points=True)
+    assert merged.n_points == beam.n_points
+    assert merged.n_cells == 2 * beam.n_cells
+
+
+def test_multi_block_percentile():
+    first, second = ex.load_uniform(), ex.load_uniform()
+    second.point_arrays['Spatial Point Data'] = 2.0 * second.point_arrays['Spatial Point Data']
+    multi = vtki.MultiBlock([first, second])
+    arr = np.concatenate([first.point_arrays['Spatial Point Data'],
+                          second.point_arrays['Spatial Point Data']])
+    value = multi.get_data_percentile(75, 'Spatial Point Data', preference='point')
+    assert np.allclose(value, np.percentile(arr, 75))
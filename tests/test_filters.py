@@ -1,4 +1,8 @@
+import os
+
+import numpy as np
 import pytest
+import vtk
 
 import vtki
 from vtki import examples
@@ -29,6 +33,41 @@ def test_clip_box():
         assert clp is not None
         assert isinstance(clp, vtki.UnstructuredGrid)
 
+def test_clip_methods():
+    dataset = examples.load_hexbeam()
+    def volume(grid):
+        return grid.compute_cell_sizes().cell_arrays['Volume'].sum()
+    for invert in [True, False]:
+        generic = dataset.clip(invert=invert, method='generic')
+        table = dataset.clip(invert=invert, method='table')
+        assert np.allclose(volume(generic), volume(table))
+        generic = dataset.clip_box(invert=invert, method='generic')
+        table = dataset.clip_box(invert=invert, method='table')
+        assert np.allclose(volume(generic), volume(table))
+        assert table.scalar_names == generic.scalar_names
+    with pytest.raises(RuntimeError):
+        dataset.clip(method='foo')
+    with pytest.raises(RuntimeError):
+        dataset.clip_box(method='foo')
+
+def test_clip_whole_cells():
+    dataset = examples.load_uniform()
+    clp = dataset.clip(normal='x', invert=True, whole_cells=True)
+    assert isinstance(clp, vtki.UnstructuredGrid)
+    assert clp.n_cells == 405
+    assert clp.bounds[1] <= dataset.center[0] + 1
+    assert clp.scalar_names == dataset.scalar_names
+    box = dataset.clip_box(bounds=[0, 4.2, 0, 4.2, 0, 4.2], invert=False,
+                           whole_cells=True)
+    assert box.n_cells == 4**3
+    box = dataset.clip_box(bounds=[0, 4.2, 0, 4.2, 0, 4.2], invert=True,
+                           whole_cells=True)
+    assert box.n_cells == dataset.n_cells - 4**3
+    with pytest.raises(RuntimeError):
+        dataset.clip(method='foo', whole_cells=True)
+    with pytest.raises(RuntimeError):
+        dataset.clip_box(method='foo', whole_cells=True)
+
 def test_slice_filter():
     """This tests the slice filter on all datatypes avaialble filters"""
     for i, dataset in enumerate(datasets):
@@ -61,6 +100,24 @@ def test_slice_along_axis():
         for slc in slices:
             assert isinstance(slc, vtki.PolyData)
 
+def test_slice_along_axis_single_pass():
+    """Each block of the single pass slices should match slicing separately"""
+    for dataset in datasets:
+        n = 5
+        slices = dataset.slice_along_axis(n=n, axis='z')
+        bounds = dataset.bounds
+        tolerance = (bounds[5] - bounds[4]) * 0.01
+        rng = np.linspace(bounds[4] + tolerance, bounds[5] - tolerance, n)
+        for i in range(n):
+            origin = list(dataset.center)
+            origin[2] = rng[i]
+            slc = dataset.slice(normal='z', origin=origin)
+            assert slices[i].n_cells == slc.n_cells
+            assert slices[i].n_points == slc.n_points
+            assert np.allclose(slices[i].bounds, slc.bounds)
+            assert np.isclose(slices[i].area, slc.area)
+            assert slices[i].scalar_names == slc.scalar_names
+
 def test_threshold():
     for i, dataset in enumerate(datasets[0:3]):
         thresh = dataset.threshold()
@@ -85,6 +142,37 @@ def test_threshold():
             assert isinstance(thresh, vtki.UnstructuredGrid)
 
 
+def test_threshold_cell_data():
+    dataset = examples.load_hexbeam()
+    arr = dataset.cell_arrays['sample_cell_scalars']
+    thresh = dataset.threshold([10, 30], scalars='sample_cell_scalars')
+    assert isinstance(thresh, vtki.UnstructuredGrid)
+    assert thresh.n_cells == np.sum((arr >= 10) & (arr <= 30))
+    assert np.all(thresh.cell_arrays['sample_cell_scalars'] >= 10)
+    assert thresh.active_scalar_name == dataset.active_scalar_name
+    thresh = dataset.threshold([10, 30], scalars='sample_cell_scalars', invert=True)
+    assert thresh.n_cells == np.sum((arr <= 10) | (arr >= 30))
+    # unused points are removed
+    assert thresh.n_points == np.unique(thresh.cells.reshape(-1, 9)[:, 1:]).size
+
+
+def test_threshold_blank():
+    dataset = examples.load_uniform()
+    arr = dataset.cell_arrays['Spatial Cell Data']
+    blanked = dataset.threshold(500, scalars='Spatial Cell Data', blank=True)
+    assert isinstance(blanked, vtki.StructuredGrid)
+    assert blanked.n_cells == dataset.n_cells
+    assert blanked.HasAnyBlankCells()
+    assert blanked.GetPoint(1) == dataset.GetPoint(1)
+    ghosts = blanked.cell_arrays['vtkGhostType']
+    assert np.all((ghosts != 0) == (arr < 500))
+    assert 'vtkGhostType' not in dataset.scalar_names
+    with pytest.raises(TypeError):
+        examples.load_hexbeam().threshold(scalars='sample_cell_scalars', blank=True)
+    with pytest.raises(AssertionError):
+        dataset.threshold(blank=True, scalars='Spatial Point Data')
+
+
 def test_threshold_percent():
     percents = [25, 50, [18.0, 85.0], [19.0, 80.0], 0.70]
     inverts = [False, True, False, True, False]
@@ -95,6 +183,18 @@ def test_threshold_percent():
         assert isinstance(thresh, vtki.UnstructuredGrid)
 
 
+def test_threshold_percentile():
+    dataset = examples.load_uniform()
+    arr = dataset.cell_arrays['Spatial Cell Data']
+    thresh = dataset.threshold_percent([10, 60], scalars='Spatial Cell Data',
+                                       percentile=True)
+    low, high = np.percentile(arr, [10, 60])
+    assert thresh.n_cells == np.sum((arr >= low) & (arr <= high))
+    thresh = dataset.threshold_percent(0.9, scalars='Spatial Cell Data',
+                                       percentile=True, exact=False)
+    assert thresh.n_cells == np.sum(arr >= np.percentile(arr, 90))
+
+
 def test_outline():
     for i, dataset in enumerate(datasets):
         outline = dataset.outline()
@@ -129,6 +229,19 @@ def test_contour():
     assert iso is not None
 
 
+def test_contour_method():
+    dataset = examples.load_uniform()
+    for method in [None, 'flying_edges', 'synchronized_templates', 'generic']:
+        iso = dataset.contour(isosurfaces=[100, 300, 500], method=method)
+        assert isinstance(iso, vtki.PolyData)
+        assert iso.n_cells > 0
+        assert 'Spatial Point Data' in iso.scalar_names
+    with pytest.raises(TypeError):
+        examples.load_hexbeam().contour(method='flying_edges')
+    with pytest.raises(RuntimeError):
+        dataset.contour(method='foo')
+
+
 def test_elevation():
     dataset = examples.load_uniform()
     # Test default params
@@ -186,3 +299,154 @@ def test_compute_cell_sizes():
         assert isinstance(result, type(dataset))
         assert 'Area' in result.scalar_names
         assert 'Volume' in result.scalar_names
+
+
+def test_filter_cache():
+    dataset = examples.load_uniform()
+    vtki.filter_cache.enable()
+    try:
+        slc = dataset.slice(normal='z')
+        again = dataset.slice(normal='z')
+        assert vtki.filter_cache.stats['misses'] == 1
+        assert vtki.filter_cache.stats['hits'] == 1
+        assert again.n_cells == slc.n_cells
+        # different parameters are a miss
+        dataset.slice(normal='x')
+        assert vtki.filter_cache.stats['misses'] == 2
+        # modifying the dataset invalidates its entries
+        dataset.Modified()
+        dataset.slice(normal='z')
+        assert vtki.filter_cache.stats['misses'] == 3
+        dataset.compute_cell_sizes()
+        dataset.compute_cell_sizes()
+        assert vtki.filter_cache.stats['hits'] == 2
+        # streamed outputs are not held by the cache
+        n_entries = len(vtki.filter_cache)
+        dataset.stream('contour', n_pieces=2)
+        assert len(vtki.filter_cache) == n_entries
+        # the byte budget is respected
+        vtki.filter_cache.enable(max_bytes=0)
+        assert len(vtki.filter_cache) == 0
+        dataset.contour()
+        assert len(vtki.filter_cache) == 0
+    finally:
+        vtki.filter_cache.disable()
+    assert vtki.filter_cache.stats['n_entries'] == 0
+
+
+def test_sample():
+    source = examples.load_hexbeam()
+    source.point_arrays['linear'] = source.points.dot([1.0, 2.0, 3.0])
+    source.cell_arrays['cell_ids'] = np.arange(source.n_cells, dtype=float)
+    # a line of points through the beam and one point outside of it
+    points = np.zeros((51, 3))
+    points[:, 0] = 0.3
+    points[:, 1] = 0.7
+    points[:-1, 2] = np.linspace(0.05, 4.95, 50)
+    points[-1] = [100, 100, 100]
+    result = source.sample(points, chunk_size=10)
+    assert isinstance(result, vtki.PolyData)
+    mask = result.point_arrays['vtkValidPointMask'].astype(bool)
+    assert np.all(mask[:-1]) and not mask[-1]
+    assert np.allclose(result.point_arrays['linear'][mask], points[mask].dot([1.0, 2.0, 3.0]))
+    cells = result.point_arrays['cell_ids'][mask]
+    assert np.allclose(cells, source.find_containing_cell(points[mask]))
+    # onto a grid
+    grid = vtki.UniformGrid((5, 5, 20), (0.25, 0.25, 0.25))
+    result = source.sample(grid)
+    assert isinstance(result, vtki.UniformGrid)
+    assert result.n_points == grid.n_points
+    assert 'linear' not in grid.point_arrays
+    mask = result.point_arrays['vtkValidPointMask'].astype(bool)
+    points = np.array([grid.GetPoint(i) for i in range(grid.n_points)])
+    assert np.allclose(result.point_arrays['linear'][mask], points[mask].dot([1.0, 2.0, 3.0]))
+
+
+@pytest.mark.parametrize('mesh', [examples.load_hexbeam(),
+                                  examples.load_hexbeam().extract_geometry(),
+                                  vtki.Sphere(), vtki.Plane()])
+def test_linear_cell_sizes_and_centers(mesh):
+    assert vtki.filters._linear_cell_groups(mesh) is not None
+    mesh = mesh.copy()
+    mesh.points += np.random.random(mesh.points.shape) * 0.01
+    sizes = mesh.compute_cell_sizes(length=True)
+    alg = vtk.vtkCellSizeFilter()
+    alg.SetInputDataObject(mesh)
+    alg.SetComputeLength(True)
+    alg.SetComputeVertexCount(False)
+    alg.Update()
+    expected = vtki.wrap(alg.GetOutput())
+    for name in ['Length', 'Area', 'Volume']:
+        assert np.allclose(sizes.cell_arrays[name], expected.cell_arrays[name])
+    centers = mesh.cell_centers()
+    alg = vtk.vtkCellCenters()
+    alg.SetInputDataObject(mesh)
+    alg.SetVertexCells(True)
+    alg.Update()
+    expected = vtki.wrap(alg.GetOutput())
+    assert np.allclose(centers.points, expected.points)
+    assert centers.n_cells == expected.n_cells
+    assert sorted(centers.point_arrays.keys()) == sorted(expected.point_arrays.keys())
+
+
+def test_progress_monitor():
+    sphere = vtki.Sphere(theta_resolution=100, phi_resolution=100)
+    progress = []
+    with vtki.ProgressMonitor(callback=lambda name, p: progress.append((name, p))) as monitor:
+        result = sphere.decimate(0.5, inplace=False)
+    assert not monitor.cancelled
+    assert result.n_cells < sphere.n_cells
+    assert progress[-1] == ('vtkQuadricDecimation', 1.0)
+    # a cancelled filter raises to the caller
+    with pytest.raises(vtki.CancelledError):
+        with vtki.ProgressMonitor() as monitor:
+            monitor.cancel()
+            sphere.decimate(0.5, inplace=False)
+    assert monitor.cancelled
+    # unless the monitor skips the rest of the block
+    result = None
+    with vtki.ProgressMonitor(suppress=True) as monitor:
+        monitor.cancel()
+        result = sphere.decimate(0.5, inplace=False)
+        assert False
+    assert result is None
+    # cancel from the progress callback of the running algorithm
+    with pytest.raises(vtki.CancelledError):
+        with vtki.ProgressMonitor(callback=lambda name, p: monitor.cancel()) as monitor:
+            sphere.elevation().contour(5)
+    # cancelling an outer monitor aborts the filters of the inner monitors
+    with pytest.raises(vtki.CancelledError):
+        with vtki.ProgressMonitor() as outer:
+            with vtki.ProgressMonitor(suppress=True) as inner:
+                outer.cancel()
+                sphere.decimate(0.5, inplace=False)
+            assert False
+    assert not inner.cancelled
+
+
+def test_profile(tmpdir):
+    filename = str(tmpdir.mkdir("tmpdir").join('contours.vtk'))
+    dataset = examples.load_uniform()
+    with vtki.profile() as profiler:
+        contours = dataset.contour()
+        with vtki.ProgressMonitor():
+            contours.save(filename)
+    dataset.slice()
+    assert [(r['method'], r['algorithm']) for r in profiler.records] == \
+        [('UniformGrid.contour', 'vtkFlyingEdges3D'),
+         ('PolyData.save', 'vtkPolyDataWriter')]
+    record = profiler.records[0]
+    assert record['in_points'] == dataset.n_points
+    assert record['out_cells'] == contours.n_cells
+    assert record['out_bytes'] > 0
+    assert 'vtkPolyDataWriter' in profiler.table()
+    trace = profiler.chrome_trace()
+    assert [event['ph'] for event in trace['traceEvents']] == ['X', 'X']
+    profiler.chrome_trace(filename.replace('.vtk', '.json'))
+    assert os.path.isfile(filename.replace('.vtk', '.json'))
+    # the filters of composite datasets are profiled too
+    multi = vtki.MultiBlock([examples.load_uniform(), examples.load_airplane()])
+    with vtki.profile() as profiler:
+        multi.extract_geometry()
+    assert [r['algorithm'] for r in profiler.records] == \
+        ['vtkCompositeDataGeometryFilter']
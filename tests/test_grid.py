@@ -28,6 +28,46 @@ def test_volume():
     assert beam.volume > 0.0
 
 
+def test_get_cell_points():
+    grid = examples.load_hexbeam()
+    points = grid.get_cell_points([3, 1])
+    assert np.array_equal(points[0], grid.cells[grid.offset[3] + 1:grid.offset[3] + 9])
+    assert np.array_equal(points[1], grid.get_cell_points(1))
+    assert len(grid.get_cell_points()) == grid.n_cells
+    ids = grid.GetCell(3).GetPointIds()
+    assert np.array_equal(points[0], [ids.GetId(i) for i in range(ids.GetNumberOfIds())])
+
+
+def test_adjacency():
+    grid = examples.load_hexbeam()
+    cells = grid.adjacency('cell')
+    # hexahedra share faces with at most 6 neighbors
+    assert cells.degree.min() >= 1 and cells.degree.max() <= 6
+    points, boundary = grid.get_boundary()
+    assert boundary.size == grid.n_cells
+    assert points.size < grid.n_points
+    n_components, labels = grid.adjacency('point').connected_components()
+    assert n_components == 1
+
+
+def test_remove_points_grid():
+    grid = examples.load_hexbeam()
+    grid.cell_arrays['ind'] = np.arange(grid.n_cells)
+    remove = np.zeros(grid.n_points, bool)
+    remove[:3] = True
+    result, ridx = grid.remove_points(remove)
+    kept = [i for i, pts in enumerate(grid.get_cell_points()) if not remove[pts].any()]
+    assert np.array_equal(result.cell_arrays['ind'], kept)
+    assert np.allclose(result.points, grid.points[ridx])
+    for i in [0, result.n_cells - 1]:
+        ids = result.GetCell(i).GetPointIds()
+        ids = [ids.GetId(j) for j in range(ids.GetNumberOfIds())]
+        assert np.allclose(result.points[ids], grid.points[grid.get_cell_points(kept[i])])
+    result, ridx = grid.remove_points([0], mode='all', keep_scalars=False)
+    assert result.n_cells == grid.n_cells
+    assert 'ind' not in result.cell_arrays
+
+
 def test_merge():
     beamA = vtki.UnstructuredGrid(examples.hexbeamfile)
     beamB = beamA.copy()
@@ -177,6 +217,26 @@ def test_merge_not_main():
     assert grid.n_points < unmerged.n_points
 
 
+def test_merge_vtk():
+    # the points and their data are merged like in vtkAppendFilter
+    grid = beam.copy()
+    grid.points[:, 0] += 0.5
+    grid.point_arrays['side'] = np.ones(grid.n_points)
+    other = beam.copy()
+    other.point_arrays['side'] = np.zeros(other.n_points)
+    append = vtk.vtkAppendFilter()
+    append.MergePointsOn()
+    append.AddInputData(other)
+    append.AddInputData(grid)
+    append.Update()
+    expected = vtki.wrap(append.GetOutput())
+
+    merged = grid.merge(other, inplace=False)
+    assert np.allclose(merged.points, expected.points)
+    assert np.array_equal(merged.cells, expected.cells)
+    assert np.array_equal(merged.point_arrays['side'], expected.point_arrays['side'])
+
+
 def test_merge_list():
     grid_a = beam.copy()
     grid_a.points[:, 0] += 1
@@ -52,6 +52,10 @@ def test_ipy_threshold(qtbot):
     g = tool.tool()
     g.widget.update()
     tool.plotter.close()
+    tool = vtki.Threshold(data, show=False, default_params={'percentile': True})
+    g = tool.tool(default_params={'percentile': True})
+    g.widget.update()
+    tool.plotter.close()
 
 
 @pytest.mark.skipif(not running_xserver(), reason="Requires X11")
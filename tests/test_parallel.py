@@ -0,0 +1,27 @@
+import pytest
+import vtk
+
+import vtki
+
+
+def test_num_threads():
+    default = vtk.vtkMultiThreader.GetGlobalDefaultNumberOfThreads()
+    with vtki.num_threads(2):
+        assert vtk.vtkMultiThreader.GetGlobalDefaultNumberOfThreads() == 2
+        # what the SMP tools report depends on the backend of VTK
+        assert vtki.get_num_threads() == vtk.vtkSMPTools.GetEstimatedNumberOfThreads()
+        if vtki.get_smp_backend() == 'Sequential':
+            assert vtki.get_num_threads() == 1
+        with vtki.num_threads(1):
+            assert vtk.vtkMultiThreader.GetGlobalDefaultNumberOfThreads() == 1
+        assert vtk.vtkMultiThreader.GetGlobalDefaultNumberOfThreads() == 2
+    assert vtk.vtkMultiThreader.GetGlobalDefaultNumberOfThreads() == default
+    with pytest.raises(AssertionError):
+        vtki.set_num_threads(0)
+
+
+def test_thread_pools():
+    calls = []
+    with vtki.num_threads(2):
+        vtki.parallel.thread_map(calls.append, range(10), n_threads=8)
+    assert sorted(calls) == list(range(10))
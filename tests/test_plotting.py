@@ -4,6 +4,7 @@ import sys
 from weakref import proxy
 
 import numpy as np
+import vtk
 import vtki
 
 from vtki import examples
@@ -296,6 +297,20 @@ def test_plot_arrows():
     assert np.any(img)
 
 
+@pytest.mark.skipif(not running_xserver(), reason="Requires X11")
+def test_add_glyphs():
+    grid = examples.load_uniform()
+    grid.point_arrays['vec'] = np.random.random((grid.n_points, 3))
+    active = grid.active_vectors_name, grid.active_scalar_name
+    plotter = vtki.Plotter(off_screen=OFF_SCREEN)
+    actor = plotter.add_glyphs(grid, orient='vec', scale='Spatial Point Data',
+                               factor=0.01)
+    assert isinstance(actor.GetMapper(), vtk.vtkGlyph3DMapper)
+    # the active arrays of the dataset are left as they were
+    assert (grid.active_vectors_name, grid.active_scalar_name) == active
+    plotter.plot()
+
+
 @pytest.mark.skipif(not running_xserver(), reason="Requires X11")
 def test_axes():
     plotter = vtki.Plotter(off_screen=True)
@@ -2,7 +2,9 @@ import os
 from math import pi
 
 import pytest
+import vtk
 import numpy as np
+from vtk.util.numpy_support import vtk_to_numpy
 
 import vtki
 from vtki import examples
@@ -94,6 +96,112 @@ def test_init_from_arrays_triangular():
     assert mesh.n_cells == 3
 
 
+def test_faces_mixed():
+    # mostly small cells with a few wide cells
+    sizes = np.random.randint(1, 4, 500)
+    sizes[::25] = np.random.randint(4, 40, 20)
+    faces = np.concatenate([np.hstack(([n], np.random.randint(0, 100, n)))
+                            for n in sizes])
+    starts = vtki.pointset._cell_starts(faces)
+    assert np.array_equal(starts, np.cumsum(np.hstack(([0], sizes[:-1] + 1))))
+    mesh = vtki.PolyData(np.random.random((100, 3)), faces)
+    assert mesh.n_cells == 500
+    mesh.faces = faces[:-sizes[-1] - 1]
+    assert mesh.n_cells == 499
+
+
+def test_regular_faces():
+    vertices = np.random.random((6, 3))
+    triangles = np.array([[0, 1, 2], [2, 3, 4]], dtype=np.int32)
+    quads = np.array([[0, 1, 4, 5]])
+    mesh = vtki.PolyData(vertices, regular_faces=triangles)
+    assert mesh.n_cells == 2
+    assert np.array_equal(mesh.regular_faces, triangles)
+    # the regular faces are a view of the faces
+    mesh.regular_faces[0, 0] = 3
+    assert mesh.faces[1] == 3
+    mesh.regular_faces = [triangles, quads]
+    assert mesh.n_cells == 3
+    assert np.array_equal(mesh.faces, [3, 0, 1, 2, 3, 2, 3, 4, 4, 0, 1, 4, 5])
+    with pytest.raises(ValueError):
+        mesh.regular_faces
+    with pytest.raises(ValueError):
+        mesh.regular_faces = quads + 2
+    with pytest.raises(TypeError):
+        vtki.PolyData(vertices, triangles, regular_faces=triangles)
+
+
+def test_get_cell_points():
+    mesh = vtki.PolyData(np.random.random((10, 3)),
+                         regular_faces=[np.array([[0, 1, 2], [2, 3, 4]]),
+                                        np.array([[5, 6, 7, 8]])])
+    assert np.array_equal(mesh.offset, [0, 4, 8])
+    assert np.array_equal(mesh.get_cell_points(2), [5, 6, 7, 8])
+    points = mesh.get_cell_points([2, 0])
+    assert np.array_equal(points[0], [5, 6, 7, 8])
+    assert np.array_equal(points[1], [0, 1, 2])
+    assert len(mesh.get_cell_points()) == 3
+    assert mesh.get_cell_points([]) == []
+    # the offsets are rebuilt when the faces change
+    mesh.regular_faces = np.array([[0, 1, 2, 3]])
+    assert np.array_equal(mesh.offset, [0])
+    assert np.array_equal(mesh.get_cell_points(0), [0, 1, 2, 3])
+
+
+def test_adjacency():
+    plane = vtki.Plane(i_resolution=4, j_resolution=3)
+    points = plane.adjacency('point')
+    assert points.shape == (plane.n_points, plane.n_points)
+    assert np.array_equal(points.degree[:2], [2, 3])
+    assert np.array_equal(points.k_ring(0, k=1), [0, 1, 5])
+    assert plane.adjacency('point_cell').shape == (plane.n_points, plane.n_cells)
+    cells = plane.adjacency('cell')
+    assert np.array_equal(cells[0], [1, 4])
+    assert np.array_equal(cells.to_sparse().toarray(), cells.to_sparse().T.toarray())
+    boundary_points, boundary_cells = plane.get_boundary()
+    assert boundary_points.size == 14
+    assert boundary_cells.size == 10
+    assert plane.adjacency() is points
+    mesh = plane + vtki.Plane(center=(5, 0, 0))
+    n_components, labels = mesh.adjacency('cell').connected_components()
+    assert n_components == 2
+    assert np.bincount(labels).tolist() == [12, 100]
+    with pytest.raises(RuntimeError):
+        plane.adjacency('foo')
+
+
+def test_adjacency_mixed_cells():
+    # the cell ids are those of VTK, the lines before the faces
+    points = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [1, 1, 0], [2, 2, 0]], float)
+    mesh = vtki.PolyData(points, np.array([3, 0, 1, 2, 3, 1, 3, 2]))
+    lines = vtk.vtkCellArray()
+    lines.InsertNextCell(2)
+    lines.InsertCellPoint(3)
+    lines.InsertCellPoint(4)
+    mesh.SetLines(lines)
+    cells = mesh.adjacency('cell')
+    assert cells.shape == (3, 3)
+    assert [cells[i].tolist() for i in range(3)] == [[], [2], [1]]
+    assert mesh.adjacency('point')[4].tolist() == [3]
+    assert mesh.adjacency('point_cell')[3].tolist() == [0, 2]
+    assert mesh.edge_mask(10).shape == (mesh.n_points,)
+    strips = vtk.vtkStripper()
+    strips.SetInputData(sphere)
+    strips.Update()
+    with pytest.raises(TypeError):
+        vtki.wrap(strips.GetOutput()).adjacency('cell')
+
+
+@pytest.mark.parametrize('faces', [[3, 0, 1], [3, 0, 1, 2, 2], [0, 1, 2],
+                                   [4, 0, 1, 2, 5], [[3, 0, 1, 2], [2, 0, 1, 2]]])
+def test_faces_malformed(faces):
+    vertices = np.random.random((5, 3))
+    with pytest.raises(ValueError):
+        vtki.PolyData(vertices, np.array(faces))
+    with pytest.raises(ValueError):
+        vtki.PolyData(vertices, np.array(faces), deep=True)
+
+
 def test_init_as_points():
     vertices = np.array([[0, 0, 0],
                          [1, 0, 0],
@@ -138,6 +246,52 @@ def test_ray_trace():
     assert np.any(ind)
 
 
+def test_multi_ray_trace():
+    origins = np.random.random((100, 3)) * 0.2 - 0.1
+    origins[:, 2] = -2
+    directions = [0, 0, 1]
+    points, ind, rays = sphere.multi_ray_trace(origins, directions)
+    assert np.array_equal(rays, np.arange(100))
+    assert np.allclose(points[:, :2], origins[:, :2])
+    assert np.all(points[:, 2] < 0)
+    # each hit lies within the triangle that was hit
+    tri = sphere.points[sphere.faces.reshape(-1, 4)[ind, 1:]]
+    areas = [np.linalg.norm(np.cross(tri[:, i] - points, tri[:, i - 1] - points), axis=1)
+             for i in range(3)]
+    total = np.linalg.norm(np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0]), axis=1)
+    assert np.allclose(np.sum(areas, axis=0), total)
+    # rays pointing away from the mesh miss it
+    _, _, rays = sphere.multi_ray_trace(origins, [0, 0, -1])
+    assert rays.size == 0
+
+
+def test_multi_ray_trace_polygons():
+    # the caps of the cylinder are polygons of many points
+    cylinder = vtki.Cylinder([0, 0, 0], [0, 0, 1], 1, 2)
+    origins = np.random.random((200, 3)) * 1.2 - 0.6
+    origins[:, 2] = 3
+    points, ind, rays = cylinder.multi_ray_trace(origins, [0, 0, -1])
+    assert np.array_equal(rays, np.arange(200))
+    assert np.allclose(points[:, 2], 1)
+    assert np.all(cylinder.faces[cylinder.offset[ind]] > 4)
+    # rays from inside the cylinder hit its side
+    points, ind, rays = cylinder.multi_ray_trace(np.zeros((3, 3)), np.eye(3))
+    assert np.array_equal(rays, [0, 1, 2])
+    assert np.allclose(np.linalg.norm(points[:2, :2], axis=1), 1, atol=0.01)
+    assert np.isclose(points[2, 2], 1)
+
+
+def test_obbtree_modified():
+    mesh = sphere.copy()
+    tree = mesh.obbTree
+    assert mesh.obbTree is tree
+    mesh.points *= 2
+    mesh.GetPoints().Modified()
+    assert mesh.obbTree is not tree
+    points, _ = mesh.ray_trace([0, 0, 0], [2, 0, 0], first_point=True)
+    assert np.isclose(np.linalg.norm(points), 1.0, atol=0.05)
+
+
 @pytest.mark.skipif(not running_xserver(), reason="Requires X11")
 def test_ray_trace_plot():
     points, ind = sphere.ray_trace([0, 0, 0], [1, 1, 1], plot=True, first_point=True,
@@ -154,6 +308,16 @@ def test_plot_curvature():
 
 def test_edge_mask():
     mask = sphere.edge_mask(10)
+    assert mask.shape == (sphere.n_points,)
+    assert 'point_ind' not in sphere.point_arrays
+    # the tip, the rim and the shaft of the arrow
+    arrow = vtki.Arrow([0, 0, 0], [1, 0, 0])
+    mtime = arrow.GetMTime()
+    mask, edges, edge_mask = arrow.edge_mask(30, return_edges=True)
+    assert arrow.GetMTime() == mtime
+    assert mask.sum() == 7
+    assert edges.shape == (edge_mask.size, 2)
+    assert np.array_equal(np.unique(edges[edge_mask]), np.nonzero(mask)[0])
 
 
 def test_boolean_cut_inplace():
@@ -208,6 +372,45 @@ def test_boolean_difference():
     assert sub_mesh.n_cells
 
 
+def test_split_poly_data():
+    # the parts the boolean operations are run on keep the cells of each label
+    from vtki.filters import _split_poly_data
+    mesh = sphere.copy()
+    mesh.cell_arrays['ids'] = np.arange(mesh.n_cells)
+    labels = (mesh.cell_centers().points[:, 2] > 0).astype(np.int64)
+    parts = _split_poly_data(mesh, labels, 2)
+    for label, part in enumerate(parts):
+        ids = np.nonzero(labels == label)[0]
+        assert np.array_equal(part.cell_arrays['ids'], ids)
+        for i in [0, ids.size - 1]:
+            points = part.points[part.get_cell_points(i)]
+            assert np.allclose(points, mesh.points[mesh.get_cell_points(ids[i])])
+    assert np.isclose(parts[0].area + parts[1].area, mesh.area)
+
+
+@pytest.mark.parametrize('operation', ['union', 'intersection', 'difference'])
+def test_boolean_culled(operation):
+    # only the cells near the small sphere are operated on by VTK, with the
+    # same output as operating on the whole meshes
+    from vtki.pointset import _boolean_operation, _run_boolean
+    large = vtki.Sphere(5, theta_resolution=40, phi_resolution=40)
+    small = vtki.Sphere(0.6, center=[0, 0, 5])
+    mtime = large.GetMTime()
+    culled = _boolean_operation(large, small, operation)
+    whole = _run_boolean(large, small, operation, None)
+    assert large.GetMTime() == mtime
+    assert culled.n_points == whole.n_points
+    assert culled.n_cells == whole.n_cells
+    assert np.allclose(culled.area, whole.area)
+    assert np.allclose(culled.volume, whole.volume)
+    assert np.allclose(np.sort(culled.cell_centers().points, axis=0),
+                       np.sort(whole.cell_centers().points, axis=0))
+    assert np.array_equal(np.sort(culled.cell_arrays['CellSource']),
+                          np.sort(whole.cell_arrays['CellSource']))
+    assert 'Distance' not in culled.point_arrays
+    assert 'Distance' not in culled.cell_arrays
+
+
 @pytest.mark.parametrize('curv_type', ['mean', 'gaussian', 'maximum', 'minimum'])
 def test_curvature(curv_type):
     curv = sphere.curvature(curv_type)
@@ -215,6 +418,51 @@ def test_curvature(curv_type):
     assert curv.size == sphere.n_points
 
 
+def test_curvature_vtk():
+    # the curvatures match those of vtkCurvatures
+    mesh = sphere.copy()
+    mesh.points += np.random.RandomState(0).normal(scale=0.005, size=mesh.points.shape)
+    curvefilter = vtk.vtkCurvatures()
+    curvefilter.SetInputData(mesh)
+    expected = {}
+    for curv_type in ['Mean', 'Gaussian', 'Maximum', 'Minimum']:
+        getattr(curvefilter, 'SetCurvatureTypeTo' + curv_type)()
+        curvefilter.Update()
+        scalars = curvefilter.GetOutput().GetPointData().GetScalars()
+        expected[curv_type] = vtk_to_numpy(scalars).copy()
+    # where the mean squared is below the Gaussian curvature, both principal
+    # curvatures are the mean curvature, which VTK before 9 sets to zero
+    clamped = expected['Mean']**2 < expected['Gaussian']
+    assert clamped.any()
+    for curv_type in ['Maximum', 'Minimum']:
+        expected[curv_type][clamped] = expected['Mean'][clamped]
+    for curv_type, values in expected.items():
+        assert np.allclose(mesh.curvature(curv_type), values)
+
+
+def test_curvature_sphere():
+    # the curvatures of a sphere of radius r away from its poles are 1/r and
+    # 1/r**2
+    radius = 2.0
+    mesh = vtki.Sphere(radius=radius, theta_resolution=120, phi_resolution=120)
+    body = np.abs(mesh.points[:, 2]) < 0.9*radius
+    curv = {curv_type: mesh.curvature(curv_type)[body]
+            for curv_type in ['Mean', 'Gaussian', 'Maximum', 'Minimum']}
+    assert np.allclose(curv['Mean'], 1/radius, rtol=1E-2)
+    assert np.allclose(curv['Gaussian'], 1/radius**2, rtol=1E-2)
+    assert np.allclose(curv['Maximum'], 1/radius, rtol=5E-2)
+    assert np.allclose(curv['Minimum'], 1/radius, rtol=5E-2)
+    assert np.all(curv['Maximum'] >= curv['Minimum'])
+    # the curvatures are cached
+    mtime = mesh.GetMTime()
+    assert mesh.curvature('mean') is not mesh.curvature('mean')
+    assert mesh.GetMTime() == mtime
+
+    # other polygons than triangles
+    curv = vtki.Plane().curvature('mean')
+    assert np.allclose(curv, 0)
+
+
 def test_invalid_curvature():
     with pytest.raises(Exception):
         curv = sphere.curvature('not valid')
@@ -292,8 +540,29 @@ def test_compute_normals():
     assert cell_normals.shape[0] == sphere.n_cells
 
 
+def test_compute_normals_numpy():
+    # the normals of meshes of polygons match those of vtkPolyDataNormals
+    for mesh in [sphere, vtki.Plane(i_resolution=7, j_resolution=5)]:
+        alg = vtk.vtkPolyDataNormals()
+        alg.SetInputData(mesh)
+        alg.SetSplitting(False)
+        alg.ComputeCellNormalsOn()
+        alg.Update()
+        expected = vtki.wrap(alg.GetOutput())
+        normals = mesh.compute_normals(split_vertices=False, inplace=False)
+        assert normals.n_points == mesh.n_points
+        assert np.allclose(normals.point_arrays['Normals'],
+                           expected.point_arrays['Normals'], atol=1e-6)
+        assert np.allclose(normals.cell_arrays['Normals'],
+                           expected.cell_arrays['Normals'], atol=1e-6)
+
+
 def test_point_normals():
     assert sphere.point_normals.shape[0] == sphere.n_points
+    mesh = sphere.copy()
+    mtime = mesh.GetMTime()
+    assert np.allclose(mesh.point_normals, mesh.point_normals)
+    assert mesh.GetMTime() == mtime
 
 
 def test_cell_normals():
@@ -324,6 +593,66 @@ def test_extract_largest():
     assert mesh.n_faces == sphere.n_faces
 
 
+def test_merge_points():
+    append = vtk.vtkAppendPolyData()
+    append.AddInputData(sphere)
+    append.AddInputData(sphere)
+    append.Update()
+    doubled = vtki.wrap(append.GetOutput())
+    doubled.point_arrays['ids'] = np.arange(doubled.n_points)
+    merged, point_map = vtki.merge_points(doubled)
+    assert merged.n_points == sphere.n_points
+    assert merged.n_faces == doubled.n_faces
+    assert np.allclose(merged.points[point_map], doubled.points)
+    assert np.array_equal(merged.point_arrays['ids'], np.arange(sphere.n_points))
+    merged, point_map = vtki.merge_points(doubled, point_data='last')
+    assert np.array_equal(merged.point_arrays['ids'], np.arange(sphere.n_points) +
+                          sphere.n_points)
+
+    # points within the tolerance of a point kept before them, or with the
+    # points of a chain all merged
+    points = np.array([[0, 0, 0], [0.9, 0, 0], [1.8, 0, 0], [5, 0, 0]])
+    mesh = vtki.PolyData(points)
+    merged, point_map = vtki.merge_points(mesh, tolerance=1.0)
+    assert np.array_equal(point_map, [0, 0, 1, 2])
+    assert np.allclose(merged.points, points[[0, 2, 3]])
+    merged, point_map = vtki.merge_points(mesh, tolerance=1.0, chain=True)
+    assert np.array_equal(point_map, [0, 0, 0, 1])
+    assert np.allclose(merged.points, points[[0, 3]])
+
+    with pytest.raises(TypeError):
+        vtki.merge_points(examples.load_uniform())
+
+
+@pytest.mark.parametrize('size', [0.1, 1.0, 10.0])
+def test_merge_points_in_order(size):
+    # sparse points are merged one at a time and dense points in rounds
+    points = np.random.RandomState(0).rand(2000, 3) * size
+    merged, point_map = vtki.merge_points(vtki.PolyData(points), tolerance=0.3)
+    kept = []
+    expected = np.empty(points.shape[0], dtype=np.intp)
+    for i, point in enumerate(points):
+        close = np.nonzero(((points[kept] - point)**2).sum(axis=1) <= 0.09)[0]
+        if close.size:
+            expected[i] = close[0]
+        else:
+            expected[i] = len(kept)
+            kept.append(i)
+    assert np.array_equal(point_map, expected)
+    assert np.allclose(merged.points, points[kept])
+
+
+def test_merge_points_dense():
+    # the pairs of points are compared in chunks of a bounded size
+    points = np.random.RandomState(0).rand(50000, 3) * 0.05
+    merged, point_map = vtki.merge_points(vtki.PolyData(points), tolerance=0.01)
+    distance = np.sqrt(((merged.points[point_map] - points)**2).sum(axis=1))
+    assert distance.max() <= 0.01
+    kept = merged.points
+    for i in range(kept.shape[0]):
+        assert np.sort(np.sqrt(((kept - kept[i])**2).sum(axis=1)))[1] > 0.01
+
+
 def test_clean():
     mesh = sphere + sphere
     assert mesh.n_points > sphere.n_points
@@ -334,6 +663,21 @@ def test_clean():
     assert mesh.n_points == sphere.n_points
 
 
+@pytest.mark.parametrize('tolerance', [0.01, 0.03])
+def test_clean_tolerance(tolerance):
+    # the points are merged in the order of the cells like vtkCleanPolyData
+    mesh = vtki.Sphere(theta_resolution=60, phi_resolution=60)
+    clean = vtk.vtkCleanPolyData()
+    clean.SetInputData(mesh)
+    clean.ToleranceIsAbsoluteOn()
+    clean.SetAbsoluteTolerance(tolerance)
+    clean.Update()
+    cleaned = mesh.clean(merge_tol=tolerance, inplace=False)
+    assert cleaned.n_points == clean.GetOutput().GetNumberOfPoints()
+    assert cleaned.n_cells == clean.GetOutput().GetNumberOfCells()
+    assert np.allclose(cleaned.points, vtk_to_numpy(clean.GetOutput().GetPoints().GetData()))
+
+
 def test_area():
     radius = 0.5
     ideal_area = 4*pi*radius**2
@@ -345,6 +689,34 @@ def test_volume():
     assert np.isclose(dense_sphere.volume, ideal_volume, rtol=1E-3)
 
 
+def test_area_volume_cached():
+    mesh = dense_sphere.copy()
+    mprop = vtk.vtkMassProperties()
+    mprop.SetInputData(mesh)
+    mprop.Update()
+    assert np.isclose(mesh.area, mprop.GetSurfaceArea())
+    assert np.isclose(mesh.volume, mprop.GetVolume())
+    area, volume = mesh.area, mesh.volume
+    mesh.points *= 2
+    assert np.isclose(mesh.area, 4*area)
+    # in place operations on the points modify the mesh
+    points = mesh.points
+    points /= 2
+    assert np.isclose(mesh.area, area)
+    # the cached face geometry of the normals is used once built
+    mesh.point_normals
+    np.multiply(points, 2, out=points)
+    assert np.isclose(mesh.area, 4*area)
+    assert np.isclose(mesh.volume, 8*volume)
+    assert type(points + 1) is vtki.common.vtki_ndarray
+    assert (points + 1).proxy is None
+
+    # polygons other than triangles
+    plane = vtki.Plane(i_size=2, j_size=3)
+    assert np.isclose(plane.area, 6)
+    assert np.isclose(vtki.PolyData().area, 0)
+
+
 @pytest.mark.skipif(not running_xserver(), reason="Requires X11")
 def test_plot_boundaries():
     sphere.plot_boundaries(off_screen=True)
@@ -372,7 +744,25 @@ def test_remove_points_all():
     assert sphere_copy.n_faces == sphere.n_faces - 1
 
 
-def test_remove_points_fail():
-    arrow = vtki.Arrow([0, 0, 0], [1, 0, 0])
-    with pytest.raises(Exception):
-        arrow.remove_points(range(10))
+def test_remove_points_mixed():
+    vertices = np.random.random((7, 3))
+    mesh = vtki.PolyData(vertices, regular_faces=[np.array([[0, 1, 2], [2, 3, 4]]),
+                                                  np.array([[3, 4, 5, 6]])])
+    lines = vtk.vtkCellArray()
+    for a, b in [(0, 6), (5, 6)]:
+        lines.InsertNextCell(2)
+        lines.InsertCellPoint(a)
+        lines.InsertCellPoint(b)
+    mesh.SetLines(lines)
+    # lines come before polygons in the cell order
+    mesh.cell_arrays['ind'] = np.arange(mesh.n_cells)
+    mesh.point_arrays['ind'] = np.arange(mesh.n_points)
+    result, ridx = mesh.remove_points([0], inplace=False)
+    assert result.GetNumberOfLines() == 1
+    assert result.GetNumberOfPolys() == 2
+    assert np.array_equal(result.cell_arrays['ind'], [1, 3, 4])
+    assert np.array_equal(ridx, [2, 3, 4, 5, 6])
+    assert np.array_equal(result.point_arrays['ind'], ridx)
+    assert np.array_equal(result.faces, [3, 0, 1, 2, 4, 1, 2, 3, 4])
+    mesh.remove_points([0, 6], mode='all', inplace=True)
+    assert mesh.n_cells == 4
@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+import pytest
+import vtk
+
+import vtki
+from vtki import examples
+
+
+@pytest.mark.parametrize('partition', ['index', 'spatial'])
+def test_split_pieces(partition):
+    grid = examples.load_hexbeam()
+    pieces = list(vtki.streaming.split_pieces(grid, 3, partition))
+    assert len(pieces) == 3
+    assert sum(piece.n_cells for piece in pieces) == grid.n_cells
+    with pytest.raises(RuntimeError):
+        list(vtki.streaming.split_pieces(grid, 3, 'foo'))
+
+
+def test_stream_structured():
+    dataset = examples.load_uniform()
+    values = [200, 400]
+    budget = dataset.GetActualMemorySize() * 1024 // 2
+    output = dataset.stream('contour', args=(values,), max_bytes=budget)
+    assert output.n_blocks == 4
+    assert sum(block.n_cells for block in output) == dataset.contour(values).n_cells
+    output = vtki.stream_filter(dataset, 'threshold', kwargs={'value': [100, 500]},
+                                n_pieces=3)
+    assert sum(block.n_cells for block in output) == dataset.threshold([100, 500]).n_cells
+
+
+def test_stream_file(tmpdir):
+    grid = examples.load_hexbeam()
+    filename = str(tmpdir.mkdir("tmpdir").join('beam.pvtu'))
+    pieces = vtk.vtkExtractUnstructuredGridPiece()
+    pieces.SetInputData(grid)
+    writer = vtk.vtkXMLPUnstructuredGridWriter()
+    writer.SetInputConnection(pieces.GetOutputPort())
+    writer.SetFileName(filename)
+    writer.SetNumberOfPieces(4)
+    writer.SetStartPiece(0)
+    writer.SetEndPiece(3)
+    writer.Write()
+    output = vtki.stream_filter(filename, lambda piece: piece.cell_centers(),
+                                n_pieces=8)
+    assert output.n_blocks == 8
+    centers = np.vstack([block.points for block in output])
+    assert np.allclose(np.sort(centers, axis=0),
+                       np.sort(grid.cell_centers().points, axis=0))
+    writer = vtki.PieceWriter(filename.replace('beam.pvtu', 'surface.vtk'))
+    assert vtki.stream_filter(filename, 'extract_geometry', reducer=writer) is None
+    assert len(writer.filenames) == 4
+    assert all(os.path.isfile(name) for name in writer.filenames)
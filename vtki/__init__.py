@@ -3,12 +3,20 @@ from vtki._version import __version__
 from vtki.plotting import *
 from vtki.utilities import *
 from vtki.colors import *
+from vtki.cache import FilterCache, filter_cache
+from vtki.progress import ProgressMonitor, CancelledError
+from vtki.profiling import Profiler, profile
+from vtki.parallel import get_num_threads, set_num_threads, num_threads, get_smp_backend
+from vtki.sketch import QuantileSketch
+from vtki.streaming import stream_filter, PieceWriter
 from vtki.filters import DataSetFilters
+from vtki.adjacency import Adjacency
 from vtki.common import Common
 from vtki.pointset import PointGrid
 from vtki.pointset import PolyData
 from vtki.pointset import UnstructuredGrid
 from vtki.pointset import StructuredGrid
+from vtki.pointset import merge_points
 from vtki.grid import Grid
 from vtki.grid import RectilinearGrid
 from vtki.grid import UniformGrid
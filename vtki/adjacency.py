@@ -0,0 +1,353 @@
+"""
+Adjacency of the points and cells of ``PolyData`` and ``UnstructuredGrid``
+meshes stored in compressed sparse row (CSR) form.
+
+The adjacency is built from the connectivity of the mesh with NumPy: the
+edges and facets (the faces of 3D cells, the edges of 2D cells, and the end
+points of 1D cells) of each cell type are taken from VTK once and applied to
+all the cells of that type at once.  It is cached on the mesh until the mesh
+is modified.
+
+Example
+-------
+
+>>> import vtki
+>>> sphere = vtki.Sphere()
+>>> neighbors = sphere.adjacency('point')
+>>> ring = neighbors.k_ring([0], k=2)
+>>> n_components, labels = neighbors.connected_components()
+>>> n_components
+1
+
+"""
+import numpy as np
+import vtk
+from vtk.util.numpy_support import vtk_to_numpy
+
+from vtki.cache import _memoize
+from vtki.filters import _cell_starts
+
+# The local edges and facets of each cell type and number of points
+_LOCAL_TOPOLOGY = {}
+
+
+class Adjacency(object):
+    """A sparse adjacency in compressed sparse row form.
+
+    The neighbors of row ``i`` are ``indices[indptr[i]:indptr[i + 1]]``,
+    sorted in increasing order.
+
+    Parameters
+    ----------
+    indptr : np.ndarray
+        The start of the neighbors of each row in ``indices`` followed by the
+        number of neighbors.
+
+    indices : np.ndarray
+        The neighbors of all the rows.
+
+    shape : tuple
+        The number of rows and columns.
+
+    """
+
+    def __init__(self, indptr, indices, shape):
+        self.indptr = indptr
+        self.indices = indices
+        self.shape = shape
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, i):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    @property
+    def degree(self):
+        """The number of neighbors of each row"""
+        return np.diff(self.indptr)
+
+    def _neighbors(self, ids):
+        """The concatenated neighbors of the rows ``ids``"""
+        starts = self.indptr[ids]
+        counts = self.indptr[ids + 1] - starts
+        ends = np.cumsum(counts)
+        if ends.size == 0 or ends[-1] == 0:
+            return np.empty(0, dtype=self.indices.dtype)
+        index = np.arange(ends[-1]) + np.repeat(starts - (ends - counts), counts)
+        return self.indices[index]
+
+    def k_ring(self, ids, k=1):
+        """The rows within ``k`` steps of any of the given rows, including
+        the given rows.  Only for square adjacencies.
+
+        Parameters
+        ----------
+        ids : int or sequence of int
+            The seed rows.
+
+        k : int, optional
+            The number of steps.
+
+        Returns
+        -------
+        ring : np.ndarray
+            The sorted indices of the rows in the ring.
+
+        """
+        if self.shape[0] != self.shape[1]:
+            raise TypeError('The k-ring requires a square adjacency.')
+        visited = np.zeros(self.shape[0], dtype=bool)
+        front = np.unique(np.asarray(ids, dtype=np.intp).ravel())
+        visited[front] = True
+        for _ in range(k):
+            front = self._neighbors(front)
+            front = np.unique(front[~visited[front]])
+            if front.size == 0:
+                break
+            visited[front] = True
+        return np.nonzero(visited)[0]
+
+    def connected_components(self):
+        """Label the connected components of a square adjacency.
+
+        Returns
+        -------
+        n_components : int
+            The number of connected components.
+
+        labels : np.ndarray
+            The component of each row.
+
+        """
+        if self.shape[0] != self.shape[1]:
+            raise TypeError('Connected components require a square adjacency.')
+        labels = np.arange(self.shape[0])
+        rows = np.nonzero(self.degree)[0]
+        starts = self.indptr[rows]
+        while rows.size:
+            # the smallest label among each row and its neighbors
+            smallest = np.minimum.reduceat(labels[self.indices], starts)
+            new = labels.copy()
+            new[rows] = np.minimum(labels[rows], smallest)
+            new = new[new]
+            if np.array_equal(new, labels):
+                break
+            labels = new
+        components, labels = np.unique(labels, return_inverse=True)
+        return components.size, labels
+
+    def to_sparse(self):
+        """Return the adjacency as a ``scipy.sparse.csr_matrix`` of ones.
+        Requires SciPy."""
+        try:
+            import scipy.sparse
+        except ImportError:
+            raise Exception('Install scipy for this function')
+        data = np.ones(self.indices.size, dtype=np.int8)
+        return scipy.sparse.csr_matrix((data, self.indices, self.indptr),
+                                       shape=self.shape)
+
+
+def _csr(rows, cols, shape):
+    """Build an ``Adjacency`` from pairs of indices, removing duplicates"""
+    keys = np.unique(rows.astype(np.int64) * shape[1] + cols)
+    rows, cols = keys // shape[1], keys % shape[1]
+    indptr = np.zeros(shape[0] + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=shape[0]), out=indptr[1:])
+    return Adjacency(indptr, cols, shape)
+
+
+def _local_topology(cell_type, n):
+    """The dimension, local edges, and local facets of a cell type with
+    ``n`` points"""
+    key = (cell_type, n)
+    if key in _LOCAL_TOPOLOGY:
+        return _LOCAL_TOPOLOGY[key]
+    if cell_type is None or cell_type == vtk.VTK_POLYGON:
+        # polygons of any size
+        edges = [[i, (i + 1) % n] for i in range(n)]
+        topology = (2, edges, edges)
+    elif cell_type == vtk.VTK_POLY_LINE:
+        topology = (1, [[i, i + 1] for i in range(n - 1)], [[0], [n - 1]])
+    elif cell_type in (vtk.VTK_TRIANGLE_STRIP, vtk.VTK_POLYHEDRON):
+        raise TypeError('Adjacency of cell type ({}) is not supported.'.format(cell_type))
+    else:
+        cell = vtk.vtkGenericCell()
+        cell.SetCellType(cell_type)
+        cell.GetPointIds().SetNumberOfIds(n)
+        cell.GetPoints().SetNumberOfPoints(n)
+        for i in range(n):
+            cell.GetPointIds().SetId(i, i)
+            cell.GetPoints().SetPoint(i, 0.0, 0.0, 0.0)
+
+        def local_ids(sub):
+            return [sub.GetPointId(i) for i in range(sub.GetNumberOfPoints())]
+
+        edges = []
+        for i in range(cell.GetNumberOfEdges()):
+            edge = local_ids(cell.GetEdge(i))
+            # quadratic edges are stored as (end, end, middle)
+            edges += [[edge[0], edge[2]], [edge[2], edge[1]]] if len(edge) == 3 else [edge]
+        dim = cell.GetCellDimension()
+        if dim == 3:
+            facets = [local_ids(cell.GetFace(i)) for i in range(cell.GetNumberOfFaces())]
+        elif dim == 2:
+            facets = [local_ids(cell.GetEdge(i)) for i in range(cell.GetNumberOfEdges())]
+        elif dim == 1:
+            edges = [[0, 1]] if n > 1 else []
+            facets = [[0], [1]] if n > 1 else []
+        else:
+            facets = []
+        topology = (dim, edges, facets)
+    _LOCAL_TOPOLOGY[key] = topology
+    return topology
+
+
+def _poly_cells(mesh):
+    """The padded cells of the verts, lines, polys and strips of a
+    ``PolyData`` in the order of their cell ids, with the start and the cell
+    type of each cell"""
+    # the cell type of the cells of each array with the number of points of
+    # its single cells, and the type of its other cells
+    arrays = [(mesh.GetVerts(), 1, vtk.VTK_VERTEX, vtk.VTK_POLY_VERTEX),
+              (mesh.GetLines(), 2, vtk.VTK_LINE, vtk.VTK_POLY_LINE),
+              (mesh.GetPolys(), 0, vtk.VTK_POLYGON, vtk.VTK_POLYGON),
+              (mesh.GetStrips(), 0, vtk.VTK_TRIANGLE_STRIP, vtk.VTK_TRIANGLE_STRIP)]
+    parts, offsets, types = [], [], []
+    start = 0
+    for vtkcells, n, single, other in arrays:
+        cells = vtk_to_numpy(vtkcells.GetData())
+        offset = _cell_starts(cells)
+        parts.append(cells)
+        offsets.append(offset + start)
+        types.append(np.where(cells[offset] == n, single, other))
+        start += cells.size
+    return np.concatenate(parts), np.concatenate(offsets), np.concatenate(types)
+
+
+def _topology(mesh):
+    """The edges, the facets with their cells, and the point-cell incidence
+    of the cells of a ``PolyData`` or an ``UnstructuredGrid``"""
+    if isinstance(mesh, vtk.vtkPolyData):
+        if mesh.GetNumberOfPolys() == mesh.GetNumberOfCells():
+            cells, offset, types = mesh.faces, mesh.offset, None
+        else:
+            cells, offset, types = _poly_cells(mesh)
+    elif isinstance(mesh, vtk.vtkUnstructuredGrid):
+        cells, offset, types = mesh.cells, mesh.offset, mesh.celltypes
+    else:
+        raise TypeError('Adjacency requires a PolyData or UnstructuredGrid')
+    sizes = cells[offset]
+    if types is None:
+        groups = np.unique(sizes)
+        groups = [(None, n, np.nonzero(sizes == n)[0]) for n in groups]
+    else:
+        keys = np.unique(np.vstack((types, sizes)), axis=1)
+        groups = [(int(t), int(n), np.nonzero((types == t) & (sizes == n))[0])
+                  for t, n in keys.T]
+    edges, incidence, facets = [], [], []
+    max_facet = 1
+    for cell_type, n, ids in groups:
+        points = cells[offset[ids][:, None] + 1 + np.arange(n)]
+        incidence.append((points.ravel(), np.repeat(ids, n)))
+        dim, local_edges, local_facets = _local_topology(cell_type, n)
+        if local_edges:
+            edges.append(points[:, np.array(local_edges)].reshape((-1, 2)))
+        # group the facets by size to take them at once
+        by_size = {}
+        for facet in local_facets:
+            by_size.setdefault(len(facet), []).append(facet)
+        for size, local in by_size.items():
+            facet_points = points[:, np.array(local)].reshape((-1, size))
+            facet_cells = np.repeat(ids, len(local))
+            facets.append((np.sort(facet_points, axis=1), facet_cells))
+            max_facet = max(max_facet, size)
+    if edges:
+        edges = np.sort(np.vstack(edges), axis=1)
+        edges = edges[edges[:, 0] != edges[:, 1]]
+    else:
+        edges = np.empty((0, 2), dtype=cells.dtype)
+    point_ids = np.concatenate([p for p, _ in incidence]) if incidence else np.empty(0, int)
+    cell_ids = np.concatenate([c for _, c in incidence]) if incidence else np.empty(0, int)
+    # pad the facets to one width with -1
+    keys = np.full((sum(f.shape[0] for f, _ in facets), max_facet), -1,
+                   dtype=np.int64)
+    owners = np.empty(keys.shape[0], dtype=np.int64)
+    start = 0
+    for facet_points, facet_cells in facets:
+        stop = start + facet_points.shape[0]
+        keys[start:stop, -facet_points.shape[1]:] = facet_points
+        owners[start:stop] = facet_cells
+        start = stop
+    return {'n_points': mesh.n_points, 'n_cells': offset.size, 'edges': edges,
+            'incidence': (point_ids, cell_ids), 'facets': (keys, owners)}
+
+
+def _facet_groups(topology):
+    """The facets shared by cells: the owners of the facet occurrences
+    sorted by facet, and the number of occurrences of each facet"""
+    keys, owners = topology['facets']
+    if keys.shape[0] == 0:
+        return owners, np.empty(0, dtype=np.int64), keys
+    order = np.lexsort(keys.T[::-1])
+    keys = keys[order]
+    first = np.ones(keys.shape[0], dtype=bool)
+    first[1:] = np.any(keys[1:] != keys[:-1], axis=1)
+    first = np.nonzero(first)[0]
+    counts = np.diff(np.append(first, keys.shape[0]))
+    return owners[order], counts, keys[first]
+
+
+def get_facets(mesh):
+    """The cached facets of a mesh: the cells of the facet occurrences
+    sorted by facet, the number of cells of each facet, and the point ids of
+    each facet padded at the front with -1 to the width of the largest
+    facet.  The facets of a ``PolyData`` are the edges of its polygons and
+    the end points of its lines."""
+    return _memoize(mesh, 'facets',
+                    lambda mesh: _facet_groups(_memoize(mesh, 'topology', _topology)))
+
+
+def _build(mesh, kind):
+    """Build an adjacency of a mesh from its cached topology"""
+    topology = _memoize(mesh, 'topology', _topology)
+    n_points, n_cells = topology['n_points'], topology['n_cells']
+    if kind == 'point':
+        edges = topology['edges']
+        rows = np.concatenate((edges[:, 0], edges[:, 1]))
+        cols = np.concatenate((edges[:, 1], edges[:, 0]))
+        return _csr(rows, cols, (n_points, n_points))
+    elif kind == 'point_cell':
+        point_ids, cell_ids = topology['incidence']
+        return _csr(point_ids, cell_ids, (n_points, n_cells))
+    elif kind == 'cell':
+        owners, counts, _ = get_facets(mesh)
+        # all the pairs of cells within each group of equal facets
+        first = np.cumsum(counts) - counts
+        n_pairs = counts**2
+        group = np.repeat(np.arange(counts.size), n_pairs)
+        local = np.arange(n_pairs.sum()) - np.repeat(np.cumsum(n_pairs) - n_pairs, n_pairs)
+        rows = owners[first[group] + local // counts[group]]
+        cols = owners[first[group] + local % counts[group]]
+        keep = rows != cols
+        return _csr(rows[keep], cols[keep], (n_cells, n_cells))
+    raise RuntimeError('Adjacency kind ({}) not understood. Use "point", '
+                       '"point_cell", or "cell".'.format(kind))
+
+
+def get_adjacency(mesh, kind='point'):
+    """Get the cached adjacency of a mesh. See ``Common.adjacency``."""
+    return _memoize(mesh, kind, lambda mesh: _build(mesh, kind))
+
+
+def get_boundary(mesh):
+    """Get the boundary points and cells of a mesh. See
+    ``Common.get_boundary``."""
+    owners, counts, unique = get_facets(mesh)
+    # facets of a single cell are on the boundary
+    single = counts == 1
+    boundary = unique[single]
+    points = np.unique(boundary[boundary >= 0])
+    cells = np.unique(owners[(np.cumsum(counts) - counts)[single]])
+    return points, cells
@@ -0,0 +1,270 @@
+"""
+An opt-in memoization layer for the filters in :class:`vtki.DataSetFilters`.
+
+When enabled, the output of a filter is stored and reused whenever the same
+filter is called again with the same parameters on a dataset that has not
+been modified since. The cache is keyed on the dataset's identity, its VTK
+modified time (MTime), the name of the filter, and the normalized filter
+parameters. Outputs are evicted in least recently used order once the total
+size of the cached outputs exceeds a byte budget.
+
+Example
+-------
+
+>>> import vtki
+>>> from vtki import examples
+>>> dataset = examples.load_uniform()
+>>> vtki.filter_cache.enable(max_bytes=256 * 1024**2)
+>>> slc = dataset.slice()
+>>> slc = dataset.slice() # served from the cache
+>>> vtki.filter_cache.stats['hits']
+1
+>>> vtki.filter_cache.disable()
+
+"""
+import collections
+import contextlib
+import functools
+import hashlib
+import inspect
+import logging
+
+import numpy as np
+import vtk
+
+log = logging.getLogger(__name__)
+log.setLevel('CRITICAL')
+
+# Default budget of the cache: 512 MiB of filter outputs
+DEFAULT_MAX_BYTES = 512 * 1024**2
+
+
+class _Uncacheable(Exception):
+    """Raised when a filter parameter cannot be used in a cache key"""
+    pass
+
+
+def _freeze(value):
+    """Convert a filter parameter to a hashable representation"""
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, (int, float, np.number)):
+        # keep the type so that ``1``, ``1.0`` and ``True`` do not collide
+        return (type(value).__name__, value)
+    if isinstance(value, np.ndarray):
+        digest = hashlib.sha1(np.ascontiguousarray(value).view(np.uint8)).hexdigest()
+        return ('ndarray', value.shape, value.dtype.str, digest)
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, vtk.vtkObject):
+        return ('vtk', id(value), value.GetMTime())
+    try:
+        hash(value)
+    except TypeError:
+        raise _Uncacheable('Parameter ({}) is not hashable'.format(type(value)))
+    return value
+
+
+def _nbytes(data):
+    """Approximate memory footprint of a VTK data object in bytes"""
+    try:
+        return int(data.GetActualMemorySize()) * 1024
+    except AttributeError:
+        return 0
+
+
+def _shallow_copy(data):
+    """Shallow copy a filter output so that callers cannot alter the
+    structure of the cached object (e.g. by adding arrays)"""
+    import vtki
+    if isinstance(data, vtki.MultiBlock):
+        return vtki.MultiBlock(data)
+    if isinstance(data, vtki.Common):
+        return data.copy(deep=False)
+    return data
+
+
+class FilterCache(object):
+    """A least recently used cache of filter outputs bounded by the total
+    number of bytes of the cached outputs.
+
+    The cache is disabled by default. Use :func:`FilterCache.enable` to turn
+    it on for all of the filters in :class:`vtki.DataSetFilters`.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        The maximum total size of the cached filter outputs. Outputs larger
+        than this are never cached.
+
+    Note
+    ----
+    Cache invalidation relies on the dataset's VTK modified time. Editing
+    the NumPy views of a dataset's arrays in place does not update that time
+    (except for ``points``), so call ``dataset.Modified()`` after such edits.
+    The cached outputs are shared with the returned datasets through shallow
+    copies and should be treated as read-only.
+
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.enabled = False
+        self._entries = collections.OrderedDict()
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def enable(self, max_bytes=None):
+        """Turn on caching of filter outputs.
+
+        Parameters
+        ----------
+        max_bytes : int, optional
+            Update the maximum total size of the cached outputs.
+
+        """
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+            self._evict()
+        self.enabled = True
+
+    def disable(self, clear=True):
+        """Turn off caching of filter outputs and release the cached outputs
+        unless ``clear`` is ``False``"""
+        self.enabled = False
+        if clear:
+            self.clear()
+
+    @contextlib.contextmanager
+    def suspended(self):
+        """Bypass the cache within a ``with`` block, e.g. for the filters of
+        temporary datasets"""
+        enabled = self.enabled
+        self.enabled = False
+        try:
+            yield
+        finally:
+            self.enabled = enabled
+
+    def clear(self):
+        """Remove all cached outputs and reset the statistics"""
+        self._entries.clear()
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def stats(self):
+        """A dictionary of the cache hit/miss statistics and memory usage"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': float(self.hits) / total if total else 0.0,
+            'evictions': self.evictions,
+            'n_entries': len(self._entries),
+            'n_bytes': self.n_bytes,
+            'max_bytes': self.max_bytes,
+        }
+
+    def make_key(self, dataset, name, params):
+        """Build the cache key of a filter call. Returns ``None`` if any of the
+        parameters cannot be hashed."""
+        try:
+            frozen = _freeze(params)
+        except _Uncacheable as err:
+            log.debug(str(err))
+            return None
+        info = tuple(getattr(dataset, 'active_scalar_info', ()))
+        return (id(dataset), dataset.GetMTime(), info, name, frozen)
+
+    def get(self, key):
+        """Fetch a cached output and mark it as most recently used. Returns
+        ``None`` on a miss."""
+        try:
+            nbytes, output = self._entries.pop(key)
+        except KeyError:
+            self.misses += 1
+            return None
+        self._entries[key] = (nbytes, output)
+        self.hits += 1
+        return output
+
+    def put(self, key, output):
+        """Store a filter output and evict the least recently used outputs
+        until the cache fits in its budget"""
+        nbytes = _nbytes(output)
+        if nbytes > self.max_bytes:
+            return
+        if key in self._entries:
+            self.n_bytes -= self._entries.pop(key)[0]
+        self._entries[key] = (nbytes, output)
+        self.n_bytes += nbytes
+        self._evict()
+
+    def _evict(self):
+        """Drop least recently used outputs until within the byte budget"""
+        while self._entries and self.n_bytes > self.max_bytes:
+            _, (nbytes, _) = self._entries.popitem(last=False)
+            self.n_bytes -= nbytes
+            self.evictions += 1
+
+
+# The global cache used by all of the filters
+def _memoize(dataset, kind, build, key=None):
+    """Get a ``kind`` of data derived from a dataset by ``build(dataset)``,
+    rebuilding it only after the dataset has been modified, or only after
+    ``key(dataset)`` changed when a ``key`` is given.  The data is stored on
+    the dataset itself, apart from the filter cache."""
+    memo = dataset.__dict__.setdefault('_memoized', {})
+    mtime = dataset.GetMTime() if key is None else key(dataset)
+    if kind not in memo or memo[kind][0] != mtime:
+        memo[kind] = (mtime, build(dataset))
+    return memo[kind][1]
+
+
+def _is_memoized(dataset, kind, key=None):
+    """Whether ``_memoize`` holds an up to date ``kind`` of a dataset"""
+    memo = dataset.__dict__.get('_memoized', {})
+    mtime = dataset.GetMTime() if key is None else key(dataset)
+    return kind in memo and memo[kind][0] == mtime
+
+
+filter_cache = FilterCache()
+
+
+def cached_filter(func):
+    """Decorate a filter of :class:`vtki.DataSetFilters` so that its outputs
+    are memoized in :data:`vtki.filter_cache` when the cache is enabled"""
+    name = func.__name__
+    # the first argument of the filter is the dataset itself
+    argspec = getattr(inspect, 'getfullargspec', getattr(inspect, 'getargspec', None))
+    dataset_arg = argspec(func).args[0]
+
+    @functools.wraps(func)
+    def wrapper(dataset, *args, **kwargs):
+        if not filter_cache.enabled:
+            return func(dataset, *args, **kwargs)
+        params = inspect.getcallargs(func, dataset, *args, **kwargs)
+        params.pop(dataset_arg)
+        key = filter_cache.make_key(dataset, name, params)
+        if key is None:
+            return func(dataset, *args, **kwargs)
+        output = filter_cache.get(key)
+        if output is None:
+            output = func(dataset, *args, **kwargs)
+            filter_cache.put(key, output)
+        return _shallow_copy(output)
+
+    return wrapper
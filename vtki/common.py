@@ -13,6 +13,9 @@ import vtki
 from vtki.utilities import (get_scalar, POINT_DATA_FIELD, CELL_DATA_FIELD,
                             vtk_bit_array_to_char)
 from vtki import DataSetFilters
+from vtki.adjacency import get_adjacency, get_boundary
+from vtki.merging import points_within_radius
+from vtki.progress import update_algorithm
 
 log = logging.getLogger(__name__)
 log.setLevel('CRITICAL')
@@ -20,6 +23,13 @@ log.setLevel('CRITICAL')
 # vector array names
 DEFAULT_VECTOR_KEY = '_vectors'
 
+# The spatial locators that can be cached on a dataset
+LOCATORS = {
+    'point': vtk.vtkStaticPointLocator,
+    'cell': vtk.vtkStaticCellLocator,
+    'obb': vtk.vtkOBBTree,
+}
+
 
 class Common(DataSetFilters):
     """ Methods in common to grid and surface objects"""
@@ -132,7 +142,7 @@ class Common(DataSetFilters):
             return
 
         arrow = vtk.vtkArrowSource()
-        arrow.Update()
+        update_algorithm(arrow)
 
         alg = vtk.vtkGlyph3D()
         alg.SetSourceData(arrow.GetOutput())
@@ -140,7 +150,7 @@ class Common(DataSetFilters):
         alg.SetInputData(self)
         alg.SetVectorModeToUseVector()
         alg.SetScaleModeToScaleByVector()
-        alg.Update()
+        update_algorithm(alg)
         return vtki.wrap(alg.GetOutput())
 
     @property
@@ -648,6 +658,217 @@ class Common(DataSetFilters):
         # Use the array range
         return np.nanmin(arr), np.nanmax(arr)
 
+    def get_data_percentile(self, percent, arr=None, preference='cell', exact=True):
+        """Compute percentiles of a named array's values. The array is
+        summarized by a quantile sketch that is cached with the array so
+        that repeated calls do not need to sort the values.
+
+        Parameters
+        ----------
+        percent : float or iterable(float)
+            The percentiles to compute between 0 and 100
+
+        arr : str, optional
+            The name of the array. Defaults to the active scalars.
+
+        preference : str, optional
+            When both point and cell data have an array of that name, this is
+            the field to use. Must be either 'point' or 'cell'.
+
+        exact : bool, optional
+            When False, return the estimates of the cached sketch rather than
+            refining them to the exact percentiles with a pass over the
+            array's values.
+
+        """
+        if arr is None:
+            # use active scalar array
+            _, arr = self.active_scalar_info
+        return vtki.sketch.get_percentile(self, arr, percent,
+                                          preference=preference, exact=exact)
+
+    def _get_geometry(self):
+        """Get a copy of the points and cells of this dataset, without its
+        data but with the ids of its points and cells, on which the locators
+        are built so that they do not hold a reference to the dataset. The
+        copy is made on first use and again only after the points or the
+        cells of the dataset have been modified."""
+        cached = self.__dict__.get('_geometry')
+        key = _geometry_key(self)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        geometry = self.NewInstance()
+        geometry.CopyStructure(self)
+        for attributes, n_ids, name in [
+                (geometry.GetPointData(), self.GetNumberOfPoints(), 'vtkOriginalPointIds'),
+                (geometry.GetCellData(), self.GetNumberOfCells(), 'vtkOriginalCellIds')]:
+            # ids as doubles, as integer ids are not interpolated by VTK
+            ids = numpy_to_vtk(np.arange(n_ids, dtype=np.float64), deep=True)
+            ids.SetName(name)
+            attributes.AddArray(ids)
+        self.__dict__['_geometry'] = (key, geometry)
+        self.__dict__['_locators'] = {}
+        return geometry
+
+    def _get_locator(self, kind):
+        """Get a spatial locator of this dataset. The locator is built on a
+        copy of the geometry of the dataset on first use and rebuilt only
+        after the points or the cells of the dataset have been modified.
+
+        Parameters
+        ----------
+        kind : str
+            The kind of locator: ``'point'``, ``'cell'``, or ``'obb'``.
+
+        """
+        geometry = self._get_geometry()
+        locators = self.__dict__['_locators']
+        if kind in locators:
+            return locators[kind]
+        if kind == 'point' and not isinstance(self, vtk.vtkPointSet):
+            # The static point locator does not support implicit points
+            locator = vtk.vtkPointLocator()
+        else:
+            locator = LOCATORS[kind]()
+        locator.SetDataSet(geometry)
+        locator.BuildLocator()
+        locators[kind] = locator
+        return locator
+
+    def find_closest_point(self, points):
+        """Find the index of the closest point of this dataset to each of the
+        given points. The points are found at once by VTK with the cached
+        point locator.
+
+        Parameters
+        ----------
+        points : np.ndarray
+            A single point ``(x, y, z)`` or an (N, 3) array of points.
+
+        Returns
+        -------
+        index : int or np.ndarray
+            The index of the closest point in this dataset for each point.
+
+        """
+        points, single = _as_query_points(points)
+        if not self.n_points:
+            raise RuntimeError('The dataset has no points.')
+        alg = vtk.vtkPointInterpolator()
+        alg.SetInputData(vtki.PolyData(points))
+        alg.SetSourceData(self._get_geometry())
+        alg.SetLocator(self._get_locator('point'))
+        alg.SetKernel(vtk.vtkVoronoiKernel())
+        alg.PassPointArraysOff()
+        alg.PassCellArraysOff()
+        update_algorithm(alg)
+        ids = alg.GetOutput().GetPointData().GetArray('vtkOriginalPointIds')
+        index = vtk_to_numpy(ids).astype(vtki.ID_TYPE)
+        return index[0] if single else index
+
+    def find_containing_cell(self, points):
+        """Find the index of the cell of this dataset that contains each of
+        the given points. The cells are found at once by probing the cached
+        copy of the geometry of the dataset.
+
+        Parameters
+        ----------
+        points : np.ndarray
+            A single point ``(x, y, z)`` or an (N, 3) array of points.
+
+        Returns
+        -------
+        index : int or np.ndarray
+            The index of the containing cell for each point. The index is
+            ``-1`` where a point is not within any cell.
+
+        """
+        points, single = _as_query_points(points)
+        alg = vtk.vtkProbeFilter()
+        alg.SetInputData(vtki.PolyData(points))
+        alg.SetSourceData(self._get_geometry())
+        alg.PassPointArraysOff()
+        alg.PassCellArraysOff()
+        alg.ComputeToleranceOff()
+        alg.SetTolerance(1e-9 * self.GetLength())
+        update_algorithm(alg)
+        output = alg.GetOutput().GetPointData()
+        index = vtk_to_numpy(output.GetArray('vtkOriginalCellIds')).astype(vtki.ID_TYPE)
+        valid = vtk_to_numpy(output.GetArray(alg.GetValidPointMaskArrayName()))
+        index[valid == 0] = -1
+        return index[0] if single else index
+
+    def points_within_radius(self, points, radius):
+        """Find the indices of this dataset's points that are within a
+        radius of each of the given points. The points are found at once by
+        hashing them into a grid of cells as large as the radius.
+
+        Parameters
+        ----------
+        points : np.ndarray
+            A single point ``(x, y, z)`` or an (N, 3) array of points.
+
+        radius : float
+            The search radius.
+
+        Returns
+        -------
+        index : np.ndarray or list(np.ndarray)
+            The sorted indices of the points within the radius of each point.
+
+        """
+        points, single = _as_query_points(points)
+        index = [ind.astype(vtki.ID_TYPE) for ind in
+                 points_within_radius(vtki.filters._dataset_points(self),
+                                      points, radius)]
+        return index[0] if single else index
+
+    def adjacency(self, kind='point'):
+        """The adjacency of the points and cells of a ``PolyData`` or an
+        ``UnstructuredGrid`` in compressed sparse row form.  Built from the
+        connectivity on first use and rebuilt only after the mesh has been
+        modified.  The cells of a ``PolyData`` are its verts, lines and
+        faces, numbered like VTK; meshes of triangle strips are not
+        supported.
+
+        Parameters
+        ----------
+        kind : str, optional
+            ``'point'`` for the points that share an edge, ``'point_cell'``
+            for the cells of each point, or ``'cell'`` for the cells that
+            share a facet (a face of 3D cells or an edge of 2D cells).
+
+        Returns
+        -------
+        adjacency : vtki.Adjacency
+            Supports k-ring queries, connected components and export to a
+            SciPy sparse matrix.
+
+        Examples
+        --------
+        >>> import vtki
+        >>> sphere = vtki.Sphere()
+        >>> sphere.adjacency('point')[0].size
+        30
+
+        """
+        return get_adjacency(self, kind)
+
+    def get_boundary(self):
+        """The points and cells on the boundary of a ``PolyData`` or an
+        ``UnstructuredGrid``, i.e. on a facet that belongs to a single cell.
+
+        Returns
+        -------
+        points : np.ndarray
+            The sorted indices of the boundary points.
+
+        cells : np.ndarray
+            The sorted indices of the cells with a boundary facet.
+
+        """
+        return get_boundary(self)
+
     def get_scalar(self, name, preference='cell', info=False):
         """ Searches both point and cell data for an array """
         return get_scalar(self, name, preference=preference, info=info)
@@ -823,6 +1044,42 @@ class PointScalarsDict(dict):
         return dict.__delitem__(self, key)
 
 
+def _geometry_key(dataset):
+    """The modification times, or the parameters, of the points and of the
+    cells of a dataset, which change with its geometry but not with its
+    data"""
+    if isinstance(dataset, vtk.vtkImageData):
+        return (dataset.GetExtent(), dataset.GetOrigin(), dataset.GetSpacing())
+    if isinstance(dataset, vtk.vtkRectilinearGrid):
+        coords = [dataset.GetXCoordinates(), dataset.GetYCoordinates(),
+                  dataset.GetZCoordinates()]
+        return (dataset.GetExtent(),) + tuple(c.GetMTime() for c in coords)
+    objects = []
+    if isinstance(dataset, vtk.vtkPointSet) and dataset.GetPoints() is not None:
+        objects += [dataset.GetPoints(), dataset.GetPoints().GetData()]
+    if isinstance(dataset, vtk.vtkPolyData):
+        for cells in [dataset.GetVerts(), dataset.GetLines(),
+                      dataset.GetPolys(), dataset.GetStrips()]:
+            objects += [cells, cells.GetData()]
+    elif isinstance(dataset, vtk.vtkUnstructuredGrid):
+        objects += [dataset.GetCells(), dataset.GetCellTypesArray(),
+                    dataset.GetFaces()]
+    elif isinstance(dataset, vtk.vtkStructuredGrid):
+        return (dataset.GetExtent(),) + tuple(obj.GetMTime() for obj in objects)
+    else:
+        return (dataset.GetMTime(),)
+    return tuple(None if obj is None else obj.GetMTime() for obj in objects)
+
+
+def _as_query_points(points):
+    """Cast a single point or an array of points to an (N, 3) array of
+    floats and flag whether a single point was given"""
+    points = np.asarray(points, dtype=np.float64)
+    single = points.ndim == 1
+    points = points.reshape((-1, 3))
+    return points, single
+
+
 def axis_rotation(p, ang, inplace=False, deg=True, axis='z'):
     """ Rotates points p angle ang (in deg) about an axis """
     axis = axis.lower()
@@ -869,13 +1126,34 @@ class vtki_ndarray(np.ndarray):
 
     def __new__(cls, input_array, proxy):
         obj = np.asarray(input_array).view(cls)
-        cls.proxy = proxy
+        obj.proxy = proxy
         return obj
 
     def __array_finalize__(self, obj):
         if obj is None: return
+        self.proxy = getattr(obj, 'proxy', None)
 
     def __setitem__(self, coords, value):
         """ Update the array and update the vtk object """
         super(vtki_ndarray, self).__setitem__(coords, value)
-        self.proxy.Modified()
+        if self.proxy is not None:
+            self.proxy.Modified()
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """ Apply a ufunc and update the vtk object of any array written in
+        place, e.g. by ``points *= 2`` """
+        outputs = kwargs.get('out', ())
+        inputs = [np.asarray(x) if isinstance(x, vtki_ndarray) else x
+                  for x in inputs]
+        if outputs:
+            kwargs['out'] = tuple(np.asarray(x) if isinstance(x, vtki_ndarray)
+                                  else x for x in outputs)
+        result = getattr(ufunc, method)(*inputs, **kwargs)
+        for output in outputs:
+            if isinstance(output, vtki_ndarray) and output.proxy is not None:
+                output.proxy.Modified()
+        if outputs:
+            return outputs[0] if len(outputs) == 1 else outputs
+        if isinstance(result, np.ndarray):
+            return result.view(vtki_ndarray)
+        return result
@@ -18,6 +18,7 @@ log.setLevel('CRITICAL')
 import vtki
 from vtki.utilities import wrap, is_vtki_obj, get_scalar
 from vtki import plot
+from vtki.progress import update_algorithm
 
 
 class MultiBlock(vtkMultiBlockDataSet):
@@ -60,7 +61,7 @@ class MultiBlock(vtkMultiBlockDataSet):
         """
         gf = vtk.vtkCompositeDataGeometryFilter()
         gf.SetInputData(self)
-        gf.Update()
+        update_algorithm(gf)
         return wrap(gf.GetOutputDataObject(0))
 
     def combine(self, merge_points=False):
@@ -69,15 +70,23 @@ class MultiBlock(vtkMultiBlockDataSet):
         Parameters
         ----------
         merge_points : bool, optional
-            Merge coincidental points.
+            Merge coincidental points.  See ``vtki.merge_points``.
 
         """
         alg = vtk.vtkAppendFilter()
         for block in self:
             alg.AddInputData(block)
-        alg.SetMergePoints(merge_points)
-        alg.Update()
-        return wrap(alg.GetOutputDataObject(0))
+        update_algorithm(alg)
+        combined = wrap(alg.GetOutputDataObject(0))
+        if merge_points and combined.GetFaces() is None:
+            # merged points take the point data of the last of their points
+            # like in vtkAppendFilter
+            return vtki.merge_points(combined, point_data='last')[0]
+        elif merge_points:
+            alg.SetMergePoints(True)
+            update_algorithm(alg)
+            return wrap(alg.GetOutputDataObject(0))
+        return combined
 
 
     def _load_file(self, filename):
@@ -101,7 +110,7 @@ class MultiBlock(vtkMultiBlockDataSet):
 
         # Load file
         reader.SetFileName(filename)
-        reader.Update()
+        update_algorithm(reader)
         self.ShallowCopy(reader.GetOutput())
 
         # sanity check
@@ -143,7 +152,7 @@ class MultiBlock(vtkMultiBlockDataSet):
             writer.SetDataModeToBinary()
         else:
             writer.SetDataModeToAscii()
-        writer.Write()
+        update_algorithm(writer)
         return
 
     @property
@@ -208,6 +217,16 @@ class MultiBlock(vtkMultiBlockDataSet):
         return mini, maxi
 
 
+    def get_data_percentile(self, percent, arr, preference='cell', exact=True):
+        """Compute percentiles of a named array across all blocks. The
+        sketch of each block's array is cached with that array and the
+        sketches are merged. The arguments are those of
+        :func:`vtki.Common.get_data_percentile`, the name of the array being
+        required."""
+        return vtki.sketch.get_percentile(self, arr, percent,
+                                          preference=preference, exact=exact)
+
+
     def get_index_by_name(self, name):
         """Find the index number by block name"""
         for i in range(self.n_blocks):
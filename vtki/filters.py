@@ -27,9 +27,14 @@ import collections
 import logging
 import numpy as np
 import vtk
+from vtk.util.numpy_support import vtk_to_numpy, numpy_to_vtk
+from vtk.util.numpy_support import numpy_to_vtkIdTypeArray
 
 import vtki
-from vtki.utilities import get_scalar, wrap, is_inside_bounds
+from vtki.cache import cached_filter
+from vtki.progress import update_algorithm
+from vtki.utilities import get_scalar, wrap, is_inside_bounds, CELL_DATA_FIELD
+from vtki.utilities import vtk_points
 
 NORMALS = {
     'x': [1, 0, 0],
@@ -60,12 +65,569 @@ def _generate_plane(normal, origin):
     return plane
 
 
+# Maps the cell types present in a vtkPolyData to its vertex, line, polygon,
+# and triangle strip cell arrays (in the order of the PolyData's cell ids)
+_POLY_CELL_CATEGORY = np.zeros(vtk.VTK_QUAD + 1, dtype=np.int8)
+_POLY_CELL_CATEGORY[[vtk.VTK_VERTEX, vtk.VTK_POLY_VERTEX]] = 0
+_POLY_CELL_CATEGORY[[vtk.VTK_LINE, vtk.VTK_POLY_LINE]] = 1
+_POLY_CELL_CATEGORY[[vtk.VTK_TRIANGLE, vtk.VTK_POLYGON, vtk.VTK_PIXEL,
+                     vtk.VTK_QUAD]] = 2
+_POLY_CELL_CATEGORY[vtk.VTK_TRIANGLE_STRIP] = 3
+
+
+def _take_attributes(source, target, ind):
+    """Copy the tuples ``ind`` of every array in a ``vtkDataSetAttributes``
+    into another, preserving the active attributes"""
+    for i in range(source.GetNumberOfArrays()):
+        vtkarr = source.GetArray(i)
+        if vtkarr is None:
+            # Not a numeric array (e.g. a vtkStringArray)
+            continue
+        if isinstance(vtkarr, vtk.vtkBitArray):
+            vtkarr = vtki.vtk_bit_array_to_char(vtkarr)
+        arr = vtk_to_numpy(vtkarr)
+        newarr = numpy_to_vtk(np.ascontiguousarray(arr[ind]), deep=True,
+                              array_type=vtkarr.GetDataType())
+        newarr.SetName(source.GetArrayName(i))
+        target.AddArray(newarr)
+    for attr in range(vtk.vtkDataSetAttributes.NUM_ATTRIBUTES):
+        vtkarr = source.GetAbstractAttribute(attr)
+        if vtkarr is not None and vtkarr.GetName() is not None:
+            target.SetActiveAttribute(vtkarr.GetName(), attr)
+
+
+def _cell_starts(cells):
+    """Indices of the size entries of a flat VTK cell array.
+
+    The cells are ``[n0, id, ..., n1, id, ...]``. Arrays of cells of a single
+    size are checked with one strided comparison. Otherwise each entry ``i``
+    points to the entry ``i + cells[i] + 1`` that would follow it if it were
+    the size of a cell, and the chain of cells from the first entry is found
+    by pointer doubling: the starts within ``2**k`` cells of the first one
+    are those within ``2**(k - 1)`` cells and the entries ``2**(k - 1)`` cells
+    after them, and squaring the pointers doubles the jump.
+
+    Raises a ``ValueError`` if the sizes do not exactly span the array.
+    """
+    size = cells.size
+    if size == 0:
+        return np.empty(0, dtype=np.intp)
+    step = int(cells[0]) + 1
+    if step > 1 and size % step == 0 and np.all(cells[::step] == step - 1):
+        return np.arange(0, size, step)
+
+    # the entry after each cell, the end of the array ``size`` past the last
+    # cell and ``size + 1`` past a malformed cell, which both point to
+    # themselves
+    dtype = np.int32 if size < np.iinfo(np.int32).max - 2 else np.intp
+    jump = np.arange(1, size + 1, dtype=dtype) + \
+        np.clip(cells, -1, size).astype(dtype)
+    jump[(cells < 1) | (jump > size)] = size + 1
+    jump = np.append(jump, np.array([size, size + 1], dtype=dtype))
+    starts = np.zeros(1, dtype=dtype)
+    while True:
+        after = jump[starts]
+        starts = np.append(starts, after[after < size])
+        if jump[0] >= size:
+            break
+        jump = jump[jump]
+    starts = np.sort(starts).astype(np.intp)
+    last = starts[-1]
+    if cells[last] < 1 or last + cells[last] + 1 != size:
+        raise ValueError('Malformed cell array: the cell sizes do not match '
+                         'the length of the array.')
+    return starts
+
+
+def _grid_cells(grid):
+    """The padded cell array of an UnstructuredGrid and the start of each
+    cell in it.  The cell locations of VTK 9 index its connectivity array
+    instead, so the starts are found in the padded cells."""
+    if isinstance(grid, vtki.UnstructuredGrid):
+        return grid.cells, grid.offset
+    cells = vtk_to_numpy(grid.GetCells().GetData())
+    return cells, _cell_starts(cells)
+
+
+def _take_cells(cells, offset, ind):
+    """Gather the cells ``ind`` from a padded connectivity array (as in a
+    ``vtkCellArray``) given the location of each cell.
+
+    Returns the padded connectivity of the selected cells, the size of each
+    selected cell (including its point count), and a mask of the entries of
+    the connectivity that are point ids.
+    """
+    size = cells[offset[ind]] + 1
+    local = np.arange(size.sum()) - np.repeat(np.cumsum(size) - size, size)
+    conn = cells[np.repeat(offset[ind], size) + local]
+    return conn, size, local != 0
+
+
+def _split_poly_data(poly, labels, n_labels, point_labels=False):
+    """Split a PolyData into ``n_labels`` PolyData by an integer label given
+    for each cell. Cells, points, and their arrays are compacted with NumPy
+    so that the input is only traversed once regardless of ``n_labels``.
+
+    If ``point_labels`` is True, ``labels`` are given for each point and a
+    cell takes the label of its first point.
+    """
+    if poly.GetNumberOfCells() < 1:
+        return [vtki.PolyData() for _ in range(n_labels)]
+    # Let VTK gather the padded connectivity, offsets, and cell types of a
+    # geometry-only copy of the input rather than looping over cells in Python
+    geom = vtk.vtkPolyData()
+    geom.ShallowCopy(poly)
+    geom.GetPointData().Initialize()
+    geom.GetCellData().Initialize()
+    alg = vtk.vtkAppendFilter()
+    alg.AddInputData(geom)
+    update_algorithm(alg)
+    ugrid = alg.GetOutput()
+    cells, offset = _grid_cells(ugrid)
+    category = _POLY_CELL_CATEGORY[vtk_to_numpy(ugrid.GetCellTypesArray())]
+    points = vtk_to_numpy(poly.GetPoints().GetData())
+    if point_labels:
+        labels = labels[cells[offset + 1]]
+
+    # group the cell ids of each label in ascending order
+    order = np.argsort(labels, kind='mergesort')
+    bounds = np.searchsorted(labels[order], np.arange(n_labels + 1))
+
+    output = []
+    for i in range(n_labels):
+        ind = order[bounds[i]:bounds[i+1]]
+        conn, size, is_pid = _take_cells(cells, offset, ind)
+        # renumber the points used by these cells
+        used, conn[is_pid] = np.unique(conn[is_pid], return_inverse=True)
+
+        pdata = vtk.vtkPolyData()
+        pdata.SetPoints(vtki.vtk_points(points[used]))
+        # cell ids are ordered as verts, lines, polys, and then strips
+        cat_bounds = np.searchsorted(category[ind], np.arange(5))
+        conn_bounds = np.append(np.cumsum(size) - size, conn.size)[cat_bounds]
+        setters = [pdata.SetVerts, pdata.SetLines, pdata.SetPolys, pdata.SetStrips]
+        for j, setter in enumerate(setters):
+            ncells = cat_bounds[j+1] - cat_bounds[j]
+            if ncells:
+                part = conn[conn_bounds[j]:conn_bounds[j+1]]
+                vtkcells = vtk.vtkCellArray()
+                vtkcells.SetCells(ncells, numpy_to_vtkIdTypeArray(part, deep=True))
+                setter(vtkcells)
+        _take_attributes(poly.GetPointData(), pdata.GetPointData(), used)
+        _take_attributes(poly.GetCellData(), pdata.GetCellData(), ind)
+        output.append(vtki.PolyData(pdata))
+    return output
+
+
+def _slice_planes(dataset, normal, origins, generate_triangles=False):
+    """Slice a dataset by many parallel planes in a single traversal.
+
+    The planes share the ``normal`` direction and pass through each of the
+    ``origins``. A single ``vtkCutter`` contours the plane's implicit
+    function at every plane offset at once and the combined output is then
+    split into one PolyData per plane.
+    """
+    if isinstance(normal, str):
+        normal = NORMALS[normal.lower()]
+    normal = np.array(normal, dtype=float)
+    normal /= np.linalg.norm(normal)
+    center = np.array(dataset.center)
+    values = np.dot(np.asarray(origins, dtype=float) - center, normal)
+    # coincident planes are only cut once
+    values, inverse = np.unique(values, return_inverse=True)
+
+    alg = vtk.vtkCutter()
+    alg.SetInputDataObject(dataset)
+    alg.SetCutFunction(_generate_plane(normal, center))
+    if not generate_triangles:
+        alg.GenerateTrianglesOff()
+
+    def cut(values):
+        alg.SetNumberOfContours(len(values))
+        for i, value in enumerate(values):
+            alg.SetValue(i, value)
+        update_algorithm(alg)
+        return _get_output(alg)
+
+    if len(values) == 1:
+        slices = [cut(values)]
+    elif isinstance(dataset, vtk.vtkImageData) and not generate_triangles:
+        # VTK only keeps the quadrilaterals of an image cut for a single
+        # contour value, so cut these planes one at a time
+        slices = [cut([value]) for value in values]
+    else:
+        combined = cut(values)
+        # Each output point lies on exactly one of the planes: label the
+        # points by their nearest plane offset
+        labels = np.zeros(combined.n_points, dtype=np.int64)
+        if combined.n_points:
+            dist = np.dot(combined.points - center, normal)
+            labels = np.searchsorted((values[1:] + values[:-1]) / 2.0, dist)
+        slices = _split_poly_data(combined, labels, len(values), point_labels=True)
+    output = []
+    for i in inverse:
+        slc = slices[i]
+        if any(slc is other for other in output):
+            slc = slc.copy()
+        slc.copy_meta_from(dataset)
+        output.append(slc)
+    return output
+
+
+
+# The number of points of the linear cell types that are measured with NumPy
+_LINEAR_CELL_SIZES = {
+    vtk.VTK_VERTEX: 1,
+    vtk.VTK_LINE: 2,
+    vtk.VTK_TRIANGLE: 3,
+    vtk.VTK_PIXEL: 4,
+    vtk.VTK_QUAD: 4,
+    vtk.VTK_TETRA: 4,
+    vtk.VTK_VOXEL: 8,
+    vtk.VTK_HEXAHEDRON: 8,
+}
+
+# The decomposition of a hexahedron into tetrahedra used by VTK
+_HEXAHEDRON_TETRA = [(0, 1, 3, 4), (1, 2, 3, 6), (1, 4, 5, 6), (3, 4, 6, 7),
+                     (1, 3, 4, 6)]
+
+
+def _linear_cell_groups(dataset):
+    """Group the cells of a dataset made only of linear cells by cell type.
+
+    Returns a list of the cell type, the indices of the cells and the (N, k)
+    point indices of the cells for each type or ``None`` when the dataset
+    has cells that must be measured by VTK.
+    """
+    if isinstance(dataset, vtk.vtkUnstructuredGrid):
+        if dataset.GetFaces() is not None or dataset.GetNumberOfCells() == 0:
+            return None
+        cells, locations = _grid_cells(dataset)
+        celltypes = vtk_to_numpy(dataset.GetCellTypesArray())
+        groups = []
+        for celltype in np.unique(celltypes):
+            if celltype not in _LINEAR_CELL_SIZES:
+                return None
+            ind = np.nonzero(celltypes == celltype)[0]
+            columns = np.arange(1, _LINEAR_CELL_SIZES[celltype] + 1)
+            groups.append((celltype, ind, cells[locations[ind, None] + columns]))
+        return groups
+    if isinstance(dataset, vtk.vtkPolyData):
+        if dataset.GetNumberOfCells() == 0 or \
+           dataset.GetNumberOfCells() != dataset.GetNumberOfPolys():
+            return None
+        cells = vtk_to_numpy(dataset.GetPolys().GetData())
+        size = cells[0]
+        # Only meshes of all triangles or all quads have fixed size records
+        if size not in (3, 4) or cells.size != dataset.GetNumberOfCells() * (size + 1) \
+           or np.any(cells[::size + 1] != size):
+            return None
+        celltype = vtk.VTK_TRIANGLE if size == 3 else vtk.VTK_QUAD
+        ids = cells.reshape((-1, size + 1))[:, 1:]
+        return [(celltype, np.arange(ids.shape[0]), ids)]
+    return None
+
+
+def _tetra_volumes(a, b, c, d):
+    """The signed volumes of tetrahedra with corners given as (N, 3) arrays"""
+    return np.einsum('ij,ij->i', np.cross(b - a, c - a), d - a) / 6.0
+
+
+def _linear_cell_sizes(points, celltype, ids):
+    """Compute the length, area, and volume of a group of linear cells of
+    the same type like ``vtkCellSizeFilter``"""
+    pts = [points[ids[:, i]] for i in range(ids.shape[1])]
+    zeros = np.zeros(ids.shape[0])
+    length, area, volume = zeros, zeros, zeros
+    if celltype == vtk.VTK_LINE:
+        length = np.linalg.norm(pts[1] - pts[0], axis=1)
+    elif celltype == vtk.VTK_TRIANGLE:
+        area = 0.5 * np.linalg.norm(np.cross(pts[1] - pts[0], pts[2] - pts[0]), axis=1)
+    elif celltype in (vtk.VTK_QUAD, vtk.VTK_PIXEL):
+        # The vector area of a quadrilateral is half the cross product of
+        # its diagonals. Pixel points are ordered along X then Y.
+        if celltype == vtk.VTK_PIXEL:
+            pts[2], pts[3] = pts[3], pts[2]
+        area = 0.5 * np.linalg.norm(np.cross(pts[2] - pts[0], pts[3] - pts[1]), axis=1)
+    elif celltype == vtk.VTK_TETRA:
+        volume = _tetra_volumes(*pts)
+    elif celltype == vtk.VTK_VOXEL:
+        volume = np.prod([np.linalg.norm(pts[i] - pts[0], axis=1) for i in (1, 2, 4)], axis=0)
+    elif celltype == vtk.VTK_HEXAHEDRON:
+        volume = sum(_tetra_volumes(*[pts[i] for i in tet]) for tet in _HEXAHEDRON_TETRA)
+    return length, area, volume
+
+
+def _linear_cell_centers(dataset, groups):
+    """The centers of the cells of a dataset grouped by
+    ``_linear_cell_groups``. The parametric center of a linear cell is the
+    mean of its points."""
+    points = vtk_to_numpy(dataset.GetPoints().GetData())
+    centers = np.empty((dataset.GetNumberOfCells(), 3))
+    for _, ind, ids in groups:
+        total = points[ids[:, 0]].astype(np.float64)
+        for i in range(1, ids.shape[1]):
+            total += points[ids[:, i]]
+        centers[ind] = total / ids.shape[1]
+    return centers
+
+
+def _cell_centers(dataset):
+    """The centers of the cells of a dataset as a NumPy array"""
+    groups = _linear_cell_groups(dataset)
+    if groups is not None:
+        return _linear_cell_centers(dataset, groups)
+    alg = vtk.vtkCellCenters()
+    alg.SetInputDataObject(dataset)
+    alg.VertexCellsOff()
+    update_algorithm(alg)
+    return vtk_to_numpy(alg.GetOutput().GetPoints().GetData())
+
+
+def _extract_grid_cells(grid, mask, return_points=False):
+    """Compact the cells of an UnstructuredGrid where ``mask`` is ``True``
+    and the points they use into a new UnstructuredGrid with NumPy.
+    Optionally also return the indices of the points that were kept."""
+    ind = np.nonzero(mask)[0]
+    cells, offset = _grid_cells(grid)
+    types = vtk_to_numpy(grid.GetCellTypesArray())
+    conn, size, is_pid = _take_cells(cells, offset, ind)
+    # renumber the points used by the kept cells
+    pids = conn[is_pid]
+    used = np.zeros(grid.GetNumberOfPoints(), dtype=bool)
+    used[pids] = True
+    point_ind = np.nonzero(used)[0]
+    conn[is_pid] = (np.cumsum(used) - 1)[pids]
+
+    vtkcells = vtk.vtkCellArray()
+    vtkcells.SetCells(ind.size, numpy_to_vtkIdTypeArray(conn, deep=True))
+    vtktypes = numpy_to_vtk(types[ind], deep=True,
+                            array_type=vtk.VTK_UNSIGNED_CHAR)
+    vtkoffset = numpy_to_vtkIdTypeArray(np.cumsum(size) - size, deep=True)
+    output = vtk.vtkUnstructuredGrid()
+    output.SetPoints(vtki.vtk_points(vtk_to_numpy(grid.GetPoints().GetData())[point_ind]))
+    output.SetCells(vtktypes, vtkoffset, vtkcells)
+    _take_attributes(grid.GetPointData(), output.GetPointData(), point_ind)
+    _take_attributes(grid.GetCellData(), output.GetCellData(), ind)
+    output = vtki.UnstructuredGrid(output)
+    output.copy_meta_from(grid)
+    if return_points:
+        return output, point_ind
+    return output
+
+
+def _extract_cells(dataset, mask):
+    """Extract the whole cells of a dataset where the boolean ``mask`` is
+    ``True`` as an UnstructuredGrid"""
+    if isinstance(dataset, vtk.vtkUnstructuredGrid) and dataset.GetFaces() is None \
+            and dataset.GetNumberOfCells() > 0:
+        return _extract_grid_cells(dataset, mask)
+    # Let a threshold on the mask build the connectivity of other datasets
+    name = '__vtki_cell_mask'
+    data = dataset.copy(deep=False)
+    vtkarr = numpy_to_vtk(np.asarray(mask, dtype=np.uint8), deep=True)
+    vtkarr.SetName(name)
+    data.GetCellData().AddArray(vtkarr)
+    alg = vtk.vtkThreshold()
+    alg.SetInputDataObject(data)
+    alg.SetInputArrayToProcess(0, 0, 0, vtk.vtkDataObject.FIELD_ASSOCIATION_CELLS, name)
+    alg.ThresholdByUpper(0.5)
+    update_algorithm(alg)
+    output = _get_output(alg)
+    output.GetCellData().RemoveArray(name)
+    return output
+
+
+def _to_point_set(dataset):
+    """Convert image or rectilinear data to a ``StructuredGrid`` with
+    explicit points that shares the arrays of the input"""
+    if isinstance(dataset, vtk.vtkImageData):
+        alg = vtk.vtkImageDataToPointSet()
+    else:
+        alg = vtk.vtkRectilinearGridToPointSet()
+    alg.SetInputDataObject(dataset)
+    update_algorithm(alg)
+    return _get_output(alg)
+
+
+def _dataset_points(dataset):
+    """Get the points of any dataset as an (N, 3) array in VTK's order"""
+    if isinstance(dataset, vtk.vtkPointSet):
+        return vtk_to_numpy(dataset.GetPoints().GetData())
+    return vtk_to_numpy(_to_point_set(dataset).GetPoints().GetData())
+
+
+def _probe(dataset, target, tolerance=None):
+    """Probe a dataset at the points of a target dataset and return the
+    sampled point arrays as a list of names and arrays"""
+    alg = vtk.vtkProbeFilter()
+    alg.SetInputData(target)
+    alg.SetSourceData(dataset)
+    alg.PassPointArraysOff()
+    alg.PassCellArraysOff()
+    if tolerance is not None:
+        alg.ComputeToleranceOff()
+        alg.SetTolerance(tolerance)
+    update_algorithm(alg)
+    pdata = alg.GetOutput().GetPointData()
+    return [(pdata.GetArrayName(i), vtk_to_numpy(pdata.GetArray(i)))
+            for i in range(pdata.GetNumberOfArrays())
+            if pdata.GetArray(i) is not None]
+
+
+def _probe_points(dataset, points, tolerance=None, chunk_size=65536):
+    """Probe a dataset at an (N, 3) array of points in chunks of points.
+
+    The chunks are probed one after the other so that the locator, the
+    links, and the cells that VTK builds for the dataset on first use are
+    built once and shared by all of the chunks.
+
+    Returns a dictionary of the sampled arrays including the
+    ``'vtkValidPointMask'`` array.
+    """
+    chunks = []
+    for start in range(0, points.shape[0], chunk_size):
+        pts = vtk.vtkPoints()
+        pts.SetData(numpy_to_vtk(points[start:start + chunk_size], deep=True))
+        chunk = vtk.vtkPolyData()
+        chunk.SetPoints(pts)
+        chunks.append(_probe(dataset, chunk, tolerance))
+
+    arrays = collections.OrderedDict()
+    if not chunks:
+        return arrays
+    for i, (name, _) in enumerate(chunks[0]):
+        arrays[name] = np.concatenate([chunk[i][1] for chunk in chunks])
+    return arrays
+
+
+def _blank_cells(dataset, mask):
+    """Copy a structured dataset to a ``StructuredGrid`` that shares its
+    arrays and hide the cells where ``mask`` is ``False`` by marking them in
+    the ghost array.
+
+    VTK only honors hidden cells of ``vtkStructuredGrid`` objects, so image
+    and rectilinear data are given explicit points.
+    """
+    if isinstance(dataset, vtk.vtkStructuredGrid):
+        output = dataset.copy(deep=False)
+    elif isinstance(dataset, (vtk.vtkImageData, vtk.vtkRectilinearGrid)):
+        output = _to_point_set(dataset)
+    else:
+        raise TypeError('Only structured datasets can be blanked, not ({}).'.format(type(dataset)))
+    name = vtk.vtkDataSetAttributes.GhostArrayName()
+    ghosts = np.zeros(dataset.GetNumberOfCells(), dtype=np.uint8)
+    existing = dataset.GetCellData().GetArray(name)
+    if existing is not None:
+        ghosts |= vtk_to_numpy(existing).astype(np.uint8)
+    ghosts[~np.asarray(mask, dtype=bool)] |= vtk.vtkDataSetAttributes.HIDDENCELL
+    vtkarr = numpy_to_vtk(ghosts, deep=True, array_type=vtk.VTK_UNSIGNED_CHAR)
+    vtkarr.SetName(name)
+    output.GetCellData().AddArray(vtkarr)
+    output.UpdateCellGhostArrayCache()
+    return output
+
+
+def _threshold_mask(arr, value=None, invert=False):
+    """Evaluate the criterion of ``DataSetFilters.threshold`` on an array
+    with NumPy. NaN values never satisfy the criterion."""
+    if arr.ndim > 1:
+        # Like vtkThreshold, use the first component
+        arr = arr[:, 0]
+    if value is None:
+        # Remove the NaN values
+        value, invert = (np.nanmin(arr), np.nanmax(arr)), False
+    with np.errstate(invalid='ignore'):
+        if isinstance(value, collections.Iterable):
+            if len(value) != 2:
+                raise AssertionError('Value range must be length one for a float value or two for min/max; not ({}).'.format(value))
+            if invert:
+                return (arr <= value[0]) | (arr >= value[1])
+            return (arr >= value[0]) & (arr <= value[1])
+        if invert:
+            return arr <= value
+        return arr >= value
+
+
+def _clip_box_table(dataset, bounds, invert):
+    """Clip a dataset by a box with the table based clipper.
+
+    The inside of the box is what remains after clipping by each of its six
+    planes. When ``invert``, the parts clipped away at each plane are the
+    outside of the box and are appended together.
+    """
+    xmin, xmax, ymin, ymax, zmin, zmax = bounds
+    planes = [((-1, 0, 0), (xmin, 0, 0)), ((1, 0, 0), (xmax, 0, 0)),
+              ((0, -1, 0), (0, ymin, 0)), ((0, 1, 0), (0, ymax, 0)),
+              ((0, 0, -1), (0, 0, zmin)), ((0, 0, 1), (0, 0, zmax))]
+    remaining = dataset
+    append = vtk.vtkAppendFilter()
+    append.MergePointsOn()
+    for normal, origin in planes:
+        alg = vtk.vtkTableBasedClipDataSet()
+        alg.SetInputDataObject(remaining)
+        alg.SetClipFunction(_generate_plane(normal, origin))
+        alg.InsideOutOn()
+        alg.SetGenerateClippedOutput(invert)
+        update_algorithm(alg)
+        if invert:
+            append.AddInputData(alg.GetClippedOutput())
+        remaining = alg.GetOutput()
+    if invert:
+        update_algorithm(append)
+        output = wrap(append.GetOutput())
+    else:
+        output = wrap(remaining)
+    output.copy_meta_from(dataset)
+    return output
+
+
+def _contour_algorithm(dataset, method=None):
+    """Create the contouring algorithm for a dataset.
+
+    ``method`` can be ``'flying_edges'``, ``'synchronized_templates'``, or
+    ``'generic'``. When ``None``, the fastest algorithm available for the
+    type of the dataset is chosen.
+    """
+    is_image = isinstance(dataset, vtk.vtkImageData)
+    is_grid = isinstance(dataset, (vtk.vtkStructuredGrid, vtk.vtkRectilinearGrid))
+    volume = (is_image or is_grid) and dataset.GetDataDimension() == 3
+    if method is None:
+        if is_image and volume:
+            method = 'flying_edges'
+        elif is_grid and volume:
+            method = 'synchronized_templates'
+        else:
+            method = 'generic'
+    method = method.lower()
+    if method == 'generic':
+        return vtk.vtkContourFilter()
+    elif method == 'flying_edges':
+        if not (is_image and volume):
+            raise TypeError('Flying edges requires a 3D UniformGrid, not ({}).'.format(type(dataset)))
+        alg = vtk.vtkFlyingEdges3D()
+        # Match the generic filter which interpolates all point arrays
+        alg.InterpolateAttributesOn()
+        return alg
+    elif method == 'synchronized_templates':
+        if not volume:
+            raise TypeError('Synchronized templates requires a 3D structured dataset, not ({}).'.format(type(dataset)))
+        if is_image:
+            return vtk.vtkSynchronizedTemplates3D()
+        elif isinstance(dataset, vtk.vtkStructuredGrid):
+            return vtk.vtkGridSynchronizedTemplates3D()
+        return vtk.vtkRectilinearSynchronizedTemplates()
+    raise RuntimeError('Contour method ({}) not understood.'.format(method))
+
+
 
 class DataSetFilters(object):
     """A set of common filters that can be applied to any vtkDataSet"""
 
 
-    def clip(dataset, normal='x', origin=None, invert=True):
+    @cached_filter
+    def clip(dataset, normal='x', origin=None, invert=True, method='table',
+             whole_cells=False):
         """
         Clip a dataset by a plane by specifying the origin and normal. If no
         parameters are given the clip will occur in the center of that dataset
@@ -84,23 +646,44 @@ class DataSetFilters(object):
         invert : bool
             Flag on whether to flip/invert the clip
 
+        method : str, optional
+            The clipping engine: ``'table'`` (default) for the fast table
+            based clipper which keeps the input's cell types where possible
+            or ``'generic'`` for ``vtkClipDataSet`` which tetrahedralizes
+            the clipped cells.
+
+        whole_cells : bool, optional
+            Extract the whole cells whose centers are on the kept side of the
+            plane rather than cutting the cells along the plane. This is much
+            faster but gives a jagged cutaway.
+
         """
+        if method not in ('table', 'generic'):
+            raise RuntimeError('Clip method ({}) not understood.'.format(method))
         if isinstance(normal, str):
             normal = NORMALS[normal.lower()]
         # find center of data if origin not specified
         if origin is None:
             origin = dataset.center
+        if whole_cells:
+            dist = np.dot(_cell_centers(dataset) - np.array(origin), normal)
+            return _extract_cells(dataset, dist <= 0 if invert else dist >= 0)
         # create the plane for clipping
         plane = _generate_plane(normal, origin)
         # run the clip
-        alg = vtk.vtkClipDataSet()
+        if method == 'table':
+            alg = vtk.vtkTableBasedClipDataSet()
+        else:
+            alg = vtk.vtkClipDataSet()
         alg.SetInputDataObject(dataset) # Use the grid as the data we desire to cut
         alg.SetClipFunction(plane) # the the cutter to use the plane we made
         alg.SetInsideOut(invert) # invert the clip if needed
-        alg.Update() # Perfrom the Cut
+        update_algorithm(alg) # Perfrom the Cut
         return _get_output(alg)
 
-    def clip_box(dataset, bounds=None, invert=True, factor=0.35):
+    @cached_filter
+    def clip_box(dataset, bounds=None, invert=True, factor=0.35, method='table',
+                 whole_cells=False):
         """Clips a dataset by a bounding box defined by the bounds. If no bounds
         are given, a corner of the dataset bounds will be removed.
 
@@ -116,6 +699,16 @@ class DataSetFilters(object):
             If bounds are not given this is the factor along each axis to
             extract the default box.
 
+        method : str, optional
+            The clipping engine: ``'table'`` (default) clips by each of the
+            box's planes with the fast table based clipper or ``'generic'``
+            for ``vtkBoxClipDataSet`` which tetrahedralizes the output.
+
+        whole_cells : bool, optional
+            Extract the whole cells whose centers are on the kept side of the
+            box rather than cutting the cells along the box. This is much
+            faster but gives a jagged cutaway.
+
         """
         if bounds is None:
             def _get_quarter(dmin, dmax):
@@ -127,7 +720,16 @@ class DataSetFilters(object):
             bounds = [xmin, xmax, ymin, ymax, zmin, zmax]
         if not isinstance(bounds, collections.Iterable) or len(bounds) != 6:
             raise AssertionError('Bounds must be a length 6 iterable of floats')
+        if method not in ('table', 'generic'):
+            raise RuntimeError('Clip method ({}) not understood.'.format(method))
         xmin, xmax, ymin, ymax, zmin, zmax = bounds
+        if whole_cells:
+            centers = _cell_centers(dataset)
+            inside = np.all((centers >= [xmin, ymin, zmin]) &
+                            (centers <= [xmax, ymax, zmax]), axis=1)
+            return _extract_cells(dataset, ~inside if invert else inside)
+        if method == 'table':
+            return _clip_box_table(dataset, bounds, invert)
         alg = vtk.vtkBoxClipDataSet()
         alg.SetInputDataObject(dataset)
         alg.SetBoxClip(xmin, xmax, ymin, ymax, zmin, zmax)
@@ -136,9 +738,10 @@ class DataSetFilters(object):
             # invert the clip if needed
             port = 1
             alg.GenerateClippedOutputOn()
-        alg.Update()
+        update_algorithm(alg)
         return _get_output(alg, oport=port)
 
+    @cached_filter
     def slice(dataset, normal='x', origin=None, generate_triangles=False):
         """Slice a dataset by a plane at the specified origin and normal vector
         orientation. If no origin is specified, the center of the input dataset will
@@ -174,10 +777,11 @@ class DataSetFilters(object):
         alg.SetCutFunction(plane) # the the cutter to use the plane we made
         if not generate_triangles:
             alg.GenerateTrianglesOff()
-        alg.Update() # Perfrom the Cut
+        update_algorithm(alg) # Perfrom the Cut
         return _get_output(alg)
 
 
+    @cached_filter
     def slice_orthogonal(dataset, x=None, y=None, z=None, generate_triangles=False):
         """Creates three orthogonal slices through the dataset on the three
         caresian planes. Yields a MutliBlock dataset of the three slices
@@ -212,8 +816,11 @@ class DataSetFilters(object):
         return output
 
 
+    @cached_filter
     def slice_along_axis(dataset, n=5, axis='x', tolerance=None, generate_triangles=False):
         """Create many slices of the input dataset along a specified axis.
+        The slices are cut in a single pass over the dataset and then split
+        into the blocks of the output.
 
         Parameters
         ----------
@@ -246,17 +853,21 @@ class DataSetFilters(object):
         if tolerance is None:
             tolerance = (dataset.bounds[ax*2+1] - dataset.bounds[ax*2]) * 0.01
         rng = np.linspace(dataset.bounds[ax*2]+tolerance, dataset.bounds[ax*2+1]-tolerance, n)
-        center = list(dataset.center)
-        # Make each of the slices
-        for i in range(n):
-            center[ax] = rng[i]
-            slc = DataSetFilters.slice(dataset, normal=axis, origin=center, generate_triangles=generate_triangles)
+        origins = np.tile(dataset.center, (n, 1))
+        origins[:, ax] = rng
+        normal = np.zeros(3)
+        normal[ax] = 1.0
+        # Make all of the slices in a single pass over the dataset
+        slices = _slice_planes(dataset, normal, origins,
+                               generate_triangles=generate_triangles)
+        for i, slc in enumerate(slices):
             output[i, 'slice%.2d'%i] = slc
         return output
 
 
+    @cached_filter
     def threshold(dataset, value=None, scalars=None, invert=False, continuous=False,
-                  preference='cell'):
+                  preference='cell', blank=False):
         """
         This filter will apply a ``vtkThreshold`` filter to the input dataset and
         return the resulting object. This extracts cells where scalar value in each
@@ -288,6 +899,18 @@ class DataSetFilters(object):
             When scalars is specified, this is the perfered scalar type to search
             for in the dataset.  Must be either 'point' or 'cell'.
 
+        blank : bool, optional
+            For structured inputs (``UniformGrid``, ``RectilinearGrid``, and
+            ``StructuredGrid``) return a ``StructuredGrid`` sharing the
+            input's arrays with the cells that fail the criterion hidden by
+            its ghost array (``vtkGhostType``) rather than an extracted
+            ``UnstructuredGrid``. Only supported when thresholding cell data.
+
+        Note
+        ----
+        Cell data thresholds are evaluated with NumPy and the kept cells are
+        compacted directly rather than going through ``vtkThreshold``.
+
         """
         # set the scalaras to threshold on
         if scalars is None:
@@ -297,6 +920,15 @@ class DataSetFilters(object):
         if arr is None:
             raise AssertionError('No arrays present to threshold.')
 
+        if field == CELL_DATA_FIELD:
+            # Evaluate the criterion on the cell data directly
+            mask = _threshold_mask(arr, value, invert)
+            if blank:
+                return _blank_cells(dataset, mask)
+            return _extract_cells(dataset, mask)
+        elif blank:
+            raise AssertionError('Blanking is only supported when thresholding cell data.')
+
         # If using an inverted range, merge the result of two fitlers:
         if isinstance(value, collections.Iterable) and invert:
             valid_range = [np.nanmin(arr), np.nanmax(arr)]
@@ -309,7 +941,7 @@ class DataSetFilters(object):
             appender = vtk.vtkAppendFilter()
             appender.AddInputData(t1)
             appender.AddInputData(t2)
-            appender.Update()
+            update_algorithm(appender)
             return _get_output(appender)
 
         # Run a standard threshold algorithm
@@ -333,12 +965,14 @@ class DataSetFilters(object):
             else:
                 alg.ThresholdByUpper(value)
         # Run the threshold
-        alg.Update()
+        update_algorithm(alg)
         return _get_output(alg)
 
 
+    @cached_filter
     def threshold_percent(dataset, percent=0.50, scalars=None, invert=False,
-                          continuous=False, preference='cell'):
+                          continuous=False, preference='cell', percentile=False,
+                          exact=True):
         """Thresholds the dataset by a percentage of its range on the active
         scalar array or as specified
 
@@ -366,6 +1000,18 @@ class DataSetFilters(object):
             When scalars is specified, this is the perfered scalar type to search
             for in the dataset.  Must be either 'point' or 'cell'.
 
+        percentile : bool, optional
+            When True, threshold at the percentiles of the values of the
+            scalar array rather than at the percentage of its range. This is
+            better suited to skewed data. The percentiles are computed with a
+            quantile sketch cached with the array (see
+            :func:`vtki.Common.get_data_percentile`).
+
+        exact : bool, optional
+            When using percentiles, refine the sketch's estimates to the
+            exact percentiles with one pass over the array. When False, the
+            estimates are used so that repeated calls are nearly instant.
+
         """
         if scalars is None:
             field, tscalars = dataset.active_scalar_info
@@ -386,6 +1032,9 @@ class DataSetFilters(object):
         def _get_val(percent, dmin, dmax):
             """Gets the value from a percentage of a range"""
             percent = _check_percent(percent)
+            if percentile:
+                return dataset.get_data_percentile(100.0 * percent, arr=tscalars,
+                                                   preference=preference, exact=exact)
             return dmin + float(percent) * (dmax - dmin)
 
         # Compute the values
@@ -400,6 +1049,7 @@ class DataSetFilters(object):
                     invert=invert, continuous=continuous, preference=preference)
 
 
+    @cached_filter
     def outline(dataset, generate_faces=False):
         """Produces an outline of the full extent for the input dataset.
 
@@ -412,9 +1062,10 @@ class DataSetFilters(object):
         alg = vtk.vtkOutlineFilter()
         alg.SetInputDataObject(dataset)
         alg.SetGenerateFaces(generate_faces)
-        alg.Update()
+        update_algorithm(alg)
         return wrap(alg.GetOutputDataObject(0))
 
+    @cached_filter
     def outline_corners(dataset, factor=0.2):
         """Produces an outline of the corners for the input dataset.
 
@@ -428,9 +1079,10 @@ class DataSetFilters(object):
         alg = vtk.vtkOutlineCornerFilter()
         alg.SetInputDataObject(dataset)
         alg.SetCornerFactor(factor)
-        alg.Update()
+        update_algorithm(alg)
         return wrap(alg.GetOutputDataObject(0))
 
+    @cached_filter
     def extract_geometry(dataset):
         """Extract the outer surface of a volume or structured grid dataset as
         PolyData. This will extract all 0D, 1D, and 2D cells producing the
@@ -438,18 +1090,20 @@ class DataSetFilters(object):
         """
         alg = vtk.vtkGeometryFilter()
         alg.SetInputDataObject(dataset)
-        alg.Update()
+        update_algorithm(alg)
         return _get_output(alg)
 
+    @cached_filter
     def wireframe(dataset):
         """Extract all the internal/external edges of the dataset as PolyData.
         This produces a full wireframe representation of the input dataset.
         """
         alg = vtk.vtkExtractEdges()
         alg.SetInputDataObject(dataset)
-        alg.Update()
+        update_algorithm(alg)
         return _get_output(alg)
 
+    @cached_filter
     def elevation(dataset, low_point=None, high_point=None, scalar_range=None,
                   preference='point', set_active=True):
         """Generate scalar values on a dataset.  The scalar values lie within a
@@ -515,7 +1169,7 @@ class DataSetFilters(object):
         alg.SetScalarRange(scalar_range)
         alg.SetLowPoint(low_point)
         alg.SetHighPoint(high_point)
-        alg.Update()
+        update_algorithm(alg)
         # Decide on updating active scalar array
         name = 'Elevation' # Note that this is added to the PointData
         if not set_active:
@@ -523,8 +1177,10 @@ class DataSetFilters(object):
         return _get_output(alg, active_scalar=name, active_scalar_field='point')
 
 
+    @cached_filter
     def contour(dataset, isosurfaces=10, scalars=None, compute_normals=False,
-                compute_gradients=False, compute_scalars=True, preference='point'):
+                compute_gradients=False, compute_scalars=True, preference='point',
+                method=None):
         """Contours an input dataset by an array. ``isosurfaces`` can be an integer
         specifying the number of isosurfaces in the data range or an iterable set of
         values for explicitly setting the isosurfaces.
@@ -550,11 +1206,19 @@ class DataSetFilters(object):
             When scalars is specified, this is the perfered scalar type to search
             for in the dataset.  Must be either 'point' or 'cell'.
 
+        method : str, optional
+            The contouring algorithm: ``'flying_edges'`` (3D ``UniformGrid``
+            only), ``'synchronized_templates'`` (3D ``UniformGrid``,
+            ``RectilinearGrid``, or ``StructuredGrid``), or ``'generic'``
+            (any dataset). Defaults to the fastest algorithm available for
+            the type of the input dataset. Note that flying edges does not
+            pass the cell data of the input to the output.
+
         """
         # Make sure the input has scalars to contour on
         if dataset.n_scalars < 1:
             raise AssertionError('Input dataset for the contour filter must have scalar data.')
-        alg = vtk.vtkContourFilter()
+        alg = _contour_algorithm(dataset, method)
         alg.SetInputDataObject(dataset)
         alg.SetComputeNormals(compute_normals)
         alg.SetComputeGradients(compute_gradients)
@@ -578,7 +1242,7 @@ class DataSetFilters(object):
                 alg.SetValue(i, val)
         else:
             raise RuntimeError('isosurfaces not understood.')
-        alg.Update()
+        update_algorithm(alg)
         return _get_output(alg)
 
 
@@ -620,7 +1284,7 @@ class DataSetFilters(object):
             alg.SetPoint1(point_u) # BOTTOM RIGHT CORNER
             alg.SetPoint2(point_v) # TOP LEFT CORNER
         alg.SetInputDataObject(dataset)
-        alg.Update()
+        update_algorithm(alg)
         output = _get_output(alg)
         if not inplace:
             return output
@@ -633,6 +1297,19 @@ class DataSetFilters(object):
         dataset.GetPointData().AddArray(otc) # Add old ones back at the end
         return # No return type because it is inplace
 
+    def stream(dataset, method, args=(), kwargs=None, n_pieces=None,
+               max_bytes=None, partition='index', reducer=None):
+        """Run a filter piece by piece over this dataset, handing the output
+        of each piece to a reducer before the next piece is filtered.  See
+        :func:`vtki.stream_filter` for a description of the parameters.
+        """
+        return vtki.streaming.stream_filter(dataset, method, args=args,
+                                            kwargs=kwargs, n_pieces=n_pieces,
+                                            max_bytes=max_bytes,
+                                            partition=partition,
+                                            reducer=reducer)
+
+    @cached_filter
     def compute_cell_sizes(dataset, length=False, area=True, volume=True):
         """This filter computes sizes for 1D (length), 2D (area) and 3D (volume)
         cells.
@@ -649,15 +1326,31 @@ class DataSetFilters(object):
             Specify whether or not to compute the volume of 3D cells.
 
         """
-        alg = vtk.vtkCellSizeFilter()
-        alg.SetInputDataObject(dataset)
-        alg.SetComputeArea(area)
-        alg.SetComputeVolume(volume)
-        alg.SetComputeLength(length)
-        alg.SetComputeVertexCount(False)
-        alg.Update()
-        return _get_output(alg)
+        groups = _linear_cell_groups(dataset)
+        if groups is None:
+            alg = vtk.vtkCellSizeFilter()
+            alg.SetInputDataObject(dataset)
+            alg.SetComputeArea(area)
+            alg.SetComputeVolume(volume)
+            alg.SetComputeLength(length)
+            alg.SetComputeVertexCount(False)
+            update_algorithm(alg)
+            return _get_output(alg)
+        points = vtk_to_numpy(dataset.GetPoints().GetData())
+        sizes = np.zeros((3, dataset.GetNumberOfCells()))
+        for celltype, ind, ids in groups:
+            for i, size in enumerate(_linear_cell_sizes(points, celltype, ids)):
+                sizes[i, ind] = size
+        output = dataset.copy(deep=False)
+        for name, compute, values in zip(['Length', 'Area', 'Volume'],
+                                         [length, area, volume], sizes):
+            if compute:
+                vtkarr = numpy_to_vtk(values, deep=True)
+                vtkarr.SetName(name)
+                output.GetCellData().AddArray(vtkarr)
+        return output
 
+    @cached_filter
     def cell_centers(self, vertex=True):
         """Generate points at the center of the cells in this dataset.
         These points can be used for placing glyphs / vectors.
@@ -667,11 +1360,26 @@ class DataSetFilters(object):
         vertex : bool
             Enable/disable the generation of vertex cells.
         """
-        alg = vtk.vtkCellCenters()
-        alg.SetInputDataObject(self)
-        alg.SetVertexCells(vertex)
-        alg.Update()
-        output = _get_output(alg)
+        groups = _linear_cell_groups(self)
+        if groups is None:
+            alg = vtk.vtkCellCenters()
+            alg.SetInputDataObject(self)
+            alg.SetVertexCells(vertex)
+            update_algorithm(alg)
+            output = _get_output(alg)
+            return output
+        centers = _linear_cell_centers(self, groups)
+        output = vtki.PolyData()
+        output.SetPoints(vtk_points(centers))
+        if vertex:
+            n_centers = centers.shape[0]
+            verts = np.empty((n_centers, 2), dtype=vtki.ID_TYPE)
+            verts[:, 0] = 1
+            verts[:, 1] = np.arange(n_centers)
+            cells = vtk.vtkCellArray()
+            cells.SetCells(n_centers, numpy_to_vtkIdTypeArray(verts.ravel(), deep=True))
+            output.SetVerts(cells)
+        output.GetPointData().PassData(self.GetCellData())
         return output
 
 
@@ -698,7 +1406,7 @@ class DataSetFilters(object):
         """
         if geom is None:
             arrow = vtk.vtkArrowSource()
-            arrow.Update()
+            update_algorithm(arrow)
             geom = arrow.GetOutput()
         alg = vtk.vtkGlyph3D()
         alg.SetSourceData(geom)
@@ -714,5 +1422,52 @@ class DataSetFilters(object):
         alg.SetInputData(self)
         alg.SetVectorModeToUseVector()
         alg.SetScaleFactor(factor)
-        alg.Update()
+        update_algorithm(alg)
         return _get_output(alg)
+
+    def sample(dataset, target, tolerance=None, chunk_size=65536):
+        """Resample the arrays of this dataset onto the points of another
+        dataset or onto an array of points.
+
+        Point arrays are interpolated within the cell that contains each
+        target point while cell arrays take the value of that cell.  All
+        sampled arrays become point arrays of the output along with a
+        ``'vtkValidPointMask'`` array that is zero for the target points
+        outside of this dataset, where the sampled values are zero.
+
+        Parameters
+        ----------
+        target : vtk.vtkDataSet or np.ndarray
+            The dataset (e.g. a ``UniformGrid`` or a line) or the (N, 3)
+            array of points to sample onto.
+
+        tolerance : float, optional
+            The distance within which a target point is considered to be in
+            a cell.  Computed from the size of the cells by default.
+
+        chunk_size : int, optional
+            The number of target points that are probed at a time.  Image
+            data targets are probed at once.
+
+        Returns
+        -------
+        output : vtki.Common
+            A shallow copy of the target dataset or a ``PolyData`` of the
+            target points holding the sampled arrays.
+
+        """
+        if isinstance(target, vtk.vtkDataSet):
+            output = wrap(target).copy(deep=False)
+        else:
+            points = np.asarray(target, dtype=np.float64).reshape((-1, 3))
+            output = vtki.PolyData(points)
+        if isinstance(target, vtk.vtkImageData):
+            # VTK probes image data by walking over the cells of the dataset
+            arrays = collections.OrderedDict(_probe(dataset, target, tolerance))
+        else:
+            arrays = _probe_points(dataset, _dataset_points(output),
+                                   tolerance=tolerance,
+                                   chunk_size=int(chunk_size))
+        for name, values in arrays.items():
+            output.point_arrays[name] = values
+        return output
@@ -12,6 +12,7 @@ from vtk.util.numpy_support import numpy_to_vtk
 import numpy as np
 
 import vtki
+from vtki.progress import update_algorithm
 
 log = logging.getLogger(__name__)
 log.setLevel('CRITICAL')
@@ -176,7 +177,7 @@ class RectilinearGrid(vtkRectilinearGrid, Grid):
 
         # load file to self
         reader.SetFileName(filename)
-        reader.Update()
+        update_algorithm(reader)
         grid = reader.GetOutput()
         self.ShallowCopy(grid)
 
@@ -218,7 +219,7 @@ class RectilinearGrid(vtkRectilinearGrid, Grid):
         writer.SetInputData(self)
         if binary and legacy:
             writer.SetFileTypeToBinary()
-        writer.Write()
+        update_algorithm(writer)
 
     @property
     def x(self):
@@ -441,7 +442,7 @@ class UniformGrid(vtkImageData, Grid):
 
         # load file to self
         reader.SetFileName(filename)
-        reader.Update()
+        update_algorithm(reader)
         grid = reader.GetOutput()
         self.ShallowCopy(grid)
 
@@ -483,7 +484,7 @@ class UniformGrid(vtkImageData, Grid):
         writer.SetInputData(self)
         if binary and legacy:
             writer.SetFileTypeToBinary()
-        writer.Write()
+        update_algorithm(writer)
 
     @property
     def x(self):
@@ -370,12 +370,19 @@ class Threshold(InteractiveTool):
     display_params : dict
         Any plotting keyword parameters to use
 
+    default_params : dict, optional
+        Set ``{'percentile': True}`` to have the slider bars select
+        percentiles of the scalar values rather than values in the scalar
+        range. The percentiles are estimated from a quantile sketch that is
+        cached with the array, so moving the sliders is nearly instant.
+
     """
 
     def tool(self, default_params=None, **kwargs):
         if default_params is None:
             default_params = {}
         preference = self.display_params['preference']
+        percentile = default_params.get('percentile', False)
 
         def _calc_start_values(rng):
             lowstart = ((rng[1] - rng[0]) * 0.25) + rng[0]
@@ -383,13 +390,17 @@ class Threshold(InteractiveTool):
             return lowstart, highstart
 
         # Now set up the widgets
-        lowstart, highstart = _calc_start_values(self.valid_range)
-        minsl = widgets.FloatSlider(min=self.valid_range[0],
-                            max=self.valid_range[1],
+        if percentile:
+            lowstart, highstart = _calc_start_values([0.0, 100.0])
+        else:
+            lowstart, highstart = _calc_start_values(self.valid_range)
+        slider_range = [0.0, 100.0] if percentile else self.valid_range
+        minsl = widgets.FloatSlider(min=slider_range[0],
+                            max=slider_range[1],
                             value=lowstart,
                             continuous_update=self.continuous_update)
-        maxsl = widgets.FloatSlider(min=self.valid_range[0],
-                            max=self.valid_range[1],
+        maxsl = widgets.FloatSlider(min=slider_range[0],
+                            max=slider_range[1],
                             value=highstart,
                             continuous_update=self.continuous_update)
 
@@ -414,7 +425,7 @@ class Threshold(InteractiveTool):
             if dmax < dmin:
                 # If user chooses a min that is more than max, correct them:
                 # Set max threshold as 1 percent of the range more than min
-                dmax = dmin + (self.valid_range[1] - self.valid_range[0]) * 0.01
+                dmax = dmin + (slider_range[1] - slider_range[0]) * 0.01
                 maxsl.value = dmax
 
             scalars = kwargs.get('scalars')
@@ -424,10 +435,16 @@ class Threshold(InteractiveTool):
             if self._last_scalars != scalars:
                 self._last_scalars = scalars
                 # Update to the new range
-                dmin, dmax = _update_slider_ranges(self.input_dataset.get_data_range(scalars))
+                if not percentile:
+                    dmin, dmax = _update_slider_ranges(self.input_dataset.get_data_range(scalars))
+
+            value = [dmin, dmax]
+            if percentile:
+                value = self.input_dataset.get_data_percentile(value, arr=scalars,
+                            preference=preference, exact=False)
 
             # Run the threshold
-            self.output_dataset = self.input_dataset.threshold([dmin, dmax],
+            self.output_dataset = self.input_dataset.threshold(value,
                     scalars=scalars, continuous=continuous, preference=preference,
                     invert=invert)
 
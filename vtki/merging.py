@@ -0,0 +1,476 @@
+"""
+Merging of coincident points and radius queries of points with NumPy.
+
+Points are merged exactly by sorting their coordinates or, within a
+tolerance, by hashing them to the index of their cell in a grid of cells as
+large as the tolerance: two points within the tolerance are then in the same
+or in neighboring cells of the grid, so each point is only compared to the
+points of the 27 cells around it.
+
+Like the point locators of VTK, points are merged within a tolerance in
+order: each point is merged into the first point kept before it within the
+tolerance, or kept when there is none.  Only the points kept go over the
+pairs of points within the tolerance.  Dense clusters of points, which have
+too many pairs, are decided in rounds first: a point without any undecided
+point before it within the tolerance is kept, and the undecided points
+within the tolerance of the points kept are merged into them.  Points can
+instead be merged transitively with ``chain=True``: the points of a chain of
+points each within the tolerance of the next are then all merged into the
+first point of the chain.
+
+The compared pairs of points are processed in chunks of at most about
+``max_pairs`` pairs, so that dense clusters of points do not need memory
+quadratic in their size.
+
+"""
+import numpy as np
+
+# The 27 cells around a cell
+_OFFSETS = np.array([(i, j, k) for i in (-1, 0, 1) for j in (-1, 0, 1)
+                     for k in (-1, 0, 1)], dtype=np.int64)
+
+# The largest number of cells of the grid along an axis, for the index of a
+# cell to fit in a 64 bit integer
+_MAX_CELLS = 2**20
+
+# The smallest number of points in the window of points decided in a round
+_MIN_WINDOW = 1024
+
+
+def _grid(points, size):
+    """Hash points to the index of their cell in a grid of cells of ``size``,
+    padded by a cell on each side for the neighbors of every cell.
+
+    Returns the lower corner and the strides of the grid, the key of the
+    cell of each point, the points sorted by cell (and by index within a
+    cell), and the start, the number of points and the key of each occupied
+    cell in the sorted points.
+    """
+    lower = points.min(axis=0)
+    cells = np.floor((points - lower) / size).astype(np.int64) + 1
+    dims = cells.max(axis=0) + 2
+    strides = np.array([dims[1] * dims[2], dims[2], 1], dtype=np.int64)
+    keys = cells.dot(strides)
+    order = np.argsort(keys, kind='mergesort')
+    sorted_keys = keys[order]
+    new = np.ones(keys.size, dtype=bool)
+    new[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    starts = np.nonzero(new)[0]
+    counts = np.diff(np.append(starts, keys.size))
+    return lower, strides, keys, order, starts, counts, sorted_keys[starts]
+
+
+def _cell_size(points, tolerance):
+    """The size of the cells of the grid of points merged within
+    ``tolerance``, larger when the grid would have more than ``_MAX_CELLS``
+    cells along an axis"""
+    return max(tolerance, (points.max(axis=0) - points.min(axis=0)).max() / _MAX_CELLS)
+
+
+def _split(n_pairs, max_pairs):
+    """The bounds of the chunks of consecutive rows with about ``max_pairs``
+    pairs, given the number of pairs of each row"""
+    total = np.cumsum(n_pairs)
+    if not total.size or not total[-1]:
+        return np.array([0, n_pairs.size])
+    bounds = np.searchsorted(total, np.arange(0, total[-1], max_pairs), 'right')
+    return np.unique(np.concatenate([[0], bounds, [n_pairs.size]]))
+
+
+def _expand(start, count):
+    """The indices ``start[i]`` to ``start[i] + count[i]`` of each ``i``,
+    concatenated"""
+    local = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+    return np.repeat(start, count) + local
+
+
+def _range_pairs(query, start, count, max_pairs):
+    """The pairs of each query point and of the sorted points ``start`` to
+    ``start + count`` of each of its rows, in chunks of about ``max_pairs``
+    pairs.  Yields the index of the query point and the sorted point of each
+    pair."""
+    bounds = _split(count.sum(axis=1), max_pairs)
+    for begin, end in zip(bounds[:-1], bounds[1:]):
+        ranges = np.nonzero(count[begin:end].ravel())[0]
+        n = count[begin:end].ravel()[ranges]
+        rows = np.repeat(begin + ranges // count.shape[1], n)
+        yield rows, _expand(start[begin:end].ravel()[ranges], n)
+
+
+def _cell_pairs(start_a, start_b, count_a, count_b, same):
+    """The pairs of points of pairs of cells given the start and the number
+    of their points in the sorted points, once per pair within a cell"""
+    n_pairs = count_a * count_b
+    local = np.arange(n_pairs.sum()) - np.repeat(np.cumsum(n_pairs) - n_pairs, n_pairs)
+    count_b = np.repeat(count_b, n_pairs)
+    a = np.repeat(start_a, n_pairs) + local // count_b
+    b = np.repeat(start_b, n_pairs) + local % count_b
+    if same:
+        keep = a < b
+        a, b = a[keep], b[keep]
+    return a, b
+
+
+def _close_pairs(points, tolerance, max_pairs=2**22, limit=None):
+    """The pairs of points within ``tolerance`` of each other.
+
+    The pairs of points of each cell of the grid and of its neighbors are
+    compared, visiting each pair of neighboring cells once, in chunks of
+    cells of about ``max_pairs`` pairs.  Returns ``None`` as soon as more
+    than ``limit`` pairs are found, when given.
+    """
+    size = _cell_size(points, tolerance)
+    _, strides, _, order, starts, counts, unique = _grid(points, size)
+    first, second = [], []
+    # the cell itself and half of its 26 neighbors
+    for offset in _OFFSETS[13:]:
+        if not offset.any():
+            cell, pos = np.arange(unique.size), np.arange(unique.size)
+        else:
+            neighbor = unique + strides.dot(offset)
+            pos = np.searchsorted(unique, neighbor).clip(max=unique.size - 1)
+            cell = np.nonzero(unique[pos] == neighbor)[0]
+            pos = pos[cell]
+        bounds = _split(counts[cell] * counts[pos], max_pairs)
+        for begin, end in zip(bounds[:-1], bounds[1:]):
+            a, b = _cell_pairs(starts[cell[begin:end]], starts[pos[begin:end]],
+                               counts[cell[begin:end]], counts[pos[begin:end]],
+                               not offset.any())
+            a, b = order[a], order[b]
+            close = ((points[a] - points[b])**2).sum(axis=1) <= tolerance**2
+            first.append(a[close])
+            second.append(b[close])
+            if limit is not None:
+                limit -= first[-1].size
+                if limit < 0:
+                    return None
+    return np.concatenate(first), np.concatenate(second)
+
+
+def _components(n_points, a, b):
+    """The smallest point of the connected component of each point, linked by
+    the pairs of points ``(a, b)``"""
+    label = np.arange(n_points)
+    while a.size:
+        la, lb = label[a], label[b]
+        linked = la != lb
+        a, b, la, lb = a[linked], b[linked], la[linked], lb[linked]
+        # hook the larger root onto the smaller one, then follow the labels
+        # to their roots
+        label[np.maximum(la, lb)] = np.minimum(la, lb)
+        while True:
+            root = label[label]
+            if np.array_equal(root, label):
+                break
+            label = root
+    return label
+
+
+def _merge_rounds(points, tolerance, max_pairs):
+    """Decide in rounds whether to keep the points or merge them into a point
+    kept, until at least half of the points are decided.
+
+    Each round goes over a window of the first undecided points.  A point is
+    kept when no undecided point before it is within the tolerance, so only
+    the first undecided point of each cell of a grid of cells whose diagonal
+    is the tolerance, whose points are all within the tolerance of each
+    other, is tested.  The undecided points within the tolerance of the
+    points kept in a round are merged into the first of them.
+
+    Returns the point each decided point is merged into, and the undecided
+    points.
+    """
+    n_points = points.shape[0]
+    size = _cell_size(points, tolerance)
+    _, strides, keys, order, starts, counts, unique = _grid(points, size)
+    # the 9 columns of 3 cells along the last axis around a cell, whose
+    # points are consecutive in the sorted points
+    columns = _OFFSETS[::3].dot(strides)
+    bounds = np.append(starts, n_points)
+    fine = _grid(points, size / np.sqrt(3.0))[2]
+
+    def cells_around(query):
+        """The start and the number of the sorted points of the 9 columns of
+        cells around each query point"""
+        # searching the keys in order is much faster
+        sort = np.argsort(keys[query], kind='mergesort')
+        column = (keys[query[sort]] + columns[:, None]).ravel()
+        start = np.empty((query.size, columns.size), dtype=np.intp)
+        stop = np.empty((query.size, columns.size), dtype=np.intp)
+        start[sort] = bounds[np.searchsorted(unique, column)].reshape((columns.size, -1)).T
+        stop[sort] = bounds[np.searchsorted(unique, column + 3)].reshape((columns.size, -1)).T
+        return start, stop - start
+
+    def close_pairs(query, start, count, before):
+        """The pairs of query points and of the undecided points before, or
+        after, them within the tolerance"""
+        for rows, index in _range_pairs(query, start, count, max_pairs):
+            other = order[index]
+            if before:
+                keep = undecided[other] & (other < query[rows])
+            else:
+                keep = undecided[other] & (other > query[rows])
+            rows, other = rows[keep], other[keep]
+            close = ((points[query[rows]] - points[other])**2).sum(axis=1) <= tolerance**2
+            yield rows[close], other[close]
+
+    merged = np.arange(n_points)
+    undecided = np.ones(n_points, dtype=bool)
+    n_undecided = n_points
+    first, window = 0, n_points
+    while 2 * n_undecided > n_points:
+        candidates = first + np.nonzero(undecided[first:first + window])[0]
+        # the first undecided point of each fine cell, sorted by index
+        candidates = np.sort(candidates[np.unique(fine[candidates], return_index=True)[1]])
+        start, count = cells_around(candidates)
+        blocked = np.zeros(candidates.size, dtype=bool)
+        for rows, _ in close_pairs(candidates, start, count, True):
+            blocked[rows] = True
+        kept = candidates[~blocked]
+        undecided[kept] = False
+        n_decided = kept.size
+        for rows, other in close_pairs(kept, start[~blocked], count[~blocked], False):
+            # merge into the first point kept within the tolerance
+            sort = np.lexsort((rows, other))
+            rows, other = rows[sort], other[sort]
+            new = np.ones(other.size, dtype=bool)
+            new[1:] = other[1:] != other[:-1]
+            new &= undecided[other]
+            merged[other[new]] = kept[rows[new]]
+            undecided[other[new]] = False
+            n_decided += new.sum()
+        n_undecided -= n_decided
+        # the window grows with the number of points decided in a round
+        window = max(_MIN_WINDOW, 2 * n_decided)
+        while first < n_points and not undecided[first]:
+            ahead = np.nonzero(undecided[first:first + window])[0]
+            first = first + ahead[0] if ahead.size else first + window
+    return merged, undecided
+
+
+def _merge_in_order(n_points, a, b):
+    """Merge the points in order along the pairs of points ``(a, b)`` within
+    the tolerance: each point is kept unless it is merged into a point kept
+    before it, the first one of its pairs.
+
+    The points are visited one at a time, but only the points kept go over
+    the points after them that they are paired with.
+    """
+    a, b = np.minimum(a, b), np.maximum(a, b)
+    sort = np.argsort(a)
+    a, b = a[sort], b[sort]
+    heads = np.nonzero(np.append(True, a[1:] != a[:-1]))[0] if a.size else a
+    stops = np.append(heads[1:], a.size).tolist()
+    later = b.tolist()
+    merged = np.arange(n_points)
+    point_map = merged.tolist()
+    for point, start, stop in zip(a[heads].tolist(), heads.tolist(), stops):
+        if point_map[point] != point:
+            continue
+        for other in later[start:stop]:
+            if point_map[other] == other:
+                point_map[other] = point
+    merged[:] = point_map
+    return merged
+
+
+def _first_kept(points, kept, query, tolerance, max_pairs):
+    """The first of the points ``kept`` within ``tolerance`` of each query
+    point.  The points kept are further than the tolerance apart, so that a
+    few of them at most are in each cell of the grid."""
+    _, strides, keys, _, _, _, _ = _grid(points, _cell_size(points, tolerance))
+    order = np.argsort(keys[kept], kind='mergesort')
+    kept, kept_keys = kept[order], keys[kept[order]]
+    # the 9 columns of 3 cells along the last axis around a cell
+    columns = _OFFSETS[::3].dot(strides)
+    column = keys[query][:, None] + columns
+    start = np.searchsorted(kept_keys, column)
+    count = np.searchsorted(kept_keys, column + 3) - start
+    first = np.full(query.size, points.shape[0], dtype=np.intp)
+    for rows, index in _range_pairs(query, start, count, max_pairs):
+        close = ((points[query[rows]] - points[kept[index]])**2).sum(axis=1) <= tolerance**2
+        np.minimum.at(first, rows[close], kept[index[close]])
+    return first
+
+
+def _representatives(points, tolerance, max_pairs=2**22):
+    """The point each point is merged into when merging the points in order
+    within ``tolerance``, like the point locators of VTK.
+
+    The points are merged one at a time along the pairs of points within the
+    tolerance when there are at most about 16 of them per point. Otherwise
+    dense clusters of points would need too many pairs, and points are merged
+    in rounds until at least half of them are decided.  The undecided points
+    only depend on each other, so they are then merged on their own.  The
+    points decided in rounds are finally merged into the first point kept
+    within the tolerance.
+    """
+    merged = np.arange(points.shape[0])
+    index = np.arange(points.shape[0])
+    while index.size:
+        # all the points of a fine cell are within the tolerance
+        limit = 16 * index.size
+        fine = _grid(points[index], _cell_size(points, tolerance) / np.sqrt(3.0))
+        pairs = None
+        if (fine[5] * (fine[5] - 1) // 2).sum() <= limit:
+            pairs = _close_pairs(points[index], tolerance, max_pairs, limit)
+        if pairs is not None:
+            merged[index] = index[_merge_in_order(index.size, *pairs)]
+            break
+        local, undecided = _merge_rounds(points[index], tolerance, max_pairs)
+        decided = ~undecided
+        merged[index[decided]] = index[local[decided]]
+        index = index[undecided]
+    if index.size < points.shape[0]:
+        # a point may be merged in a round into a point kept after a point
+        # kept in a later round
+        kept = merged == np.arange(points.shape[0])
+        query = np.nonzero(~kept)[0]
+        merged[query] = _first_kept(points, np.nonzero(kept)[0], query,
+                                    tolerance, max_pairs)
+    return merged
+
+
+def _merge_identical(points):
+    """Merge the identical points, which are consecutive once sorted"""
+    n_points = points.shape[0]
+    if not n_points:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    order = np.lexsort(points.T[::-1])
+    ordered = points[order]
+    new = np.ones(n_points, dtype=bool)
+    new[1:] = (ordered[1:] != ordered[:-1]).any(axis=1)
+    # the group of each sorted point and the first point of each group
+    group = np.cumsum(new) - 1
+    first = order[new]
+    ranks = np.empty(first.size, dtype=np.intp)
+    ranks[np.argsort(first)] = np.arange(first.size)
+    point_map = np.empty(n_points, dtype=np.intp)
+    point_map[order] = ranks[group]
+    return point_map, np.sort(first)
+
+
+def merge_ids(points, tolerance=0.0, chain=False):
+    """Merge points that coincide or are within ``tolerance`` of each other.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        The ``(n, 3)`` points.
+
+    tolerance : float, optional
+        The distance within which points are merged.  Only identical points
+        are merged by default.
+
+    chain : bool, optional
+        Merge the points transitively, i.e. all the points of a chain of
+        points each within the tolerance of the next.  By default each point
+        is merged into the first point kept before it within the tolerance,
+        like the point locators of VTK.
+
+    Returns
+    -------
+    point_map : np.ndarray
+        The index of the merged point of each point.
+
+    kept : np.ndarray
+        The index of the point kept for each merged point, the first of the
+        points merged into it.
+
+    """
+    points = np.asarray(points, dtype=np.float64)
+    point_map, kept = _merge_identical(points)
+    if tolerance > 0 and kept.size > 1:
+        # the identical points are merged first so that they are not
+        # compared to each other
+        if chain:
+            label = _components(kept.size, *_close_pairs(points[kept], tolerance))
+        else:
+            label = _representatives(points[kept], tolerance)
+        root = label == np.arange(kept.size)
+        point_map = (np.cumsum(root) - 1)[label][point_map]
+        kept = kept[root]
+    return point_map, kept
+
+
+def points_within_radius(points, queries, radius, max_pairs=2**22):
+    """Find the points within ``radius`` of each query point.
+
+    The points are hashed to the index of their cell in a grid of cells as
+    large as the radius, so that each query point is only compared to the
+    points of the 27 cells around it.  The query points are processed in
+    chunks of at most about ``max_pairs`` compared pairs of points.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        The ``(n, 3)`` points searched.
+
+    queries : np.ndarray
+        The ``(m, 3)`` query points.
+
+    radius : float
+        The search radius.
+
+    Returns
+    -------
+    index : list(np.ndarray)
+        The sorted indices of the points within the radius of each query
+        point.
+
+    """
+    points = np.asarray(points, dtype=np.float64)
+    queries = np.asarray(queries, dtype=np.float64)
+    if not points.shape[0] or not queries.shape[0] or radius < 0:
+        return [np.zeros(0, dtype=np.intp) for _ in range(queries.shape[0])]
+    lower = points.min(axis=0)
+    size = max(radius, (points.max(axis=0) - lower).max() / _MAX_CELLS)
+    if size <= 0:
+        size = 1.0
+    # pad the grid by a cell on each side, the query points farther than a
+    # cell from the grid being clipped to its padding that holds no point
+    cells = np.floor((points - lower) / size).astype(np.int64) + 1
+    dims = cells.max(axis=0) + 2
+    strides = np.array([dims[1] * dims[2], dims[2], 1], dtype=np.int64)
+    keys = cells.dot(strides)
+    order = np.argsort(keys, kind='mergesort')
+    keys = keys[order]
+    new = np.ones(keys.size, dtype=bool)
+    new[1:] = keys[1:] != keys[:-1]
+    starts = np.nonzero(new)[0]
+    counts = np.diff(np.append(starts, keys.size))
+    unique = keys[starts]
+
+    # the 27 cells around a cell
+    offsets = np.array([(i, j, k) for i in (-1, 0, 1) for j in (-1, 0, 1)
+                        for k in (-1, 0, 1)], dtype=np.int64).dot(strides)
+
+    query_ids, point_ids = [], []
+    chunk_size = max(1, max_pairs // 27)
+    for chunk in range(0, queries.shape[0], chunk_size):
+        query = np.arange(chunk, min(chunk + chunk_size, queries.shape[0]))
+        query_cells = np.floor((queries[query] - lower) / size).clip(-1, dims - 2)
+        neighbor = (query_cells.astype(np.int64) + 1).dot(strides)[:, None] + offsets
+        # the neighbors out of the grid alias to its empty padding
+        neighbor = neighbor.clip(0)
+        pos = np.searchsorted(unique, neighbor).clip(max=unique.size - 1)
+        found = unique[pos] == neighbor
+        cell_start = np.where(found, starts[pos], 0)
+        cell_count = np.where(found, counts[pos], 0)
+        # split the chunk into parts of at most about max_pairs pairs
+        n_pairs = np.cumsum(cell_count.sum(axis=1))
+        bounds = np.searchsorted(n_pairs, np.arange(0, n_pairs[-1], max_pairs), 'right')
+        bounds = np.unique(np.concatenate([[0], bounds, [query.size]]))
+        for begin, end in zip(bounds[:-1], bounds[1:]):
+            count = cell_count[begin:end].ravel()
+            pair_query = np.repeat(np.repeat(query[begin:end], 27), count)
+            pair_point = order[_expand(cell_start[begin:end].ravel(), count)]
+            close = ((queries[pair_query] - points[pair_point])**2).sum(axis=1) <= radius**2
+            query_ids.append(pair_query[close])
+            point_ids.append(pair_point[close])
+    query_ids = np.concatenate(query_ids)
+    point_ids = np.concatenate(point_ids)
+    # sort the points by query point and then by index
+    sort = np.lexsort((point_ids, query_ids))
+    split = np.searchsorted(query_ids[sort], np.arange(1, queries.shape[0]))
+    return np.split(point_ids[sort], split)
@@ -0,0 +1,121 @@
+"""
+Control of the threads used by the VTK algorithms behind vtki.
+
+The number of threads set with :func:`vtki.set_num_threads` is applied to
+the SMP tools of VTK (used by SMP-parallel filters such as ``contour``), to
+the multithreader of VTK (used by threaded image filters and by volume
+rendering), and caps the thread pools of vtki started by ``thread_map``.
+
+The SMP tools of VTK can only be initialized once on the TBB backend: there
+the first number of threads set sticks for the rest of the process and
+later calls, including the restore at the end of :func:`vtki.num_threads`,
+do not change it. :func:`vtki.get_num_threads` reports the number of
+threads VTK estimates for its SMP tools, so it shows when a request was not
+honored.
+
+Example
+-------
+
+>>> import vtki
+>>> from vtki import examples
+>>> dataset = examples.load_uniform()
+>>> with vtki.num_threads(1):
+...     contours = dataset.contour()
+
+"""
+import contextlib
+from multiprocessing.pool import ThreadPool
+
+import vtk
+
+# The number of threads set by the user, ``None`` for the default
+_state = {'n_threads': None}
+
+
+def get_smp_backend():
+    """The name of the SMP backend of VTK, e.g. ``'Sequential'``, ``'STDThread'``,
+    ``'TBB'`` or ``'OpenMP'``. ``None`` when this build of VTK cannot report
+    its backend."""
+    get_backend = getattr(vtk.vtkSMPTools, 'GetBackend', None)
+    if get_backend is None:
+        return None
+    return get_backend()
+
+
+def get_num_threads():
+    """The number of threads VTK estimates for its SMP tools, as reported by
+    ``vtkSMPTools.GetEstimatedNumberOfThreads``. This is always one on the
+    Sequential backend and may differ from the number of threads set on the
+    TBB backend, which cannot be initialized again."""
+    return vtk.vtkSMPTools.GetEstimatedNumberOfThreads()
+
+
+def set_num_threads(n_threads=None):
+    """Set the number of threads used by the VTK algorithms and the thread
+    pools of vtki.
+
+    Parameters
+    ----------
+    n_threads : int, optional
+        The number of threads. ``None`` restores the default of VTK, usually
+        the number of processors.
+
+    Notes
+    -----
+    On the TBB backend the SMP tools of VTK keep the number of threads of
+    the first call for the rest of the process.
+
+    """
+    if n_threads is not None:
+        n_threads = int(n_threads)
+        if n_threads < 1:
+            raise AssertionError('The number of threads must be positive.')
+    _state['n_threads'] = n_threads
+    # zero restores the defaults of VTK
+    n = 0 if n_threads is None else n_threads
+    vtk.vtkMultiThreader.SetGlobalMaximumNumberOfThreads(n)
+    vtk.vtkMultiThreader.SetGlobalDefaultNumberOfThreads(n)
+    vtk.vtkSMPTools.Initialize(n)
+
+
+@contextlib.contextmanager
+def num_threads(n_threads):
+    """Use ``n_threads`` threads within a ``with`` block and then restore the
+    previous number of threads.
+
+    Parameters
+    ----------
+    n_threads : int
+        The number of threads.
+
+    Notes
+    -----
+    The SMP tools of VTK cannot be initialized again on the TBB backend, so
+    there neither the number of threads of the block nor the restore applies
+    to them once they were initialized.
+
+    """
+    previous = _state['n_threads']
+    set_num_threads(n_threads)
+    try:
+        yield
+    finally:
+        set_num_threads(previous)
+
+
+def thread_map(func, items, n_threads=None):
+    """Call ``func`` on each item in a pool of at most ``n_threads`` threads,
+    capped by the number of threads last set with ``set_num_threads`` when
+    one was set. Runs in the calling thread when ``n_threads`` is ``None``
+    or below two."""
+    items = list(items)
+    if n_threads is not None and _state['n_threads'] is not None:
+        n_threads = min(n_threads, _state['n_threads'])
+    if n_threads is None or n_threads < 2 or len(items) < 2:
+        return [func(item) for item in items]
+    pool = ThreadPool(min(n_threads, len(items)))
+    try:
+        return pool.map(func, items)
+    finally:
+        pool.close()
+        pool.join()
@@ -1875,6 +1875,79 @@ class BasePlotter(object):
         kwargs['style'] = 'points'
         self.add_mesh(points, **kwargs)
 
+    def add_glyphs(self, dataset, orient=True, scale=True, factor=1.0,
+                   geom=None, **kwargs):
+        """
+        Adds a glyph (e.g. an arrow) at every point of a dataset.
+
+        The glyphs are instanced on the GPU from a single copy of the glyph
+        geometry and are oriented and scaled by the arrays of the dataset.
+        Use ``DataSetFilters.glyph`` to create the glyph geometry instead.
+
+        Parameters
+        ----------
+        dataset : vtk.vtkDataSet
+            The dataset of the glyph positions and arrays.
+
+        orient : bool or str, optional
+            Use the active vectors array or the named array to orient the
+            glyphs.
+
+        scale : bool or str, optional
+            Use the active scalars or the named array to scale the glyphs.
+
+        factor : float, optional
+            Scale factor applied to the scaling array.
+
+        geom : vtk.vtkPolyData, optional
+            The geometry of the glyph.  Defaults to an arrow.
+
+        **kwargs : optional
+            See ``add_mesh``.
+
+        Returns
+        -------
+        actor : vtk.vtkActor
+            VTK actor of the glyphs.
+
+        """
+        if not is_vtki_obj(dataset):
+            dataset = wrap(dataset)
+        if geom is None:
+            arrow = vtk.vtkArrowSource()
+            arrow.Update()
+            geom = arrow.GetOutput()
+        if isinstance(orient, str) or isinstance(scale, str):
+            # activate the named arrays on a copy rather than on the dataset
+            # of the caller
+            dataset = dataset.copy(deep=False)
+        if isinstance(orient, str):
+            dataset.active_vectors_name = orient
+            orient = True
+        if isinstance(scale, str):
+            dataset.active_scalar_name = scale
+            scale = True
+        # add the points to set up the colors, then swap in the glyph mapper
+        actor = self.add_mesh(dataset, **kwargs)
+        mapper = vtk.vtkGlyph3DMapper()
+        mapper.ShallowCopy(actor.GetMapper())
+        mapper.SetInputData(dataset)
+        mapper.SetSourceData(geom)
+        if orient and dataset.active_vectors_name is not None:
+            mapper.SetOrientationArray(dataset.active_vectors_name)
+            mapper.SetOrientationModeToDirection()
+        mapper.SetOrient(bool(orient))
+        if scale and dataset.active_scalar_name is not None:
+            mapper.SetScaleArray(dataset.active_scalar_name)
+            mapper.SetScaleModeToScaleByMagnitude()
+        else:
+            mapper.SetScaleModeToNoDataScaling()
+        mapper.SetScaleFactor(factor)
+        actor.SetMapper(mapper)
+        self.mapper = mapper
+        self.update_bounds_axes()
+        return actor
+
     def add_arrows(self, cent, direction, mag=1, **kwargs):
         """ Adds arrows to plotting object """
         direction = direction.copy()
@@ -1889,20 +1962,7 @@ class BasePlotter(object):
         direction[:,2] *= mag
 
         pdata = vtki.vector_poly_data(cent, direction)
-        # arrows = arrows_actor(pdata)
-        # self.add_actor(arrows, reset_camera=reset_camera, name=name)
-        # Create arrow object
-        arrow = vtk.vtkArrowSource()
-        arrow.Update()
-        glyph3D = vtk.vtkGlyph3D()
-        glyph3D.SetSourceData(arrow.GetOutput())
-        glyph3D.SetInputData(pdata)
-        glyph3D.SetVectorModeToUseVector()
-        glyph3D.Update()
-
-        arrows = wrap(glyph3D.GetOutput())
-
-        return self.add_mesh(arrows, **kwargs)
+        return self.add_glyphs(pdata, orient='vectors', scale='mag', **kwargs)
 
     def screenshot(self, filename=None, transparent_background=False,
                    return_img=None):
@@ -24,13 +24,621 @@ from vtk import VTK_QUADRATIC_HEXAHEDRON
 
 import numpy as np
 import vtki
-from vtki.filters import _get_output
+from vtki.filters import (_get_output, _extract_grid_cells, _take_attributes,
+                          _take_cells, _split_poly_data, _cell_starts)
+from vtki.adjacency import get_facets
+from vtki.cache import _memoize, _is_memoized
+from vtki.common import _geometry_key
+from vtki.merging import merge_ids
+from vtki.raytracing import triangle_grid, trace_rays
+from vtki.progress import update_algorithm
 
 
 log = logging.getLogger(__name__)
 log.setLevel('CRITICAL')
 
 
+def _regular_cells(groups, n_points=None):
+    """Build a flat VTK cell array from an ``(N, k)`` array of point ids or a
+    list of them, allocating the cell array once.
+
+    Returns the number of cells and the cell array.
+    """
+    if isinstance(groups, np.ndarray):
+        groups = [groups]
+    groups = [np.asarray(group) for group in groups]
+    for group in groups:
+        if group.ndim != 2 or group.shape[1] < 1:
+            raise ValueError('Regular faces must be (N, k) arrays of point ids.')
+        if n_points is not None and group.size and \
+           (group.min() < 0 or group.max() >= n_points):
+            raise ValueError('Malformed cell array: point ids must be between 0 '
+                             'and the number of points ({}).'.format(n_points))
+    n_cells = sum(group.shape[0] for group in groups)
+    cells = np.empty(sum(group.size + group.shape[0] for group in groups),
+                     dtype=vtki.ID_TYPE)
+    start = 0
+    for group in groups:
+        n, k = group.shape
+        block = cells[start:start + n*(k + 1)].reshape((n, k + 1))
+        block[:, 0] = k
+        block[:, 1:] = group
+        start += n*(k + 1)
+    return n_cells, cells
+
+
+def _cell_points(cells, offset, ids=None):
+    """The point ids of the cells ``ids`` of a flat VTK cell array whose
+    cells start at ``offset``.  Returns an array for a single id and a list
+    of arrays for a sequence of ids or, by default, for all the cells."""
+    if ids is None:
+        ids = np.arange(offset.size)
+    elif np.ndim(ids) == 0:
+        start = offset[ids]
+        return cells[start + 1:start + 1 + cells[start]]
+    starts = offset[np.asarray(ids, dtype=np.intp)]
+    if starts.size == 0:
+        return []
+    counts = cells[starts]
+    # gather the point ids of all the cells at once and split them
+    ends = np.cumsum(counts)
+    index = np.arange(ends[-1])
+    index += np.repeat(starts + 1 - (ends - counts), counts)
+    return np.split(cells[index], ends[:-1])
+
+
+def _point_mask(remove, n_points):
+    """A boolean mask of the points to remove from a bool mask or indices"""
+    if not isinstance(remove, np.ndarray):
+        remove = np.asarray(remove)
+    if remove.dtype == bool:
+        assert_statement = 'Mask different size than n_points'
+        assert remove.size == n_points, assert_statement
+        return remove
+    remove_mask = np.zeros(n_points, bool)
+    remove_mask[remove] = True
+    return remove_mask
+
+
+def _cells_without_points(cells, offset, remove, mode='any'):
+    """Mask of the cells of a flat VTK cell array to keep when the points
+    flagged in ``remove`` are removed: the cells without any flagged point
+    for ``mode='any'``, or without all points flagged for ``mode='all'``"""
+    # the size entries are not point ids and may exceed the number of points
+    flagged = remove.take(cells, mode='clip').astype(np.intp)
+    flagged[offset] = 0
+    n_flagged = np.add.reduceat(flagged, offset)
+    if mode == 'all':
+        return n_flagged < cells[offset]
+    return n_flagged == 0
+
+
+def _face_geometry(mesh):
+    """The unit normals (Newell's method, zero for degenerate faces), the
+    areas, and the signed volumes of the tetrahedra between the origin and
+    the triangles of a fan of each face of a PolyData"""
+    cells, offset = mesh.faces, mesh.offset
+    sizes = cells[offset]
+    if not offset.size:
+        return {'normals': np.zeros((0, 3)), 'areas': np.zeros(0),
+                'volumes': np.zeros(0)}
+    # a plain array: writing to a vtki_ndarray would modify the mesh
+    points = np.asarray(mesh.points, dtype=np.float64)
+    normals = np.zeros((offset.size, 3))
+    volumes = np.zeros(offset.size)
+    for n in np.unique(sizes):
+        ids = np.nonzero(sizes == n)[0]
+        face_points = points[cells[offset[ids][:, None] + 1 + np.arange(n)]]
+        first = face_points[:, 0]
+        edges = face_points[:, 1:] - first[:, None]
+        normals[ids] = np.cross(edges[:, :-1], edges[:, 1:]).sum(axis=1)
+        volumes[ids] = (np.cross(face_points[:, 1:-1], face_points[:, 2:]) *
+                        first[:, None]).sum(axis=(1, 2)) / 6.0
+    norm = np.linalg.norm(normals, axis=1)
+    valid = norm > 0
+    normals[valid] /= norm[valid, None]
+    return {'normals': normals, 'areas': norm / 2.0, 'volumes': volumes}
+
+
+def _get_face_geometry(mesh):
+    """The cached ``_face_geometry`` of a PolyData, rebuilt only after its
+    points or its cells were modified"""
+    return _memoize(mesh, 'face_geometry', _face_geometry, key=_geometry_key)
+
+
+def _point_normals(mesh):
+    """The normalized sum of the normals of the faces of each point"""
+    normals = _get_face_geometry(mesh)['normals']
+    cells, offset = mesh.faces, mesh.offset
+    is_pid = np.ones(cells.size, dtype=bool)
+    is_pid[offset] = False
+    face = np.cumsum(~is_pid) - 1
+    pids, face = cells[is_pid], face[is_pid]
+    sums = np.column_stack([np.bincount(pids, normals[face, i], minlength=mesh.n_points)
+                            for i in range(3)])
+    norm = np.linalg.norm(sums, axis=1)
+    valid = norm > 0
+    sums[valid] /= norm[valid, None]
+    return sums
+
+
+def _normals_array(normals):
+    """A VTK array of normals named 'Normals' like those of vtkPolyDataNormals"""
+    vtkarr = numpy_to_vtk(normals, deep=True)
+    vtkarr.SetName('Normals')
+    return vtkarr
+
+
+def _consistent(mesh):
+    """Whether no edge is traversed in the same direction by two faces"""
+    cells, offset = mesh.faces, mesh.offset
+    is_pid = np.ones(cells.size, dtype=bool)
+    is_pid[offset] = False
+    start = np.repeat(offset + 1, cells[offset])
+    index = np.nonzero(is_pid)[0]
+    # the next point of each face, wrapping around to its first point
+    following = index + 1
+    last = np.append(~is_pid[1:], True)[index]
+    following[last] = start[last]
+    keys = cells[index].astype(np.int64) * mesh.n_points + cells[following]
+    return np.unique(keys).size == keys.size
+
+
+def _principal_curvatures(mean, gaussian):
+    """All the curvatures of the points from their mean and Gaussian
+    curvatures.  Where the mean squared falls below the Gaussian curvature
+    from the error of the discrete curvatures, both principal curvatures are
+    the mean curvature"""
+    root = np.sqrt(np.maximum(mean**2 - gaussian, 0))
+    return {'mean': mean, 'gaussian': gaussian,
+            'maximum': mean + root, 'minimum': mean - root}
+
+
+def _triangle_curvatures(mesh):
+    """The discrete curvatures of the points of a triangle mesh computed like
+    vtkCurvatures: the mean curvature from the dihedral angles of the edges
+    shared by two triangles and the Gaussian curvature from the angle deficit
+    of each point"""
+    n_points = mesh.n_points
+    triangles = mesh.faces.reshape(-1, 4)[:, 1:]
+    points = np.asarray(mesh.points, dtype=np.float64)
+    geometry = _get_face_geometry(mesh)
+    normals, areas = geometry['normals'], geometry['areas']
+
+    # the edges (left, right) of the triangles, three per triangle
+    left = triangles.ravel()
+    right = np.roll(triangles, -1, axis=1).ravel()
+    face = np.repeat(np.arange(triangles.shape[0]), 3)
+    corners = points[triangles]
+    edges = np.roll(corners, -1, axis=1) - corners
+
+    # angle deficit over a third of the area of the triangles of each point,
+    # where the cross product of the edges at each corner is twice the area
+    dots = -np.einsum('ijk,ijk->ij', edges, np.roll(edges, 1, axis=1))
+    angles = np.arctan2(np.repeat(2*areas, 3), dots.ravel())
+    deficit = 2*np.pi - np.bincount(left, angles, minlength=n_points)
+    point_area = np.bincount(left, np.repeat(areas, 3), minlength=n_points)
+    gaussian = np.zeros(n_points)
+    valid = point_area > 0
+    gaussian[valid] = 3*deficit[valid] / point_area[valid]
+
+    # the edges shared by exactly two triangles, seen from the first one
+    keys = np.minimum(left, right).astype(np.int64) * n_points + np.maximum(left, right)
+    order = np.argsort(keys)
+    keys = keys[order]
+    new = np.ones(keys.size, dtype=bool)
+    new[1:] = keys[1:] != keys[:-1]
+    starts = np.nonzero(new)[0]
+    counts = np.diff(np.append(starts, keys.size))
+    first, second = order[starts[counts == 2]], order[starts[counts == 2] + 1]
+    swap = face[second] < face[first]
+    first[swap], second[swap] = second[swap], first[swap]
+
+    # the signed dihedral angles, with the normal of the second triangle
+    # flipped when it is ordered like the first one
+    edges = edges.reshape(-1, 3)[first]
+    length = np.linalg.norm(edges, axis=1)
+    n_f = normals[face[first]]
+    n_n = normals[face[second]]
+    n_n[left[second] == left[first]] *= -1
+    sine = np.einsum('ij,ij->i', np.cross(n_f, n_n), edges)
+    cosine = np.einsum('ij,ij->i', n_f, n_n)
+    valid = length > 0
+    sine[valid] /= length[valid]
+    angle = np.arctan2(sine, cosine)
+
+    # the average over the edges of each point of their angles weighted by
+    # their lengths over the areas of their triangles
+    edge_area = areas[face[first]] + areas[face[second]]
+    edge_curvature = np.zeros(first.size)
+    valid = edge_area > 0
+    edge_curvature[valid] = 1.5 * length[valid] * angle[valid] / edge_area[valid]
+    ends = np.concatenate((left[first], right[first]))
+    total = np.bincount(ends, np.tile(edge_curvature, 2), minlength=n_points)
+    count = np.bincount(ends, minlength=n_points)
+    mean = np.zeros(n_points)
+    valid = count > 0
+    mean[valid] = total[valid] / count[valid]
+    return _principal_curvatures(mean, gaussian)
+
+
+def _vtk_curvatures(mesh):
+    """The curvatures of the points of a mesh from vtkCurvatures"""
+    curvefilter = vtk.vtkCurvatures()
+    curvefilter.SetInputData(mesh)
+    values = []
+    for set_type in [curvefilter.SetCurvatureTypeToMean,
+                     curvefilter.SetCurvatureTypeToGaussian]:
+        set_type()
+        update_algorithm(curvefilter)
+        values.append(vtk_to_numpy(curvefilter.GetOutput().GetPointData().GetScalars()).copy())
+    return _principal_curvatures(*values)
+
+
+def _curvatures(mesh):
+    """The curvatures of the points of a mesh, computed with NumPy for
+    meshes of triangles"""
+    if mesh._has_only_polys() and np.all(mesh.faces[mesh.offset] == 3):
+        return _triangle_curvatures(mesh)
+    return _vtk_curvatures(mesh)
+
+
+def _count_cells(cells, n_points=None):
+    """Count the cells of a VTK cell array, flat or with one cell per row,
+    and check that the point ids are within ``n_points``"""
+    if cells.ndim == 1:
+        starts = _cell_starts(cells)
+        n_cells = starts.size
+        if n_points is not None and n_cells:
+            ids = np.ones(cells.size, dtype=bool)
+            ids[starts] = False
+            ids = cells[ids]
+    else:
+        n_cells = cells.shape[0]
+        if n_cells and np.any(cells[:, 0] != cells.shape[1] - 1):
+            raise ValueError('Malformed cell array: each row must start with '
+                             'the number of points of the cell.')
+        ids = cells[:, 1:]
+    if n_points is not None and n_cells and ids.size and \
+       (ids.min() < 0 or ids.max() >= n_points):
+        raise ValueError('Malformed cell array: point ids must be between 0 '
+                         'and the number of points ({}).'.format(n_points))
+    return n_cells
+
+
+def _renumber_cells(vtkcells, point_map, offset=None):
+    """A copy of a vtkCellArray with its point ids mapped by ``point_map``"""
+    cells = vtk_to_numpy(vtkcells.GetData())
+    if offset is None:
+        offset = _cell_starts(cells)
+    renumbered = point_map[cells]
+    renumbered[offset] = cells[offset]
+    newcells = vtk.vtkCellArray()
+    newcells.SetCells(offset.size, numpy_to_vtkIdTypeArray(renumbered, deep=True))
+    return newcells
+
+
+def merge_points(mesh, tolerance=0.0, point_data='first', chain=False):
+    """
+    Merge the coincident points of a mesh with NumPy.
+
+    The points are hashed into a grid of cells as large as the tolerance,
+    so that only nearby points are compared.  Like the point locators of
+    VTK, the points are merged in order: each point is merged into the first
+    point kept before it within the tolerance, and kept otherwise.  The
+    merged points keep the order and the coordinates of the points kept.
+    The cells are kept as they are, even when merging makes them
+    degenerate.
+
+    Parameters
+    ----------
+    mesh : vtki.PolyData or vtki.UnstructuredGrid
+        The mesh whose points are merged.
+
+    tolerance : float, optional
+        The distance within which points are merged.  Only identical points
+        are merged by default.
+
+    point_data : str, optional
+        Take the point data of each merged point from the ``'first'`` or the
+        ``'last'`` of its points.
+
+    chain : bool, optional
+        Merge the points transitively instead: the points of a chain of
+        points each within the tolerance of the next are merged into one,
+        however long the chain.  Off by default.
+
+    Returns
+    -------
+    merged : vtki.PolyData or vtki.UnstructuredGrid
+        The mesh with merged points.
+
+    point_map : np.ndarray
+        The index of the merged point of each point of the mesh.
+
+    Examples
+    --------
+    >>> import vtki
+    >>> from vtki import examples
+    >>> hexbeam = examples.load_hexbeam()
+    >>> doubled = hexbeam.merge(hexbeam, merge_points=False, inplace=False)
+    >>> merged, point_map = vtki.merge_points(doubled)
+    >>> merged.n_points == hexbeam.n_points
+    True
+
+    """
+    if point_data not in ['first', 'last']:
+        raise RuntimeError('Point data ({}) not understood. Use "first" or '
+                           '"last".'.format(point_data))
+    if isinstance(mesh, vtkUnstructuredGrid) and mesh.GetFaces() is not None:
+        raise Exception('Grids of polyhedral cells are not supported')
+    if not isinstance(mesh, (vtkPolyData, vtkUnstructuredGrid)):
+        raise TypeError('Only PolyData and UnstructuredGrid points can be '
+                        'merged, not {}'.format(type(mesh)))
+    if not vtki.is_vtki_obj(mesh):
+        mesh = vtki.wrap(mesh)
+    if not mesh.n_points:
+        return mesh.copy(), np.zeros(0, dtype=np.intp)
+    point_map, kept = merge_ids(np.asarray(mesh.points), tolerance, chain)
+    if point_data == 'last':
+        # the last point of each merged point, the points being in order
+        # within each merged point once stably sorted
+        order = np.argsort(point_map, kind='mergesort')
+        data_ind = order[np.searchsorted(point_map[order], np.arange(kept.size),
+                                         'right') - 1]
+    else:
+        data_ind = kept
+    return _merged_mesh(mesh, point_map, kept, data_ind), point_map
+
+
+def _triangle_grid(mesh):
+    """The grid of the triangles of the polygons and strips of a mesh for
+    ray tracing, with the cell id of each triangle"""
+    faces = mesh.faces
+    if mesh._has_only_polys() and faces.size == 4 * mesh.n_cells and \
+       np.all(faces[::4] == 3):
+        triangles = faces.reshape((-1, 4))[:, 1:]
+        cell_ids = np.arange(mesh.n_cells, dtype=vtki.ID_TYPE)
+    else:
+        # let VTK triangulate the other polygons and the strips, tracking
+        # the cell of each triangle
+        geometry = vtk.vtkPolyData()
+        geometry.SetPoints(mesh.GetPoints())
+        geometry.SetPolys(mesh.GetPolys())
+        geometry.SetStrips(mesh.GetStrips())
+        n_before = mesh.GetNumberOfVerts() + mesh.GetNumberOfLines()
+        ids = numpy_to_vtk(np.arange(n_before, mesh.n_cells, dtype=vtki.ID_TYPE),
+                           deep=True, array_type=vtk.VTK_ID_TYPE)
+        ids.SetName('vtkOriginalCellIds')
+        geometry.GetCellData().AddArray(ids)
+        alg = vtk.vtkTriangleFilter()
+        alg.SetInputData(geometry)
+        alg.PassVertsOff()
+        alg.PassLinesOff()
+        update_algorithm(alg)
+        output = alg.GetOutput()
+        triangles = vtk_to_numpy(output.GetPolys().GetData()).reshape((-1, 4))[:, 1:]
+        cell_ids = vtk_to_numpy(output.GetCellData().GetArray('vtkOriginalCellIds'))
+    return triangle_grid(np.asarray(mesh.points), triangles), cell_ids
+
+
+def _merge_used_points(mesh, tolerance):
+    """Merge the points of a PolyData used by its cells in the order of their
+    first use by its verts, lines, polys and strips, like the locator of
+    vtkCleanPolyData, dropping the unused points"""
+    ids = [np.zeros(0, dtype=np.intp)]
+    for vtkcells in [mesh.GetVerts(), mesh.GetLines(), mesh.GetPolys(),
+                     mesh.GetStrips()]:
+        cells = vtk_to_numpy(vtkcells.GetData())
+        if cells.size:
+            used = np.ones(cells.size, dtype=bool)
+            used[_cell_starts(cells)] = False
+            ids.append(cells[used])
+    ids = np.concatenate(ids)
+    order = ids[np.sort(np.unique(ids, return_index=True)[1])]
+    local_map, kept = merge_ids(np.asarray(mesh.points)[order], tolerance)
+    point_map = np.zeros(mesh.n_points, dtype=np.intp)
+    point_map[order] = local_map
+    return _merged_mesh(mesh, point_map, order[kept], order[kept])
+
+
+def _merged_mesh(mesh, point_map, kept, data_ind):
+    """Copy a mesh keeping the points ``kept`` with the point data of the
+    points ``data_ind``, the cells being renumbered by ``point_map``"""
+    merged = type(mesh)()
+    merged.SetPoints(vtki.vtk_points(np.asarray(mesh.points)[kept]))
+    if isinstance(mesh, vtkPolyData):
+        merged.SetVerts(_renumber_cells(mesh.GetVerts(), point_map))
+        merged.SetLines(_renumber_cells(mesh.GetLines(), point_map))
+        merged.SetPolys(_renumber_cells(mesh.GetPolys(), point_map, mesh.offset))
+        merged.SetStrips(_renumber_cells(mesh.GetStrips(), point_map))
+    else:
+        types = vtk.vtkUnsignedCharArray()
+        types.DeepCopy(mesh.GetCellTypesArray())
+        # the cell locations of VTK 9 index the connectivity array, so the
+        # legacy locations are rebuilt from the starts of the padded cells
+        starts = mesh.offset
+        locations = numpy_to_vtkIdTypeArray(starts.astype(vtki.ID_TYPE), deep=True)
+        merged.SetCells(types, locations,
+                        _renumber_cells(mesh.GetCells(), point_map, starts))
+    _take_attributes(mesh.GetPointData(), merged.GetPointData(), data_ind)
+    merged.GetCellData().ShallowCopy(mesh.GetCellData())
+    merged.GetFieldData().ShallowCopy(mesh.GetFieldData())
+    merged.copy_meta_from(mesh)
+    return merged
+
+
+# The operation of vtkBooleanOperationPolyDataFilter and whether the cells
+# of the first and of the second mesh outside the other mesh are kept
+_BOOLEAN_OPERATIONS = {
+    'union': (vtk.vtkBooleanOperationPolyDataFilter.VTK_UNION, True, True),
+    'intersection': (vtk.vtkBooleanOperationPolyDataFilter.VTK_INTERSECTION,
+                     False, False),
+    'difference': (vtk.vtkBooleanOperationPolyDataFilter.VTK_DIFFERENCE,
+                   True, False),
+}
+
+# The cell arrays of the boolean filter and their values for the cells kept
+# away from the other mesh, ``None`` being the index of the input mesh
+_BOOLEAN_CELL_ARRAYS = [('CellSource', None), ('BadTriangle', 0), ('FreeEdge', 0)]
+
+
+def _padded_bounds(mesh):
+    """The bounds of a mesh padded on each side by their diagonal"""
+    bounds = np.array(mesh.bounds).reshape((3, 2))
+    pad = np.linalg.norm(bounds[:, 1] - bounds[:, 0])
+    return (bounds + [-pad, pad]).ravel()
+
+
+def _cell_bounds(mesh):
+    """The lower and the upper corner of the bounds of each polygon of a mesh"""
+    faces = mesh.faces
+    offset = mesh.offset
+    is_pid = np.ones(faces.size, dtype=bool)
+    is_pid[offset] = False
+    points = np.asarray(mesh.points)[faces[is_pid]]
+    # the start of each polygon once the counts of points are removed
+    starts = offset - np.arange(offset.size)
+    return (np.minimum.reduceat(points, starts), np.maximum.reduceat(points, starts))
+
+
+def _cells_within_bounds(mesh, bounds):
+    """Label the polygons of a mesh whose bounds overlap ``bounds`` with 0
+    and the other polygons with 1, the bounds of the polygons being cached
+    until the mesh is modified"""
+    lower, upper = _memoize(mesh, 'cell_bounds', _cell_bounds)
+    bounds = np.array(bounds).reshape((3, 2))
+    within = np.all((upper >= bounds[:, 0]) & (lower <= bounds[:, 1]), axis=1)
+    return (~within).astype(np.intp)
+
+
+def _has_point_within(mesh, bounds):
+    """Whether a point of the mesh is within ``bounds``"""
+    bounds = np.array(bounds).reshape((3, 2))
+    points = np.asarray(mesh.points)
+    return bool(np.all((points >= bounds[:, 0]) & (points <= bounds[:, 1]),
+                       axis=1).any())
+
+
+def _run_boolean(mesh_a, mesh_b, operation, tolerance):
+    """Run vtkBooleanOperationPolyDataFilter on two meshes"""
+    bfilter = vtk.vtkBooleanOperationPolyDataFilter()
+    bfilter.SetOperation(_BOOLEAN_OPERATIONS[operation][0])
+    bfilter.SetInputData(0, mesh_a)
+    bfilter.SetInputData(1, mesh_b)
+    bfilter.ReorientDifferenceCellsOff()
+    if tolerance is not None:
+        bfilter.SetTolerance(tolerance)
+    update_algorithm(bfilter)
+    output = PolyData(bfilter.GetOutput())
+    # the distances to the other mesh are not computed for the culled cells
+    output.GetPointData().RemoveArray('Distance')
+    output.GetCellData().RemoveArray('Distance')
+    return output
+
+
+def _add_source_arrays(part, source, output):
+    """Add the arrays that the boolean filter adds to its ``output`` to the
+    cells of the mesh ``source`` kept away from the other mesh"""
+    arrays = [(part.GetPointData(), output.GetPointData(), 'PointSource', source)]
+    arrays += [(part.GetCellData(), output.GetCellData(), name,
+                source if value is None else value)
+               for name, value in _BOOLEAN_CELL_ARRAYS]
+    for target, reference, name, value in arrays:
+        vtkarr = reference.GetArray(name)
+        if vtkarr is None:
+            continue
+        n_tuples = part.n_points if target is part.GetPointData() else part.n_cells
+        arr = np.full(n_tuples, value, dtype=vtk_to_numpy(vtkarr).dtype)
+        newarr = numpy_to_vtk(arr, deep=True, array_type=vtkarr.GetDataType())
+        newarr.SetName(name)
+        target.AddArray(newarr)
+
+
+def _boolean_operation(mesh_a, mesh_b, operation, tolerance=None):
+    """Run a boolean operation on the surfaces of two meshes with
+    ``vtkBooleanOperationPolyDataFilter``, only on their cells near the other
+    mesh.
+
+    The polygons of each mesh whose bounds overlap the bounds of the other
+    mesh, padded on each side by their diagonal, are found from the bounds
+    of the polygons, cached until the mesh is modified.  Only these polygons
+    are intersected and classified by VTK: every point of the other mesh is
+    then closer to them than to the culled polygons, as long as each mesh has
+    a point within the bounds of the other mesh.  The culled polygons are
+    outside of the other mesh and are kept or dropped by the operation as a
+    whole, then joined to the output at the points they share with it.
+    Meshes that do not overlap this way, or that have cells other than
+    polygons, are operated on as a whole.
+
+    Parameters
+    ----------
+    mesh_a : vtki.PolyData
+        The first mesh.
+
+    mesh_b : vtki.PolyData
+        The second mesh.
+
+    operation : str
+        ``'union'``, ``'intersection'`` or ``'difference'``.
+
+    tolerance : float, optional
+        The tolerance of the intersection of the meshes.  Defaults to the
+        tolerance of VTK.
+
+    Returns
+    -------
+    output : vtki.PolyData
+        The output of the operation, with the ``PointSource``,
+        ``CellSource``, ``BadTriangle`` and ``FreeEdge`` arrays of VTK but
+        without its ``Distance`` arrays.
+
+    """
+    if operation not in _BOOLEAN_OPERATIONS:
+        raise RuntimeError('Operation ({}) not understood. Use "union", '
+                           '"intersection" or "difference".'.format(operation))
+    meshes = [mesh if vtki.is_vtki_obj(mesh) else vtki.wrap(mesh)
+              for mesh in (mesh_a, mesh_b)]
+    if not all(mesh.n_cells and mesh._has_only_polys() for mesh in meshes):
+        return _run_boolean(meshes[0], meshes[1], operation, tolerance)
+    labels = [_cells_within_bounds(meshes[0], _padded_bounds(meshes[1])),
+              _cells_within_bounds(meshes[1], _padded_bounds(meshes[0]))]
+    if not (labels[0].any() or labels[1].any()):
+        return _run_boolean(meshes[0], meshes[1], operation, tolerance)
+    # the cells near and the cells away from the other mesh
+    parts = [_split_poly_data(mesh, label, 2)
+             for mesh, label in zip(meshes, labels)]
+    if not (_has_point_within(parts[0][0], meshes[1].bounds) and
+            _has_point_within(parts[1][0], meshes[0].bounds)):
+        return _run_boolean(meshes[0], meshes[1], operation, tolerance)
+    output = _run_boolean(parts[0][0], parts[1][0], operation, tolerance)
+
+    alg = vtk.vtkAppendPolyData()
+    alg.AddInputData(output)
+    for source, keep in enumerate(_BOOLEAN_OPERATIONS[operation][1:]):
+        far = parts[source][1]
+        if keep and far.n_cells:
+            _add_source_arrays(far, source, output)
+            alg.AddInputData(far)
+    if alg.GetNumberOfInputConnections(0) < 2:
+        return output
+    update_algorithm(alg)
+    appended = PolyData(alg.GetOutput())
+
+    # join the kept cells to the points of the output they coincide with,
+    # without merging any other point
+    point_map, kept = merge_ids(np.asarray(appended.points))
+    first = kept[point_map]
+    n_output = output.n_points
+    joined = np.zeros(appended.n_points, dtype=bool)
+    joined[n_output:] = first[n_output:] < n_output
+    target = np.arange(appended.n_points)
+    target[joined] = first[joined]
+    kept = np.nonzero(~joined)[0]
+    point_map = (np.cumsum(~joined) - 1)[target]
+    return _merged_mesh(appended, point_map, kept, kept)
+
+
 class PolyData(vtkPolyData, vtki.Common):
     """
     Extends the functionality of a vtk.vtkPolyData object
@@ -64,6 +672,10 @@ class PolyData(vtkPolyData, vtki.Common):
     >>> faces = np.hstack([[3, 0, 1, 2], [3, 0, 3, 2]]).astype(np.int8)
     >>> surf = vtki.PolyData(vertices, faces)
 
+    >>> # initialize from vertices and an (N, 3) array of triangles
+    >>> triangles = np.array([[0, 1, 2], [0, 3, 2]])
+    >>> surf = vtki.PolyData(vertices, regular_faces=triangles)
+
     >>>  # initialize from a filename
     >>> surf = vtki.PolyData(examples.antfile)
     """
@@ -72,7 +684,14 @@ class PolyData(vtkPolyData, vtki.Common):
         super(PolyData, self).__init__()
 
         deep = kwargs.pop('deep', False)
+        regular_faces = kwargs.pop('regular_faces', None)
 
+        if regular_faces is not None:
+            if len(args) != 1 or not isinstance(args[0], np.ndarray):
+                raise TypeError('Regular faces require an array of points')
+            self.points = np.array(args[0]) if deep else args[0]
+            self.regular_faces = regular_faces
+            return
         if not args:
             return
         elif len(args) == 1:
@@ -146,7 +765,7 @@ class PolyData(vtkPolyData, vtki.Common):
 
         # Load file
         reader.SetFileName(filename)
-        reader.Update()
+        update_algorithm(reader)
         self.ShallowCopy(reader.GetOutput())
 
         # sanity check
@@ -163,16 +782,8 @@ class PolyData(vtkPolyData, vtki.Common):
         if faces.dtype != vtki.ID_TYPE:
             faces = faces.astype(vtki.ID_TYPE)
 
-        # get number of faces
-        if faces.ndim == 1:
-            log.debug('efficiency warning')
-            c = 0
-            nfaces = 0
-            while c < faces.size:
-                c += faces[c] + 1
-                nfaces += 1
-        else:
-            nfaces = faces.shape[0]
+        n_points = self.n_points if self.GetPoints() is not None else None
+        nfaces = _count_cells(faces, n_points)
 
         vtkcells = vtk.vtkCellArray()
         vtkcells.SetCells(nfaces, numpy_to_vtkIdTypeArray(faces, deep=False))
@@ -183,6 +794,87 @@ class PolyData(vtkPolyData, vtki.Common):
         self._face_ref = faces
         self.Modified()
 
+    @property
+    def offset(self):
+        """The index of the start of each face in ``faces``.  Built once and
+        cached until the faces are modified."""
+        polys = self.GetPolys()
+        mtime = max(polys.GetMTime(), polys.GetData().GetMTime())
+        cached = self.__dict__.get('_offset')
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, _cell_starts(self.faces))
+            self.__dict__['_offset'] = cached
+        return cached[1]
+
+    def get_cell_points(self, ids=None):
+        """The point ids of one or more faces, found in constant time per
+        face through the cached ``offset`` of the faces.
+
+        Parameters
+        ----------
+        ids : int or sequence of int, optional
+            The indices of the faces.  All the faces by default.  These are
+            the cell ids when the mesh contains only faces.
+
+        Returns
+        -------
+        points : np.ndarray or list of np.ndarray
+            The point ids of the face, or a list of the point ids of each
+            face for a sequence of ids.
+
+        Examples
+        --------
+        >>> import vtki
+        >>> sphere = vtki.Sphere()
+        >>> sphere.get_cell_points(0)
+        array([ 2, 30,  0])
+        >>> for points in sphere.get_cell_points([0, 1]):
+        ...     print(points)
+        [ 2 30  0]
+        [30 58  0]
+
+        """
+        return _cell_points(self.faces, self.offset, ids)
+
+    @property
+    def regular_faces(self):
+        """The faces of a mesh whose faces all have the same number of points
+        as an ``(N, k)`` array of point ids.  This is a view of the faces, not
+        a copy.
+
+        Set with an ``(N, k)`` array of point ids, or a list of them for a
+        mesh of faces of several sizes, e.g. ``[triangles, quads]``.
+        """
+        polys = self.GetPolys()
+        if hasattr(polys, 'GetConnectivityArray'):
+            # VTK 9 keeps the point ids apart from the offsets of the faces,
+            # while ``faces`` is a copy in the legacy layout
+            conn = vtk_to_numpy(polys.GetConnectivityArray())
+            sizes = np.diff(vtk_to_numpy(polys.GetOffsetsArray()))
+            if sizes.size == 0:
+                return np.empty((0, 3), dtype=conn.dtype)
+            if np.any(sizes != sizes[0]):
+                raise ValueError('The faces do not all have the same number of points.')
+            return conn.reshape((-1, sizes[0]))
+        faces = self.faces
+        if faces.size == 0:
+            return np.empty((0, 3), dtype=faces.dtype)
+        step = int(faces[0]) + 1
+        if faces.size % step or np.any(faces[::step] != step - 1):
+            raise ValueError('The faces do not all have the same number of points.')
+        return faces.reshape((-1, step))[:, 1:]
+
+    @regular_faces.setter
+    def regular_faces(self, faces):
+        """ set faces from (N, k) arrays of point ids """
+        n_points = self.n_points if self.GetPoints() is not None else None
+        nfaces, cells = _regular_cells(faces, n_points)
+        vtkcells = vtk.vtkCellArray()
+        vtkcells.SetCells(nfaces, numpy_to_vtkIdTypeArray(cells, deep=False))
+        self.SetPolys(vtkcells)
+        self._face_ref = cells
+        self.Modified()
+
     # @property
     # def lines(self):
     #     """ returns a copy of the indices of the lines """
@@ -226,15 +918,7 @@ class PolyData(vtkPolyData, vtki.Common):
             if faces.dtype != vtki.ID_TYPE:
                 faces = faces.astype(vtki.ID_TYPE)
 
-            # get number of faces
-            if faces.ndim == 1:
-                c = 0
-                nfaces = 0
-                while c < faces.size:
-                    c += faces[c] + 1
-                    nfaces += 1
-            else:
-                nfaces = faces.shape[0]
+            nfaces = _count_cells(faces, self.n_points)
 
             idarr = numpy_to_vtkIdTypeArray(faces.ravel(), deep=deep)
             vtkcells.SetCells(nfaces, idarr)
@@ -246,31 +930,61 @@ class PolyData(vtkPolyData, vtki.Common):
             self.points = vertices
             self.faces = faces
 
-    def edge_mask(self, angle):
+    def edge_mask(self, angle, return_edges=False):
         """
         Returns a mask of the points of a surface mesh that have a surface
         angle greater than angle
 
+        An edge shared by two faces is a feature edge when the angle between
+        the normals of the faces exceeds ``angle``, as in
+        ``vtk.vtkFeatureEdges``.  The angles are computed with NumPy from
+        the face normals and the edges of the faces, both cached until the
+        mesh is modified.  The mesh itself is not modified.
+
         Parameters
         ----------
         angle : float
             Angle to consider an edge.
 
-        """
-        self.point_arrays['point_ind'] = np.arange(self.n_points)
-        featureEdges = vtk.vtkFeatureEdges()
-        featureEdges.SetInputData(self)
-        featureEdges.FeatureEdgesOn()
-        featureEdges.BoundaryEdgesOff()
-        featureEdges.NonManifoldEdgesOff()
-        featureEdges.ManifoldEdgesOff()
-        featureEdges.SetFeatureAngle(angle)
-        featureEdges.Update()
-        edges = featureEdges.GetOutput()
-        orig_id = vtki.point_scalar(edges, 'point_ind')
-
-        return np.in1d(self.point_arrays['point_ind'], orig_id,
-                       assume_unique=True)
+        return_edges : bool, optional
+            Also return the edges of the faces and a mask of the feature
+            edges.
+
+        Returns
+        -------
+        mask : np.ndarray
+            Mask of the points on a feature edge.
+
+        edges : np.ndarray
+            The ``(E, 2)`` point ids of the edges of the faces, each sorted.
+            Only returned when ``return_edges`` is True.
+
+        edge_mask : np.ndarray
+            Mask of the feature edges.  Only returned when ``return_edges``
+            is True.
+
+        """
+        mesh = self
+        if not self._has_only_polys():
+            # only the faces have normals
+            mesh = PolyData()
+            mesh.SetPoints(self.GetPoints())
+            mesh.SetPolys(self.GetPolys())
+        owners, counts, edges = get_facets(mesh)
+        if edges.shape[1] != 2:
+            edges = np.empty((0, 2), dtype=edges.dtype)
+        # the manifold edges between two faces
+        shared = np.nonzero(counts == 2)[0]
+        first = (np.cumsum(counts) - counts)[shared]
+        normals = _get_face_geometry(self)['normals']
+        cosine = (normals[owners[first]] * normals[owners[first + 1]]).sum(axis=1)
+        edge_mask = np.zeros(edges.shape[0], dtype=bool)
+        edge_mask[shared] = cosine <= np.cos(np.radians(angle))
+        mask = np.zeros(self.n_points, dtype=bool)
+        mask[edges[edge_mask].ravel()] = True
+        if return_edges:
+            return mask, edges, edge_mask
+        return mask
 
     def __sub__(self, cutting_mesh):
         """ subtract two meshes """
@@ -289,6 +1003,9 @@ class PolyData(vtkPolyData, vtki.Common):
         """
         Performs a Boolean cut using another mesh.
 
+        Only the cells of each mesh near the other mesh are operated on by
+        VTK, the others being kept or dropped as a whole.
+
         Parameters
         ----------
         cut : vtki.PolyData
@@ -303,20 +1020,12 @@ class PolyData(vtkPolyData, vtki.Common):
             The cut mesh when inplace=False
 
         """
-        bfilter = vtk.vtkBooleanOperationPolyDataFilter()
-        bfilter.SetOperationToIntersection()
-        # bfilter.SetOperationToDifference()
-
-        bfilter.SetInputData(1, cut)
-        bfilter.SetInputData(0, self)
-        bfilter.ReorientDifferenceCellsOff()
-        bfilter.SetTolerance(tolerance)
-        bfilter.Update()
+        output = _boolean_operation(self, cut, 'intersection', tolerance)
 
         if inplace:
-            self.overwrite(bfilter.GetOutput())
+            self.overwrite(output)
         else:
-            return PolyData(bfilter.GetOutput())
+            return output
 
     def __add__(self, mesh):
         """ adds two meshes together """
@@ -344,7 +1053,7 @@ class PolyData(vtkPolyData, vtki.Common):
         vtkappend = vtk.vtkAppendPolyData()
         vtkappend.AddInputData(self)
         vtkappend.AddInputData(mesh)
-        vtkappend.Update()
+        update_algorithm(vtkappend)
 
         if inplace:
             self.overwrite(vtkappend.GetOutput())
@@ -355,6 +1064,9 @@ class PolyData(vtkPolyData, vtki.Common):
         """
         Combines two meshes and attempts to create a manifold mesh.
 
+        Only the cells of each mesh near the other mesh are operated on by
+        VTK, the others being kept or dropped as a whole.
+
         Parameters
         ----------
         mesh : vtki.PolyData
@@ -369,23 +1081,21 @@ class PolyData(vtkPolyData, vtki.Common):
             The union mesh when inplace=False.
 
         """
-        bfilter = vtk.vtkBooleanOperationPolyDataFilter()
-        bfilter.SetOperationToUnion()
-        bfilter.SetInputData(1, mesh)
-        bfilter.SetInputData(0, self)
-        bfilter.ReorientDifferenceCellsOff()
-        bfilter.Update()
+        output = _boolean_operation(self, mesh, 'union')
 
         if inplace:
-            self.overwrite(bfilter.GetOutput())
+            self.overwrite(output)
         else:
-            return PolyData(bfilter.GetOutput())
+            return output
 
     def boolean_difference(self, mesh, inplace=False):
         """
         Combines two meshes and retains only the volume in common
         between the meshes.
 
+        Only the cells of each mesh near the other mesh are operated on by
+        VTK, the others being kept or dropped as a whole.
+
         Parameters
         ----------
         mesh : vtki.PolyData
@@ -400,22 +1110,21 @@ class PolyData(vtkPolyData, vtki.Common):
             The union mesh when inplace=False.
 
         """
-        bfilter = vtk.vtkBooleanOperationPolyDataFilter()
-        bfilter.SetOperationToDifference()
-        bfilter.SetInputData(1, mesh)
-        bfilter.SetInputData(0, self)
-        bfilter.ReorientDifferenceCellsOff()
-        bfilter.Update()
+        output = _boolean_operation(self, mesh, 'difference')
 
         if inplace:
-            self.overwrite(bfilter.GetOutput())
+            self.overwrite(output)
         else:
-            return PolyData(bfilter.GetOutput())
+            return output
 
     def curvature(self, curv_type='mean'):
         """
         Returns the pointwise curvature of a mesh
 
+        All the curvatures are computed at once and cached until the mesh is
+        modified. The curvatures of triangle meshes are computed with NumPy
+        like ``vtkCurvatures``, which is used for other meshes.
+
         Parameters
         ----------
         mesh : vtk.polydata
@@ -435,26 +1144,10 @@ class PolyData(vtkPolyData, vtki.Common):
 
         """
         curv_type = curv_type.lower()
-
-        # Create curve filter and compute curvature
-        curvefilter = vtk.vtkCurvatures()
-        curvefilter.SetInputData(self)
-        if curv_type == 'mean':
-            curvefilter.SetCurvatureTypeToMean()
-        elif curv_type == 'gaussian':
-            curvefilter.SetCurvatureTypeToGaussian()
-        elif curv_type == 'maximum':
-            curvefilter.SetCurvatureTypeToMaximum()
-        elif curv_type == 'minimum':
-            curvefilter.SetCurvatureTypeToMinimum()
-        else:
+        if curv_type not in ['mean', 'gaussian', 'maximum', 'minimum']:
             raise Exception('Curv_Type must be either "Mean", ' +
                             '"Gaussian", "Maximum", or "Minimum"')
-        curvefilter.Update()
-
-        # Compute and return curvature
-        curv = curvefilter.GetOutput()
-        return vtk_to_numpy(curv.GetPointData().GetScalars())
+        return _memoize(self, 'curvature', _curvatures)[curv_type].copy()
 
     def save(self, filename, binary=True):
         """
@@ -496,7 +1189,7 @@ class PolyData(vtkPolyData, vtki.Common):
             writer.SetFileTypeToBinary()
         else:
             writer.SetFileTypeToASCII()
-        writer.Write()
+        update_algorithm(writer)
 
     def plot_curvature(self, curv_type='mean', **kwargs):
         """
@@ -543,7 +1236,7 @@ class PolyData(vtkPolyData, vtki.Common):
         trifilter.SetInputData(self)
         trifilter.PassVertsOff()
         trifilter.PassLinesOff()
-        trifilter.Update()
+        update_algorithm(trifilter)
         if inplace:
             self.overwrite(trifilter.GetOutput())
         else:
@@ -593,7 +1286,7 @@ class PolyData(vtkPolyData, vtki.Common):
             tube.SetInputArrayToProcess(0, 0, 0, field, scalars)
             tube.SetVaryRadiusToVaryRadiusByScalar()
         # Apply the filter
-        tube.Update()
+        update_algorithm(tube)
         return _get_output(tube)
 
     def subdivide(self, nsub, subfilter='linear', inplace=False):
@@ -659,7 +1352,7 @@ class PolyData(vtkPolyData, vtki.Common):
         # Subdivide
         sfilter.SetNumberOfSubdivisions(nsub)
         sfilter.SetInputData(self)
-        sfilter.Update()
+        update_algorithm(sfilter)
         submesh = PolyData(sfilter.GetOutput())
         if inplace:
             self.overwrite(submesh)
@@ -710,7 +1403,7 @@ class PolyData(vtkPolyData, vtki.Common):
         featureEdges.SetBoundaryEdges(boundary_edges)
         featureEdges.SetFeatureEdges(feature_edges)
         featureEdges.SetColoring(False)
-        featureEdges.Update()
+        update_algorithm(featureEdges)
         return PolyData(featureEdges.GetOutput())
 
     def decimate(self, target_reduction, volume_preservation=False,
@@ -806,7 +1499,7 @@ class PolyData(vtkPolyData, vtki.Common):
         decimate.SetTargetReduction(target_reduction)
 
         decimate.SetInputData(self)
-        decimate.Update()
+        update_algorithm(decimate)
 
         if inplace:
             self.overwrite(decimate.GetOutput())
@@ -828,7 +1521,10 @@ class PolyData(vtkPolyData, vtki.Common):
         self.GetPointData().DeepCopy(mesh.GetPointData())
 
         # copy cells and cell data
+        self.SetVerts(mesh.GetVerts())
+        self.SetLines(mesh.GetLines())
         self.SetPolys(mesh.GetPolys())
+        self.SetStrips(mesh.GetStrips())
         self.GetCellData().DeepCopy(mesh.GetCellData())
 
         # Must rebuild or subsequent operations on this mesh will segfault
@@ -851,7 +1547,7 @@ class PolyData(vtkPolyData, vtki.Common):
         comfilter = vtk.vtkCenterOfMass()
         comfilter.SetInputData(self)
         comfilter.SetUseScalarsAsWeights(scalars_weight)
-        comfilter.Update()
+        update_algorithm(comfilter)
         return np.array(comfilter.GetCenter())
 
     def compute_normals(self, cell_normals=True, point_normals=True,
@@ -931,7 +1627,24 @@ class PolyData(vtkPolyData, vtki.Common):
 
         May be easier to run mesh.point_normals or mesh.cell_normals
 
+        Meshes of only polygons whose normals need neither splitting,
+        flipping, nor reordering are handled with NumPy from normals cached
+        until the mesh is modified.
+
         """
+        if not (split_vertices or flip_normals or auto_orient_normals):
+            point_array = point_normals and self._numpy_normals(True, consistent_normals)
+            cell_array = cell_normals and self._numpy_normals(False, consistent_normals)
+            if point_array is not None and cell_array is not None:
+                mesh = self if inplace else self.copy(deep=False)
+                if point_normals:
+                    mesh.GetPointData().SetNormals(_normals_array(point_array))
+                if cell_normals:
+                    mesh.GetCellData().SetNormals(_normals_array(cell_array))
+                if not inplace:
+                    return mesh
+                return
+
         normal = vtk.vtkPolyDataNormals()
         normal.SetComputeCellNormals(cell_normals)
         normal.SetComputePointNormals(point_normals)
@@ -942,22 +1655,42 @@ class PolyData(vtkPolyData, vtki.Common):
         normal.SetNonManifoldTraversal(non_manifold_traversal)
         normal.SetFeatureAngle(feature_angle)
         normal.SetInputData(self)
-        normal.Update()
+        update_algorithm(normal)
 
         if inplace:
             self.overwrite(normal.GetOutput())
         else:
             return PolyData(normal.GetOutput())
 
+    def _numpy_normals(self, point, consistent_normals=True):
+        """The single precision point or cell normals of a mesh of polygons
+        from the cached normals, or ``None`` when the mesh has other cells or
+        its polygons would be reordered for consistency"""
+        if not self._has_only_polys():
+            return None
+        if consistent_normals and not _memoize(self, 'consistent', _consistent):
+            return None
+        if point:
+            normals = _memoize(self, 'point_normals', _point_normals)
+        else:
+            normals = _get_face_geometry(self)['normals']
+        return normals.astype(np.float32)
+
     @property
     def point_normals(self):
         """ Point normals """
+        normals = self._numpy_normals(True)
+        if normals is not None:
+            return normals
         mesh = self.compute_normals(cell_normals=False, inplace=False)
         return mesh.point_arrays['Normals']
 
     @property
     def cell_normals(self):
         """ Cell normals  """
+        normals = self._numpy_normals(False)
+        if normals is not None:
+            return normals
         mesh = self.compute_normals(point_normals=False, inplace=False)
         return mesh.cell_arrays['Normals']
 
@@ -1010,7 +1743,7 @@ class PolyData(vtkPolyData, vtki.Common):
         clip.SetClipFunction(plane)
 
         clip.SetInputData(self)
-        clip.Update()
+        update_algorithm(clip)
 
         if inplace:
             self.overwrite(clip.GetOutput())
@@ -1040,12 +1773,12 @@ class PolyData(vtkPolyData, vtki.Common):
         connect.SetExtractionModeToLargestRegion()
 
         connect.SetInputData(self)
-        connect.Update()
+        update_algorithm(connect)
 
         geofilter = vtk.vtkGeometryFilter()
 
         geofilter.SetInputData(connect.GetOutput())
-        geofilter.Update()
+        update_algorithm(geofilter)
 
         if inplace:
             self.overwrite(geofilter.GetOutput())
@@ -1079,7 +1812,7 @@ class PolyData(vtkPolyData, vtki.Common):
         fill = vtk.vtkFillHolesFilter()
         fill.SetHoleSize(hole_size)
         fill.SetInputData(self)
-        fill.Update()
+        update_algorithm(fill)
         pdata = PolyData(fill.GetOutput(), deep=True)
         return pdata
 
@@ -1092,7 +1825,9 @@ class PolyData(vtkPolyData, vtki.Common):
         Parameters
         ----------
         point_merging : bool, optional
-            Enables point merging.  On by default.
+            Enables point merging.  On by default.  The points are merged
+            in the order of their first use by the cells, like
+            vtkCleanPolyData.  See ``vtki.merge_points``.
 
         merge_tol : float, optional
             Set merging tolarance.  When enabled merging is set to
@@ -1117,59 +1852,94 @@ class PolyData(vtkPolyData, vtki.Common):
         mesh : vtki.PolyData
             Cleaned mesh.  None when inplace=True
         """
+        mesh = self
+        if point_merging:
+            mesh = _merge_used_points(self, merge_tol or 0.0)
+        # the points are merged with NumPy rather than with the locator of
+        # vtkCleanPolyData, which still removes unused points and degenerate
+        # cells
         clean = vtk.vtkCleanPolyData()
+        clean.PointMergingOff()
         clean.SetConvertLinesToPoints(lines_to_points)
         clean.SetConvertPolysToLines(polys_to_lines)
         clean.SetConvertStripsToPolys(strips_to_polys)
-        if merge_tol:
-            clean.ToleranceIsAbsoluteOn()
-            clean.SetAbsoluteTolerance(merge_tol)
-        clean.SetInputData(self)
-        clean.Update()
+        clean.SetInputData(mesh)
+        update_algorithm(clean)
 
         if inplace:
             self.overwrite(clean.GetOutput())
         else:
             return PolyData(clean.GetOutput())
 
+    def _has_only_polys(self):
+        """Whether all the cells of the mesh are polygons"""
+        return self.GetNumberOfPolys() == self.n_cells
+
+    def _mass_properties(self):
+        """The area and volume of the triangles of this mesh computed by
+        vtkMassProperties, cached until its points or cells are modified"""
+        def build(mesh):
+            mprop = vtk.vtkMassProperties()
+            mprop.SetInputData(mesh)
+            update_algorithm(mprop)
+            return {'area': mprop.GetSurfaceArea(), 'volume': mprop.GetVolume()}
+        return _memoize(self, 'mass_properties', build, key=_geometry_key)
+
+    def _use_mass_properties(self):
+        """Whether to compute the area and volume with vtkMassProperties:
+        for triangle strips, and for triangle meshes whose face geometry is
+        not cached, since vtkMassProperties is faster than building it"""
+        if self.GetNumberOfStrips() or \
+           _is_memoized(self, 'mass_properties', _geometry_key):
+            return True
+        if _is_memoized(self, 'face_geometry', _geometry_key):
+            return False
+        faces = self.faces
+        return self._has_only_polys() and self.n_cells > 0 and \
+            faces.size == 4*self.n_cells and np.all(faces[::4] == 3)
+
     @property
     def area(self):
         """
         Mesh surface area
 
+        Triangle meshes are measured by vtkMassProperties unless the areas
+        of their polygons were already cached, e.g. by ``point_normals``,
+        until the points or faces are modified.
+
         Returns
         -------
         area : float
             Total area of the mesh.
 
         """
-        mprop = vtk.vtkMassProperties()
-        mprop.SetInputData(self)
-        return mprop.GetSurfaceArea()
+        if self._use_mass_properties():
+            return self._mass_properties()['area']
+        return _get_face_geometry(self)['areas'].sum()
 
     @property
     def volume(self):
         """
         Mesh volume
 
+        Computed from the polygons of the mesh, which must form a closed
+        surface, like ``area``.
+
         Returns
         -------
-        area : float
-            Total area of the mesh.
+        volume : float
+            Total volume of the mesh.
 
         """
-        mprop = vtk.vtkMassProperties()
-        mprop.SetInputData(self)
-        return mprop.GetVolume()
+        if self._use_mass_properties():
+            return self._mass_properties()['volume']
+        return abs(_get_face_geometry(self)['volumes'].sum())
 
     @property
     def obbTree(self):
-        if not hasattr(self, '_obbTree'):
-            self._obbTree = vtk.vtkOBBTree()
-            self._obbTree.SetDataSet(self)
-            self._obbTree.BuildLocator()
-
-        return self._obbTree
+        """The oriented bounding box tree of this mesh. The tree is rebuilt
+        after the mesh has been modified"""
+        return self._get_locator('obb')
 
     def ray_trace(self, origin, end_point, first_point=False, plot=False,
                   off_screen=False):
@@ -1238,6 +2008,45 @@ class PolyData(vtkPolyData, vtki.Common):
 
         return intersection_points, intersection_cells
 
+    def multi_ray_trace(self, origins, directions):
+        """
+        Finds the first intersection of many rays with the mesh.
+
+        Parameters
+        ----------
+        origins : np.ndarray
+            (N, 3) array of the starting points of the rays.
+
+        directions : np.ndarray
+            (N, 3) array of the directions of the rays.  A single direction
+            may be given for all of the rays.
+
+        Returns
+        -------
+        intersection_points : np.ndarray
+            (M, 3) array of the first intersection of each ray that hits
+            the mesh.
+
+        intersection_cells : np.ndarray
+            Indices of the intersected cells.
+
+        intersection_rays : np.ndarray
+            Indices of the rays that hit the mesh.
+
+        """
+        origins = np.asarray(origins, dtype=np.float64).reshape((-1, 3))
+        directions = np.asarray(directions, dtype=np.float64).reshape((-1, 3))
+        directions = np.broadcast_to(directions, origins.shape)
+        if self.n_cells == 0:
+            return np.empty((0, 3)), np.empty(0, dtype=vtki.ID_TYPE), \
+                np.empty(0, dtype=np.intp)
+        grid, cell_ids = _memoize(self, 'triangle_grid', _triangle_grid,
+                                  key=_geometry_key)
+        hits, t = trace_rays(grid, origins, directions)
+        rays = np.nonzero(hits >= 0)[0]
+        points = origins[rays] + t[rays, None] * directions[rays]
+        return points, cell_ids[hits[rays]], rays
+
     def plot_boundaries(self, **kwargs):
         """ Plots boundaries of a mesh """
         edges = self.extract_edges(non_manifold_edges=False,
@@ -1267,8 +2076,8 @@ class PolyData(vtkPolyData, vtki.Common):
 
     def remove_points(self, remove, mode='any', keep_scalars=True, inplace=False):
         """
-        Rebuild a mesh by removing points.  Only valid for
-        all-triangle meshes.
+        Rebuild a mesh by removing points.  Vertex, line, polygon, and
+        strip cells of any size are supported.
 
         Parameters
         ----------
@@ -1277,8 +2086,8 @@ class PolyData(vtkPolyData, vtki.Common):
             removed.  Otherwise, it is treated as a list of indices.
 
         mode : str, optional
-            When 'all', only faces containing all points flagged for
-            removal will be removed.  Default 'all'
+            When 'all', only cells containing all points flagged for
+            removal will be removed.  Default 'any'
 
         keep_scalars : bool, optional
             When True, point and cell scalars will be passed on to the
@@ -1291,58 +2100,49 @@ class PolyData(vtkPolyData, vtki.Common):
         -------
         mesh : vtki.PolyData
             Mesh without the points flagged for removal.  Not returned
-            when inplace=False.
+            when inplace=True.
 
         ridx : np.ndarray
             Indices of new points relative to the original mesh.  Not
-            returned when inplace=False.
-
-        """
-        if isinstance(remove, list):
-            remove = np.asarray(remove)
-
-        if remove.dtype == np.bool:
-            assert_statement = 'Mask different size than n_points'
-            assert remove.size == self.n_points, assert_statement
-            remove_mask = remove
-        else:
-            remove_mask = np.zeros(self.n_points, np.bool)
-            remove_mask[remove] = True
-
-        try:
-            f = self.faces.reshape(-1, 4)[:, 1:]
-        except:
-            raise Exception('Mesh must consist of only triangles')
-
-        vmask = remove_mask.take(f)
-        if mode == 'all':
-            fmask = ~(vmask).all(1)
-        else:
-            fmask = ~(vmask).any(1)
-
-        # Regenerate face and point arrays
-        uni = np.unique(f.compress(fmask, 0), return_inverse=True)
-        new_points = self.points.take(uni[0], 0)
-
-        nfaces = fmask.sum()
-        faces = np.empty((nfaces, 4), dtype=vtki.ID_TYPE)
-        faces[:, 0] = 3
-        faces[:, 1:] = np.reshape(uni[1], (nfaces, 3))
-
-        newmesh = PolyData(new_points, faces, deep=True)
-        ridx = uni[0]
+            returned when inplace=True.
+
+        """
+        remove_mask = _point_mask(remove, self.n_points)
+
+        # keep the cells of each cell array in VTK cell order
+        cell_arrays = [(self.GetVerts(), 'SetVerts'), (self.GetLines(), 'SetLines'),
+                       (self.GetPolys(), 'SetPolys'), (self.GetStrips(), 'SetStrips')]
+        used = np.zeros(self.n_points, dtype=bool)
+        kept, pieces = [], []
+        for vtkcells, setter in cell_arrays:
+            if vtkcells.GetNumberOfCells() == 0:
+                continue
+            cells = vtk_to_numpy(vtkcells.GetData())
+            offset = self.offset if setter == 'SetPolys' else _cell_starts(cells)
+            keep = _cells_without_points(cells, offset, remove_mask, mode)
+            ind = np.nonzero(keep)[0]
+            conn, _, is_pid = _take_cells(cells, offset, ind)
+            used[conn[is_pid]] = True
+            kept.append(keep)
+            pieces.append((setter, ind.size, conn, is_pid))
+
+        # renumber the points used by the remaining cells
+        ridx = np.nonzero(used)[0]
+        newmesh = PolyData()
+        newmesh.SetPoints(vtki.vtk_points(self.points[ridx]))
+        new_ids = np.cumsum(used) - 1
+        for setter, n_cells, conn, is_pid in pieces:
+            conn[is_pid] = new_ids[conn[is_pid]]
+            vtkcells = vtk.vtkCellArray()
+            vtkcells.SetCells(n_cells, numpy_to_vtkIdTypeArray(conn, deep=True))
+            getattr(newmesh, setter)(vtkcells)
 
         # Add scalars back to mesh if requested
         if keep_scalars:
-            for key in self.point_arrays:
-                newmesh.point_arrays[key] = self.point_arrays[key][ridx]
-
-            for key in self.cell_arrays:
-                try:
-                    newmesh.cell_arrays[key] = self.cell_arrays[key][fmask]
-                except:
-                    log.warning('Unable to pass cell key %s onto reduced mesh' %
-                                key)
+            _take_attributes(self.GetPointData(), newmesh.GetPointData(), ridx)
+            if kept:
+                fmask = np.nonzero(np.concatenate(kept))[0]
+                _take_attributes(self.GetCellData(), newmesh.GetCellData(), fmask)
 
         # Return vtk surface and reverse indexing array
         if inplace:
@@ -1366,7 +2166,7 @@ class PolyData(vtkPolyData, vtki.Common):
         alg = vtk.vtkDelaunay2D()
         alg.SetProjectionPlaneMode(vtk.VTK_BEST_FITTING_PLANE)
         alg.SetInputDataObject(self)
-        alg.Update()
+        update_algorithm(alg)
         return _get_output(alg)
 
 
@@ -1437,7 +2237,7 @@ class PointGrid(vtki.Common):
             surf_filter.PassThroughCellIdsOn()
         if pass_cellid:
             surf_filter.PassThroughPointIdsOn()
-        surf_filter.Update()
+        update_algorithm(surf_filter)
         return vtki.PolyData(surf_filter.GetOutput())
 
     def surface_indices(self):
@@ -1545,7 +2345,7 @@ class UnstructuredGrid(vtkUnstructuredGrid, PointGrid):
             elif isinstance(args[0], vtk.vtkStructuredGrid):
                 vtkappend = vtk.vtkAppendFilter()
                 vtkappend.AddInputData(args[0])
-                vtkappend.Update()
+                update_algorithm(vtkappend)
                 self.ShallowCopy(vtkappend.GetOutput())
 
             else:
@@ -1700,7 +2500,7 @@ class UnstructuredGrid(vtkUnstructuredGrid, PointGrid):
 
         # load file to self
         reader.SetFileName(filename)
-        reader.Update()
+        update_algorithm(reader)
         grid = reader.GetOutput()
         self.ShallowCopy(grid)
 
@@ -1740,7 +2540,7 @@ class UnstructuredGrid(vtkUnstructuredGrid, PointGrid):
         writer.SetInputData(self)
         if binary and legacy:
             writer.SetFileTypeToBinary()
-        writer.Write()
+        update_algorithm(writer)
 
     @property
     def cells(self):
@@ -1826,7 +2626,82 @@ class UnstructuredGrid(vtkUnstructuredGrid, PointGrid):
 
     @property
     def offset(self):
-        return vtk_to_numpy(self.GetCellLocationsArray())
+        """The index of the start of each cell in ``cells``.  Built once and
+        cached until the cells are modified.  Unlike the cell locations of
+        VTK 9, which index its connectivity array, these always index the
+        padded ``cells``."""
+        vtkcells = self.GetCells()
+        if vtkcells is None:
+            return np.zeros(0, dtype=np.intp)
+        mtime = max(vtkcells.GetMTime(), vtkcells.GetData().GetMTime())
+        cached = self.__dict__.get('_offset')
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, _cell_starts(self.cells))
+            self.__dict__['_offset'] = cached
+        return cached[1]
+
+    def get_cell_points(self, ids=None):
+        """The point ids of one or more cells, found in constant time per
+        cell through the ``offset`` of the cells.
+
+        Parameters
+        ----------
+        ids : int or sequence of int, optional
+            The indices of the cells.  All the cells by default.
+
+        Returns
+        -------
+        points : np.ndarray or list of np.ndarray
+            The point ids of the cell, or a list of the point ids of each
+            cell for a sequence of ids.
+
+        """
+        return _cell_points(self.cells, self.offset, ids)
+
+    def remove_points(self, remove, mode='any', keep_scalars=True, inplace=False):
+        """
+        Rebuild a grid by removing points and the cells that use them.
+
+        Parameters
+        ----------
+        remove : np.ndarray
+            If remove is a bool array, points that are True will be
+            removed.  Otherwise, it is treated as a list of indices.
+
+        mode : str, optional
+            When 'all', only cells containing all points flagged for
+            removal will be removed.  Default 'any'
+
+        keep_scalars : bool, optional
+            When True, point and cell scalars will be passed on to the
+            new grid.
+
+        inplace : bool, optional
+            Updates grid in-place while returning nothing.
+
+        Returns
+        -------
+        grid : vtki.UnstructuredGrid
+            Grid without the points flagged for removal.  Not returned
+            when inplace=True.
+
+        ridx : np.ndarray
+            Indices of new points relative to the original grid.  Not
+            returned when inplace=True.
+
+        """
+        if self.GetFaces() is not None:
+            raise Exception('Grids of polyhedral cells are not supported')
+        remove_mask = _point_mask(remove, self.n_points)
+        keep = _cells_without_points(self.cells, self.offset, remove_mask, mode)
+        grid, ridx = _extract_grid_cells(self, keep, return_points=True)
+        if not keep_scalars:
+            grid.GetPointData().Initialize()
+            grid.GetCellData().Initialize()
+        if inplace:
+            self.overwrite(grid)
+        else:
+            return grid, ridx
 
     def extract_cells(self, ind):
         """
@@ -1846,7 +2721,7 @@ class UnstructuredGrid(vtkUnstructuredGrid, PointGrid):
         if not isinstance(ind, np.ndarray):
             ind = np.array(ind, np.ndarray)
 
-        if ind.dtype == np.bool:
+        if ind.dtype == bool:
             ind = ind.nonzero()[0].astype(vtki.ID_TYPE)
 
         if ind.dtype != vtki.ID_TYPE:
@@ -1870,7 +2745,7 @@ class UnstructuredGrid(vtkUnstructuredGrid, PointGrid):
         extractSelection = vtk.vtkExtractSelection()
         extractSelection.SetInputData(0, self)
         extractSelection.SetInputData(1, selection)
-        extractSelection.Update()
+        update_algorithm(extractSelection)
         subgrid = UnstructuredGrid(extractSelection.GetOutput())
 
         # extracts only in float32
@@ -1932,7 +2807,7 @@ class UnstructuredGrid(vtkUnstructuredGrid, PointGrid):
 
         merge_points : bool, optional
             Points in exactly the same location will be merged between
-            the two meshes.
+            the two meshes.  See ``vtki.merge_points``.
 
         inplace : bool, optional
             Updates grid inplace when True.
@@ -1954,7 +2829,6 @@ class UnstructuredGrid(vtkUnstructuredGrid, PointGrid):
         included in the final merged mesh.
         """
         append_filter = vtk.vtkAppendFilter()
-        append_filter.SetMergePoints(merge_points)
 
         if not main_has_priority:
             append_filter.AddInputData(self)
@@ -1969,8 +2843,19 @@ class UnstructuredGrid(vtkUnstructuredGrid, PointGrid):
         if main_has_priority:
             append_filter.AddInputData(self)
 
-        append_filter.Update()
+        update_algorithm(append_filter)
         merged = UnstructuredGrid(append_filter.GetOutput())
+        if merge_points and merged.GetFaces() is None:
+            # like vtkAppendFilter, the merged points take the point data of
+            # the last of their points
+            merged = vtki.merge_points(merged, point_data='last')[0]
+        elif merge_points:
+            # the points of polyhedral cells are merged by VTK
+            append_filter = vtk.vtkAppendFilter()
+            append_filter.SetMergePoints(True)
+            append_filter.AddInputData(merged)
+            update_algorithm(append_filter)
+            merged = UnstructuredGrid(append_filter.GetOutput())
         if inplace:
             self.DeepCopy(merged)
         else:
@@ -2098,7 +2983,7 @@ class StructuredGrid(vtkStructuredGrid, PointGrid):
 
         # load file to self
         reader.SetFileName(filename)
-        reader.Update()
+        update_algorithm(reader)
         grid = reader.GetOutput()
         self.ShallowCopy(grid)
 
@@ -2140,7 +3025,7 @@ class StructuredGrid(vtkStructuredGrid, PointGrid):
         writer.SetInputData(self)
         if binary and legacy:
             writer.SetFileTypeToBinary()
-        writer.Write()
+        update_algorithm(writer)
 
     @property
     def x(self):
@@ -0,0 +1,214 @@
+"""
+Profile the VTK algorithms, readers and writers executed by vtki.
+
+While a :class:`vtki.Profiler` is running, every VTK algorithm that vtki
+updates is timed along with the size of its input and output and the vtki
+method that ran it. The records can be printed as a table or exported as a
+Chrome trace (open ``chrome://tracing`` or https://ui.perfetto.dev and load
+the file).
+
+Example
+-------
+
+>>> import vtki
+>>> from vtki import examples
+>>> dataset = examples.load_uniform()
+>>> with vtki.profile() as profiler:
+...     contours = dataset.contour()
+...     slices = dataset.slice_orthogonal()
+>>> print(profiler.table()) # doctest:+SKIP
+
+"""
+import inspect
+import json
+import os
+import threading
+import time
+
+import vtk
+
+# The running profilers
+_profilers = []
+_lock = threading.Lock()
+
+# The directory of the vtki package, used to find the calling vtki method
+_VTKI_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# The modules of helpers and decorators that are not reported as the caller
+_SKIPPED_MODULES = ('cache.py', 'profiling.py', 'progress.py')
+
+_COLUMNS = ['method', 'algorithm', 'time', 'in_points', 'in_cells', 'in_bytes',
+            'out_points', 'out_cells', 'out_bytes']
+
+
+def _data_size(data):
+    """The number of points, cells, and bytes of a data object"""
+    if data is None:
+        return 0, 0, 0
+    n_points = data.GetNumberOfPoints() if isinstance(data, vtk.vtkDataSet) else 0
+    n_cells = data.GetNumberOfCells() if isinstance(data, vtk.vtkDataSet) else 0
+    return n_points, n_cells, data.GetActualMemorySize() * 1024
+
+
+def _calling_method():
+    """The name of the outermost vtki function in the call stack, i.e. the
+    vtki method called by the user"""
+    name = None
+    frame = inspect.currentframe()
+    try:
+        while frame is not None:
+            code = frame.f_code
+            if os.path.dirname(os.path.abspath(code.co_filename)) == _VTKI_DIR:
+                if code.co_name[0] != '<' and \
+                   os.path.basename(code.co_filename) not in _SKIPPED_MODULES:
+                    owner = frame.f_locals.get('self', frame.f_locals.get('dataset'))
+                    if owner is not None and code.co_varnames[:1] in (('self',), ('dataset',)):
+                        name = '{}.{}'.format(type(owner).__name__, code.co_name)
+                    else:
+                        name = code.co_name
+            elif name is not None:
+                break
+            frame = frame.f_back
+    finally:
+        del frame
+    return name
+
+
+def run_profiled(algorithm, run):
+    """Call ``run`` to execute an algorithm and record it in the running
+    profilers"""
+    if not _profilers:
+        run()
+        return
+    method = _calling_method()
+    start = time.time()
+    try:
+        run()
+    finally:
+        stop = time.time()
+        inputs = [0, 0, 0]
+        for port in range(algorithm.GetNumberOfInputPorts()):
+            for conn in range(algorithm.GetNumberOfInputConnections(port)):
+                size = _data_size(algorithm.GetInputDataObject(port, conn))
+                inputs = [a + b for a, b in zip(inputs, size)]
+        outputs = [0, 0, 0]
+        for port in range(algorithm.GetNumberOfOutputPorts()):
+            size = _data_size(algorithm.GetOutputDataObject(port))
+            outputs = [a + b for a, b in zip(outputs, size)]
+        record = {
+            'method': method,
+            'algorithm': algorithm.GetClassName(),
+            'start': start,
+            'time': stop - start,
+            'thread': threading.current_thread().ident,
+            'in_points': inputs[0],
+            'in_cells': inputs[1],
+            'in_bytes': inputs[2],
+            'out_points': outputs[0],
+            'out_cells': outputs[1],
+            'out_bytes': outputs[2],
+        }
+        with _lock:
+            for profiler in _profilers:
+                profiler.records.append(record)
+
+
+class Profiler(object):
+    """Record the VTK algorithms run by vtki while the profiler is running.
+
+    Use as a context manager or call ``start`` and ``stop``.  Each record in
+    ``records`` is a dictionary of the calling vtki ``method``, the VTK
+    ``algorithm``, its ``start`` time and wall ``time`` in seconds, the
+    ``thread`` it ran in, and the number of points, cells and bytes of its
+    inputs (``in_points``, ``in_cells``, ``in_bytes``) and outputs
+    (``out_points``, ``out_cells``, ``out_bytes``).
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def start(self):
+        """Start recording"""
+        with _lock:
+            if self not in _profilers:
+                _profilers.append(self)
+        return self
+
+    def stop(self):
+        """Stop recording"""
+        with _lock:
+            if self in _profilers:
+                _profilers.remove(self)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def total_time(self):
+        """The total wall time of the recorded algorithms in seconds"""
+        return sum(record['time'] for record in self.records)
+
+    def table(self):
+        """Format the records as a table of text"""
+        rows = [_COLUMNS]
+        for record in self.records:
+            row = [str(record[key]) for key in _COLUMNS]
+            row[2] = '{:.6f}'.format(record['time'])
+            rows.append(row)
+        widths = [max(len(row[i]) for row in rows) for i in range(len(_COLUMNS))]
+        lines = ['  '.join(value.ljust(width) if i < 2 else value.rjust(width)
+                           for i, (value, width) in enumerate(zip(row, widths)))
+                 for row in rows]
+        return '\n'.join(lines)
+
+    def chrome_trace(self, filename=None):
+        """Export the records in the Chrome trace event format.
+
+        Parameters
+        ----------
+        filename : str, optional
+            Write the trace to this JSON file.
+
+        Returns
+        -------
+        trace : dict
+            The trace events when no filename is given.
+
+        """
+        events = []
+        for record in self.records:
+            args = dict((key, record[key]) for key in _COLUMNS[3:])
+            args['method'] = record['method']
+            events.append({
+                'name': record['method'] or record['algorithm'],
+                'cat': record['algorithm'],
+                'ph': 'X',
+                'ts': record['start'] * 1e6,
+                'dur': record['time'] * 1e6,
+                'pid': os.getpid(),
+                'tid': record['thread'],
+                'args': args,
+            })
+        trace = {'traceEvents': events, 'displayTimeUnit': 'ms'}
+        if filename is None:
+            return trace
+        with open(filename, 'w') as f:
+            json.dump(trace, f)
+
+
+def profile():
+    """Create a ``Profiler`` to record the VTK algorithms run by vtki.
+
+    Example
+    -------
+    >>> import vtki
+    >>> with vtki.profile() as profiler:
+    ...     sphere = vtki.Sphere().elevation()
+    >>> profiler.records[0]['algorithm']
+    'vtkElevationFilter'
+
+    """
+    return Profiler()
@@ -0,0 +1,159 @@
+"""
+Progress reporting and cooperative cancellation of the VTK algorithms run by
+the filters of vtki.
+
+Filters run within a :class:`vtki.ProgressMonitor` report the progress of
+their VTK algorithms to a callback or a progress bar. The monitor can be
+cancelled from another thread with :func:`ProgressMonitor.cancel` or, in the
+main thread, with Ctrl-C. The running algorithm is then asked to abort and
+the cancelled filter raises a :class:`vtki.CancelledError`, which the monitor
+suppresses at the end of its ``with`` block if it was created with
+``suppress=True``.
+
+Example
+-------
+
+>>> import vtki
+>>> sphere = vtki.Sphere(theta_resolution=100, phi_resolution=100)
+>>> with vtki.ProgressMonitor(progress_bar=False) as monitor:
+...     decimated = sphere.decimate(0.5)
+>>> monitor.cancelled
+False
+
+"""
+import signal
+import sys
+import threading
+import time
+
+import vtk
+
+from vtki.profiling import run_profiled
+
+_local = threading.local()
+
+
+class CancelledError(RuntimeError):
+    """Raised within a ``ProgressMonitor`` when a filter is cancelled"""
+    pass
+
+
+class ProgressMonitor(object):
+    """Report the progress of the filters run within this context and allow
+    them to be cancelled.
+
+    Parameters
+    ----------
+    callback : callable, optional
+        Called with the name of the running VTK algorithm and its progress
+        between 0 and 1 whenever the algorithm reports progress.
+
+    progress_bar : bool, optional
+        Print a progress bar to ``sys.stderr``.
+
+    interrupt : bool, optional
+        Cancel the running filter on Ctrl-C instead of raising a
+        ``KeyboardInterrupt``.  Only applies in the main thread.
+
+    suppress : bool, optional
+        Suppress the ``CancelledError`` of a filter cancelled by this monitor
+        at the end of the ``with`` block, skipping the rest of the block.  By
+        default the error is raised to the caller.
+
+    """
+
+    def __init__(self, callback=None, progress_bar=False, interrupt=True,
+                 suppress=False):
+        self.callback = callback
+        self.progress_bar = progress_bar
+        self.interrupt = interrupt
+        self.suppress = suppress
+        self.cancelled = False
+        self._sigint = None
+        self._last_bar = 0.0
+        # this monitor and the monitors it is nested in
+        self._nested = [self]
+
+    def cancel(self):
+        """Cancel the running filter. May be called from any thread."""
+        self.cancelled = True
+
+    def __enter__(self):
+        if not hasattr(_local, 'monitors'):
+            _local.monitors = []
+        _local.monitors.append(self)
+        self._nested = list(_local.monitors)
+        if self.interrupt and threading.current_thread().name == 'MainThread':
+            self._sigint = signal.signal(signal.SIGINT, self._on_interrupt)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _local.monitors.remove(self)
+        if self._sigint is not None:
+            signal.signal(signal.SIGINT, self._sigint)
+            self._sigint = None
+        self._nested = [self]
+        # Skip the rest of the block of a filter cancelled by this monitor
+        # if asked to, leaving the cancellations of outer monitors to them
+        return self.suppress and self.cancelled and exc_type is not None and \
+            issubclass(exc_type, CancelledError)
+
+    def _on_interrupt(self, signum, frame):
+        self.cancel()
+
+    def _is_cancelled(self):
+        """Whether this monitor or a monitor it is nested in was cancelled"""
+        return any(monitor.cancelled for monitor in self._nested)
+
+    def _on_progress(self, algorithm, event):
+        progress = algorithm.GetProgress()
+        name = algorithm.GetClassName()
+        if self.callback is not None:
+            self.callback(name, progress)
+        if self.progress_bar:
+            self._print_bar(name, progress)
+        if self._is_cancelled():
+            algorithm.SetAbortExecute(1)
+
+    def _print_bar(self, name, progress, width=40):
+        # Limit the refresh rate of the bar
+        now = time.time()
+        if progress < 1.0 and now - self._last_bar < 0.1:
+            return
+        self._last_bar = now
+        n = int(round(progress * width))
+        sys.stderr.write('\r{}: [{}{}] {:3.0f}%'.format(name, '#' * n,
+                                                        '.' * (width - n),
+                                                        100 * progress))
+        if progress >= 1.0:
+            sys.stderr.write('\n')
+        sys.stderr.flush()
+
+    def update(self, algorithm, run=None):
+        """Update an algorithm while reporting its progress. Raises a
+        ``CancelledError`` if the monitor was cancelled."""
+        if self._is_cancelled():
+            raise CancelledError('The filter was cancelled.')
+        if run is None:
+            run = algorithm.Update
+        tag = algorithm.AddObserver('ProgressEvent', self._on_progress)
+        try:
+            run()
+        finally:
+            algorithm.RemoveObserver(tag)
+        if self._is_cancelled():
+            raise CancelledError('The filter was cancelled.')
+
+
+def update_algorithm(algorithm):
+    """Update a VTK algorithm, or write the file of a VTK writer, reporting
+    its progress to the innermost ``ProgressMonitor`` of the current thread
+    if there is one and recording it in the running ``Profiler``"""
+    if isinstance(algorithm, (vtk.vtkWriter, vtk.vtkXMLWriter)):
+        run = algorithm.Write
+    else:
+        run = algorithm.Update
+    monitors = getattr(_local, 'monitors', None)
+    if monitors:
+        run = lambda monitor=monitors[-1], run=run: monitor.update(algorithm, run)
+    run_profiled(algorithm, run)
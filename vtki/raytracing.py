@@ -0,0 +1,173 @@
+"""
+First hits of rays on triangles with NumPy.
+
+The triangles are registered in the cells of a uniform grid overlapped by
+their bounds.  The rays of a chunk then walk through the cells of the grid
+together, one cell per step, and are tested against the triangles of their
+current cell with the Moller-Trumbore ray/triangle test.  A ray stops at the
+first cell whose exit lies beyond its closest hit, or when it leaves the
+grid, so that each ray is only tested against the triangles along its path.
+
+"""
+import numpy as np
+
+# The relative tolerance of the barycentric coordinates of a hit, so that
+# rays through a shared edge hit one of its triangles
+_EPSILON = 1e-9
+
+# The largest number of cells of the grid along an axis
+_MAX_CELLS = 512
+
+
+def _expand(start, count):
+    """The indices ``start[i]`` to ``start[i] + count[i]`` of each ``i``,
+    concatenated"""
+    local = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+    return np.repeat(start, count) + local
+
+
+def triangle_grid(points, triangles):
+    """Register ``(N, 3)`` triangles of point ids in a uniform grid of about
+    as many cells as triangles.
+
+    Returns a dict of the first corner and the two edges of each triangle,
+    and of the grid: its lower corner, cell size and dimensions, and the
+    triangles of each cell in compressed sparse row form.
+    """
+    corners = [points[triangles[:, i]].astype(np.float64) for i in range(3)]
+    low = np.minimum(np.minimum(corners[0], corners[1]), corners[2])
+    high = np.maximum(np.maximum(corners[0], corners[1]), corners[2])
+    if triangles.shape[0]:
+        lower, upper = low.min(axis=0), high.max(axis=0)
+    else:
+        lower, upper = np.zeros(3), np.zeros(3)
+    extent = upper - lower
+    # flat meshes get a layer of cells along their thin axes
+    extent = np.maximum(extent, 1e-3 * max(extent.max(), 1e-12))
+    size = (np.prod(extent) / max(triangles.shape[0], 1))**(1.0 / 3.0)
+    size = max(size, extent.max() / _MAX_CELLS)
+    dims = np.clip(np.ceil(extent / size).astype(np.int64), 1, _MAX_CELLS)
+    first = np.clip(np.floor((low - lower) / size).astype(np.int64), 0, dims - 1)
+    last = np.clip(np.floor((high - lower) / size).astype(np.int64), 0, dims - 1)
+    # the cells of the bounds of each triangle
+    span = last - first + 1
+    count = span.prod(axis=1)
+    tri = np.repeat(np.arange(triangles.shape[0]), count)
+    local = _expand(np.zeros(count.size, dtype=np.int64), count)
+    span, first = span[tri], first[tri]
+    k = first[:, 2] + local % span[:, 2]
+    j = first[:, 1] + (local // span[:, 2]) % span[:, 1]
+    i = first[:, 0] + local // (span[:, 2] * span[:, 1])
+    keys = (i * dims[1] + j) * dims[2] + k
+    order = np.argsort(keys, kind='mergesort')
+    indptr = np.searchsorted(keys[order], np.arange(dims.prod() + 1))
+    edge_1, edge_2 = corners[1] - corners[0], corners[2] - corners[0]
+    scale = np.abs(edge_1).sum(axis=1) * np.abs(edge_2).sum(axis=1)
+    return {'origin': corners[0], 'edge_1': edge_1, 'edge_2': edge_2,
+            'scale': scale, 'lower': lower, 'size': size, 'dims': dims,
+            'indptr': indptr, 'indices': tri[order]}
+
+
+def _cross(a, b):
+    """The cross products of two ``(N, 3)`` arrays"""
+    return np.stack((a[:, 1] * b[:, 2] - a[:, 2] * b[:, 1],
+                     a[:, 2] * b[:, 0] - a[:, 0] * b[:, 2],
+                     a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]), axis=1)
+
+
+def _dot(a, b):
+    """The dot products of two ``(N, 3)`` arrays"""
+    return a[:, 0] * b[:, 0] + a[:, 1] * b[:, 1] + a[:, 2] * b[:, 2]
+
+
+def _intersect(grid, origins, directions, tri):
+    """The parameter ``t`` along each ray of the hit of the triangle ``tri``
+    with the Moller-Trumbore test, ``inf`` for a miss"""
+    edge_1, edge_2 = grid['edge_1'][tri], grid['edge_2'][tri]
+    p = _cross(directions, edge_2)
+    det = _dot(edge_1, p)
+    scale = grid['scale'][tri] * np.abs(directions).sum(axis=1)
+    valid = np.abs(det) > _EPSILON * scale
+    inv = 1.0 / np.where(valid, det, 1.0)
+    s = origins - grid['origin'][tri]
+    u = _dot(s, p) * inv
+    q = _cross(s, edge_1)
+    v = _dot(directions, q) * inv
+    t = _dot(edge_2, q) * inv
+    hit = valid & (u >= -_EPSILON) & (v >= -_EPSILON) & (u + v <= 1 + _EPSILON) & (t >= 0)
+    return np.where(hit, t, np.inf)
+
+
+def trace_rays(grid, origins, directions, chunk_size=65536):
+    """The first triangle hit by each ray, from its origin along its
+    direction, and the parameter ``t`` of the hit.  Rays that miss get the
+    triangle -1 and ``t = inf``.  The rays are traced in chunks of
+    ``chunk_size`` rays."""
+    n_rays = origins.shape[0]
+    hits = np.full(n_rays, -1, dtype=np.int64)
+    best = np.full(n_rays, np.inf)
+    for start in range(0, n_rays, chunk_size):
+        stop = min(start + chunk_size, n_rays)
+        hits[start:stop], best[start:stop] = _trace_chunk(
+            grid, origins[start:stop], directions[start:stop])
+    return hits, best
+
+
+def _trace_chunk(grid, origins, directions):
+    """Walk a chunk of rays through the cells of the grid"""
+    lower, size, dims = grid['lower'], grid['size'], grid['dims']
+    indptr, indices = grid['indptr'], grid['indices']
+    n_rays = origins.shape[0]
+    hits = np.full(n_rays, -1, dtype=np.int64)
+    best = np.full(n_rays, np.inf)
+
+    # where each ray enters and leaves the bounds of the grid
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inv = 1.0 / directions
+        near = (lower - origins) * inv
+        far = (lower + dims * size - origins) * inv
+    inside = (origins >= lower) & (origins <= lower + dims * size)
+    parallel = directions == 0
+    near = np.where(parallel, np.where(inside, -np.inf, np.inf), near)
+    far = np.where(parallel, np.where(inside, np.inf, -np.inf), far)
+    enter = np.maximum(np.minimum(near, far).max(axis=1), 0.0)
+    leave = np.maximum(near, far).min(axis=1)
+    rays = np.nonzero(enter <= leave)[0]
+
+    # the first cell of each ray and the parameters of its steps
+    entry = origins[rays] + enter[rays, None] * directions[rays]
+    cell = np.clip(np.floor((entry - lower) / size).astype(np.int64), 0, dims - 1)
+    step = np.sign(directions[rays]).astype(np.int64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta = np.where(parallel[rays], np.inf, size * np.abs(inv[rays]))
+        boundary = lower + (cell + (step > 0)) * size
+        t_next = np.where(parallel[rays], np.inf,
+                          (boundary - origins[rays]) * inv[rays])
+    while rays.size:
+        key = (cell[:, 0] * dims[1] + cell[:, 1]) * dims[2] + cell[:, 2]
+        count = indptr[key + 1] - indptr[key]
+        # the closest hit of each ray in its cell, the first triangle of the
+        # cell on a tie as the triangles of a cell are in order
+        occupied = np.nonzero(count)[0]
+        if occupied.size:
+            count = count[occupied]
+            pair_ray = np.repeat(occupied, count)
+            tri = indices[_expand(indptr[key[occupied]], count)]
+            t = _intersect(grid, origins[rays[pair_ray]], directions[rays[pair_ray]], tri)
+            segment = np.cumsum(count) - count
+            closest = np.minimum.reduceat(t, segment)
+            pick = np.nonzero(t == np.repeat(closest, count))[0]
+            pick = pick[np.r_[True, pair_ray[pick[1:]] != pair_ray[pick[:-1]]]]
+            pair_ray, t, tri = pair_ray[pick], t[pick], tri[pick]
+            closer = t < best[rays[pair_ray]]
+            best[rays[pair_ray[closer]]] = t[closer]
+            hits[rays[pair_ray[closer]]] = tri[closer]
+        # step to the next cell along the axis crossed first
+        axis = np.argmin(t_next, axis=1)
+        exit_t = t_next[np.arange(rays.size), axis]
+        cell[np.arange(rays.size), axis] += step[np.arange(rays.size), axis]
+        t_next[np.arange(rays.size), axis] += delta[np.arange(rays.size), axis]
+        going = (best[rays] > exit_t) & np.all((cell >= 0) & (cell < dims), axis=1)
+        rays, cell, step = rays[going], cell[going], step[going]
+        delta, t_next = delta[going], t_next[going]
+    return hits, best
@@ -0,0 +1,264 @@
+"""
+A mergeable quantile sketch to compute percentiles of very large arrays in
+bounded memory.
+
+The sketch of an array is built by streaming over the array in chunks and is
+cached with the array so that repeated percentile queries (e.g. slider moves
+in the :class:`vtki.Threshold` tool) do not revisit the data. Sketches of
+several arrays (e.g. the blocks of a :class:`vtki.MultiBlock`) are merged to
+summarize all of their values.
+
+Example
+-------
+
+>>> import numpy as np
+>>> import vtki
+>>> sketch = vtki.QuantileSketch()
+>>> sketch.update(np.arange(1000000.0))
+>>> median = sketch.quantile(0.5)
+
+"""
+import collections
+
+import numpy as np
+
+import vtki
+from vtki.utilities import get_scalar, POINT_DATA_FIELD
+
+# Number of values of an array that are read at a time
+CHUNK_SIZE = 2**20
+
+# Maximum number of array sketches kept in the cache
+MAX_CACHED_SKETCHES = 64
+
+
+class QuantileSketch(object):
+    """A mergeable, bounded-memory summary of the distribution of a stream
+    of values used to estimate their quantiles.
+
+    The values are kept in levels of at most ``k`` values where a value on
+    level ``i`` stands for ``2**i`` values of the stream. When a level
+    overflows, it is sorted and every other value (starting at a random
+    offset) is promoted to the next level. The memory used grows with the
+    logarithm of the number of values and NaN values are ignored.
+
+    Parameters
+    ----------
+    k : int, optional
+        The capacity of each level. Larger values give more accurate
+        estimates.
+
+    seed : int, optional
+        The seed of the random offsets used when compacting the levels.
+
+    """
+
+    def __init__(self, k=2048, seed=0):
+        self.k = int(k)
+        self.levels = []
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        # Variance of the rank error introduced by the compactions
+        self._variance = 0.0
+        self._random = np.random.RandomState(seed)
+
+    def update(self, values):
+        """Add an array of values to the sketch"""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self.n += values.size
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        # A large chunk is sorted once and halved down to the level it fits
+        items, level = np.sort(values), 0
+        while items.size > self.k:
+            items = items[self._random.randint(2)::2]
+            self._variance += 4.0**level
+            level += 1
+        self._add(items, level)
+        return self
+
+    def merge(self, other):
+        """Merge the values summarized by another sketch into this one"""
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._variance += other._variance
+        for level, items in enumerate(other.levels):
+            self._add(items.copy(), level)
+        return self
+
+    def _add(self, items, level):
+        """Add sorted or unsorted values to a level, compacting it into the
+        next level when it overflows"""
+        while len(self.levels) <= level:
+            self.levels.append(np.empty(0))
+        items = np.concatenate([self.levels[level], items])
+        if items.size <= self.k:
+            self.levels[level] = items
+            return
+        items.sort()
+        # An odd value out stays on this level
+        even = items.size - items.size % 2
+        self.levels[level] = items[even:]
+        self._variance += 4.0**level
+        self._add(items[self._random.randint(2):even:2], level + 1)
+
+    @property
+    def rank_error(self):
+        """A high-probability bound on the error of the normalized rank
+        (between 0 and 1) of the quantile estimates"""
+        if self.n == 0:
+            return 0.0
+        return (3.0 * np.sqrt(self._variance) + 2.0**len(self.levels)) / self.n
+
+    def quantile(self, q):
+        """Estimate the quantiles ``q`` (between 0 and 1) of the values"""
+        q = np.asarray(q, dtype=float)
+        if self.n == 0:
+            return np.full(q.shape, np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(items.size, 2.0**i)
+                                  for i, items in enumerate(self.levels)])
+        order = np.argsort(items, kind='mergesort')
+        items, weights = items[order], weights[order]
+        cumulative = np.cumsum(weights)
+        # Place each value at the middle of the ranks it stands for
+        position = (cumulative - weights / 2.0) / cumulative[-1]
+        position = np.concatenate([[0.0], position, [1.0]])
+        items = np.concatenate([[self.min], items, [self.max]])
+        return np.interp(np.clip(q, 0.0, 1.0), position, items)
+
+
+def _chunks(arr, chunk_size=CHUNK_SIZE):
+    """Iterate over the values of an array in flat chunks without copying"""
+    flat = arr.ravel()
+    for start in range(0, flat.size, chunk_size):
+        yield flat[start:start + chunk_size]
+
+
+def _exact_quantiles(arrays, sketch, q, chunk_size=CHUNK_SIZE):
+    """Compute the exact quantiles ``q`` (linearly interpolated like
+    ``np.percentile``) of the values of ``arrays`` summarized by ``sketch``.
+
+    The sketch brackets each quantile so that only the values within the
+    bracket are gathered from a single chunked pass over the arrays.
+    """
+    q = np.clip(np.atleast_1d(np.asarray(q, dtype=float)), 0.0, 1.0)
+    result = np.full(q.shape, np.nan)
+    if sketch.n == 0:
+        return result
+    rank = (sketch.n - 1) * q
+    todo = list(range(q.size))
+    margin = sketch.rank_error
+    while todo:
+        bounds = [sketch.quantile([q[i] - margin, q[i] + margin]) for i in todo]
+        below = np.zeros(len(todo), dtype=np.int64)
+        windows = [[] for _ in todo]
+        for arr in arrays:
+            for chunk in _chunks(arr, chunk_size):
+                for j, (lo, hi) in enumerate(bounds):
+                    below[j] += np.count_nonzero(chunk < lo)
+                    windows[j].append(chunk[(chunk >= lo) & (chunk <= hi)])
+        missed = []
+        for j, i in enumerate(todo):
+            window = np.concatenate(windows[j]).astype(float)
+            lower = int(np.floor(rank[i])) - below[j]
+            upper = int(np.ceil(rank[i])) - below[j]
+            if lower < 0 or upper >= window.size:
+                # The sketch was off by more than the margin
+                missed.append(i)
+                continue
+            window = np.partition(window, [lower, upper])
+            fraction = rank[i] - np.floor(rank[i])
+            result[i] = window[lower] + fraction * (window[upper] - window[lower])
+        todo = missed
+        margin = max(2.0 * margin, 1.0 / sketch.n)
+    return result
+
+
+_sketch_cache = collections.OrderedDict()
+
+
+def _array_sketch(arr, vtkarr):
+    """Get the sketch of a dataset's array, using the cached sketch if the
+    VTK array has not been modified since it was summarized"""
+    key = (vtkarr.__this__, vtkarr.GetMTime())
+    try:
+        sketch = _sketch_cache.pop(key)
+    except KeyError:
+        sketch = QuantileSketch()
+        for chunk in _chunks(arr):
+            sketch.update(chunk)
+    _sketch_cache[key] = sketch
+    while len(_sketch_cache) > MAX_CACHED_SKETCHES:
+        _sketch_cache.popitem(last=False)
+    return sketch
+
+
+def sketch_arrays(dataset, name, preference='cell'):
+    """Get the sketch summarizing the values of the named array of a dataset
+    or of the blocks of a ``MultiBlock`` along with the arrays.
+
+    The sketch of each array is cached with the array and is reused as long
+    as the array is not modified. Call ``Modified()`` on the dataset's arrays
+    after editing their values in place.
+    """
+    if isinstance(dataset, vtki.MultiBlock):
+        sketch = QuantileSketch()
+        arrays = []
+        for i in range(dataset.n_blocks):
+            block = dataset[i]
+            if block is None:
+                continue
+            block_sketch, block_arrays = sketch_arrays(block, name, preference)
+            sketch.merge(block_sketch)
+            arrays += block_arrays
+        return sketch, arrays
+    arr, field = get_scalar(dataset, name, preference=preference, info=True)
+    if arr is None:
+        return QuantileSketch(), []
+    if field == POINT_DATA_FIELD:
+        vtkarr = dataset.GetPointData().GetArray(name)
+    else:
+        vtkarr = dataset.GetCellData().GetArray(name)
+    return _array_sketch(arr, vtkarr), [arr]
+
+
+def get_percentile(dataset, name, percent, preference='cell', exact=True):
+    """Compute percentiles of the named array of a dataset or of all of the
+    blocks of a ``MultiBlock``.
+
+    Parameters
+    ----------
+    dataset : vtki.Common or vtki.MultiBlock
+        The dataset holding the array
+
+    name : str
+        The name of the array
+
+    percent : float or iterable(float)
+        The percentiles to compute between 0 and 100
+
+    preference : str, optional
+        The preferred field of the array when both the point and cell data
+        have an array of that name. Must be either 'point' or 'cell'.
+
+    exact : bool, optional
+        Refine the estimates of the sketch to the exact percentiles with a
+        single pass over the values. When False, the estimates of the cached
+        sketch are returned without revisiting the values.
+
+    """
+    sketch, arrays = sketch_arrays(dataset, name, preference=preference)
+    q = np.asarray(percent, dtype=float) / 100.0
+    if exact:
+        values = _exact_quantiles(arrays, sketch, q).reshape(q.shape)
+    else:
+        values = sketch.quantile(q)
+    if values.ndim == 0:
+        return float(values)
+    return values
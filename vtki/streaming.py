@@ -0,0 +1,269 @@
+"""
+Out-of-core execution of the filters in :class:`vtki.DataSetFilters`.
+
+A dataset, or a file that is read piece by piece, is split into pieces that
+are filtered one at a time. The output of each piece is handed to a reducer
+(for example a :class:`vtki.PieceWriter` that writes it to disk) and is then
+released, so that the outputs of the pieces are never all held in memory.
+The dataset being split, or the piece of a file being read, stays in memory
+while its pieces are filtered. The number of pieces is either given or chosen
+so that each piece and its output fit in ``max_bytes``, not counting the
+dataset they are split from.
+
+Example
+-------
+
+>>> import vtki
+>>> from vtki import examples
+>>> dataset = examples.load_hexbeam()
+>>> surfaces = vtki.stream_filter(dataset, 'extract_geometry', n_pieces=4)
+>>> surfaces.n_blocks
+4
+
+"""
+import math
+import os
+
+import numpy as np
+import vtk
+
+import vtki
+from vtki.filters import _cell_centers, _extract_cells, _get_output
+from vtki.progress import update_algorithm
+from vtki.utilities import is_vtki_obj, wrap
+
+# The readers of the XML formats that can be read one piece at a time
+PIECE_READERS = {
+    '.vtu': vtk.vtkXMLUnstructuredGridReader,
+    '.pvtu': vtk.vtkXMLPUnstructuredGridReader,
+    '.vtp': vtk.vtkXMLPolyDataReader,
+    '.pvtp': vtk.vtkXMLPPolyDataReader,
+}
+
+
+def _n_pieces_for_budget(dataset, max_bytes):
+    """The number of pieces of a dataset for each piece and its output (at
+    most as large as the piece) to fit in ``max_bytes``"""
+    n_bytes = dataset.GetActualMemorySize() * 1024
+    return max(1, int(math.ceil(2.0 * n_bytes / max_bytes)))
+
+
+def _structured_pieces(dataset, n_pieces):
+    """Split a structured dataset into slabs of cells along its longest axis.
+    Neighboring slabs share a layer of points."""
+    if isinstance(dataset, vtk.vtkImageData):
+        alg = vtk.vtkExtractVOI()
+    elif isinstance(dataset, vtk.vtkRectilinearGrid):
+        alg = vtk.vtkExtractRectilinearGrid()
+    else:
+        alg = vtk.vtkExtractGrid()
+    alg.SetInputDataObject(dataset)
+    extent = list(dataset.GetExtent())
+    axis = int(np.argmax([extent[1] - extent[0], extent[3] - extent[2],
+                          extent[5] - extent[4]]))
+    lo, hi = extent[2*axis], extent[2*axis + 1]
+    edges = np.unique(np.linspace(lo, hi, n_pieces + 1).round().astype(int))
+    for start, stop in zip(edges[:-1], edges[1:]):
+        voi = list(extent)
+        voi[2*axis], voi[2*axis + 1] = start, stop
+        alg.SetVOI(voi)
+        update_algorithm(alg)
+        yield _get_output(alg)
+
+
+def split_pieces(dataset, n_pieces, partition='index'):
+    """Iterate over the pieces of a dataset.
+
+    Structured datasets are split into slabs along their longest axis. The
+    cells of other datasets are split into ``UnstructuredGrid`` pieces.
+
+    Parameters
+    ----------
+    dataset : vtki.Common
+        The dataset to split.
+
+    n_pieces : int
+        The number of pieces.
+
+    partition : str, optional
+        How the cells of unstructured data are assigned to pieces. Either
+        ``'index'`` for ranges of cell indices or ``'spatial'`` for slabs of
+        cells along the longest axis of the dataset.
+
+    """
+    if not is_vtki_obj(dataset):
+        dataset = wrap(dataset)
+    n_pieces = max(1, int(n_pieces))
+    if n_pieces == 1:
+        yield dataset
+        return
+    if isinstance(dataset, (vtk.vtkImageData, vtk.vtkRectilinearGrid,
+                            vtk.vtkStructuredGrid)):
+        for piece in _structured_pieces(dataset, n_pieces):
+            yield piece
+        return
+    n_cells = dataset.GetNumberOfCells()
+    if partition == 'index':
+        order = np.arange(n_cells)
+    elif partition == 'spatial':
+        bounds = np.array(dataset.bounds).reshape((3, 2))
+        axis = np.argmax(bounds[:, 1] - bounds[:, 0])
+        order = np.argsort(_cell_centers(dataset)[:, axis], kind='mergesort')
+    else:
+        raise RuntimeError('Partition ({}) not understood. Use "index" or "spatial".'.format(partition))
+    for ind in np.array_split(order, n_pieces):
+        mask = np.zeros(n_cells, dtype=bool)
+        mask[ind] = True
+        yield _extract_cells(dataset, mask)
+
+
+def read_pieces(filename, n_pieces=None, max_bytes=None, partition='index'):
+    """Iterate over the pieces of a dataset file.
+
+    The pieces of ``.pvtu`` and ``.pvtp`` files are read one at a time and
+    are split further when more pieces are requested than the file holds.
+    Other files are read at once and then split.
+
+    Parameters
+    ----------
+    filename : str
+        The file to read.
+
+    n_pieces : int, optional
+        The total number of pieces.
+
+    max_bytes : int, optional
+        Split each piece of the file so that a piece and its output fit in
+        this many bytes, not counting the piece of the file or the dataset
+        read at once. Ignored when ``n_pieces`` is given.
+
+    partition : str, optional
+        How the cells are assigned to pieces. See ``split_pieces``.
+
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    if ext not in PIECE_READERS:
+        dataset = vtki.read(filename)
+        if n_pieces is None:
+            n_pieces = _n_pieces_for_budget(dataset, max_bytes) if max_bytes else 1
+        for piece in split_pieces(dataset, n_pieces, partition):
+            yield piece
+        return
+    reader = PIECE_READERS[ext]()
+    reader.SetFileName(filename)
+    reader.UpdateInformation()
+    file_pieces = max(reader.GetNumberOfPieces(), 1)
+    for i in range(file_pieces):
+        reader.UpdatePiece(i, file_pieces, 0)
+        piece = wrap(reader.GetOutput()).copy(deep=False)
+        if n_pieces is not None:
+            n_sub = int(math.ceil(float(n_pieces) / file_pieces))
+        elif max_bytes:
+            n_sub = _n_pieces_for_budget(piece, max_bytes)
+        else:
+            n_sub = 1
+        for sub in split_pieces(piece, n_sub, partition):
+            yield sub
+
+
+def stream_filter(source, method, args=(), kwargs=None, n_pieces=None,
+                  max_bytes=None, partition='index', reducer=None):
+    """Run a filter piece by piece over a dataset or a dataset file.
+
+    Filters that act on each cell independently (e.g. ``contour``,
+    ``threshold``, ``clip`` or ``slice``) give the same result as running
+    them on the whole dataset, split across the pieces. Parameters that
+    default to the range of the data (e.g. the contour values) must be given
+    explicitly for the pieces to share them.
+
+    Parameters
+    ----------
+    source : vtki.Common or str
+        The dataset or the name of a dataset file to filter. The pieces of
+        ``.pvtu`` and ``.pvtp`` files are read one at a time.
+
+    method : str or callable
+        The name of a ``DataSetFilters`` method, or a function that takes a
+        piece and returns its filtered output.
+
+    args : tuple, optional
+        Positional arguments for the filter.
+
+    kwargs : dict, optional
+        Keyword arguments for the filter.
+
+    n_pieces : int, optional
+        The number of pieces.
+
+    max_bytes : int, optional
+        Use enough pieces for each piece and its output to fit in this many
+        bytes. The dataset, or the piece of the file, that the pieces are
+        split from stays in memory and is not counted. Ignored when
+        ``n_pieces`` is given.
+
+    partition : str, optional
+        How the cells of unstructured data are assigned to pieces. Either
+        ``'index'`` or ``'spatial'``.
+
+    reducer : callable, optional
+        Called with the output of each piece, e.g. a ``PieceWriter``. By
+        default the outputs are collected in a ``MultiBlock``.
+
+    Returns
+    -------
+    output : vtki.MultiBlock or None
+        The outputs of the pieces when no reducer is given.
+
+    """
+    if kwargs is None:
+        kwargs = {}
+    if isinstance(method, str):
+        name = method
+        method = lambda piece, *a, **kw: getattr(piece, name)(*a, **kw)
+    if isinstance(source, str):
+        pieces = read_pieces(source, n_pieces=n_pieces, max_bytes=max_bytes,
+                             partition=partition)
+    else:
+        if n_pieces is None:
+            n_pieces = _n_pieces_for_budget(source, max_bytes) if max_bytes else 1
+        pieces = split_pieces(source, n_pieces, partition)
+    output = None
+    if reducer is None:
+        output = vtki.MultiBlock()
+        reducer = output.append
+    # the outputs of the pieces are not kept in the filter cache
+    with vtki.filter_cache.suspended():
+        for piece in pieces:
+            reducer(method(piece, *args, **kwargs))
+    return output
+
+
+class PieceWriter(object):
+    """A reducer for ``stream_filter`` that writes the output of each piece
+    to its own file.
+
+    Parameters
+    ----------
+    filename : str
+        The pattern of the file names where ``{}`` is replaced by the index
+        of the piece, e.g. ``'contour_{}.vtp'``.
+
+    binary : bool, optional
+        Write binary files.
+
+    """
+
+    def __init__(self, filename, binary=True):
+        if '{}' not in filename:
+            base, ext = os.path.splitext(filename)
+            filename = base + '_{}' + ext
+        self.filename = filename
+        self.binary = binary
+        self.filenames = []
+
+    def __call__(self, output):
+        filename = self.filename.format(len(self.filenames))
+        if not is_vtki_obj(output):
+            output = wrap(output)
+        output.save(filename, binary=self.binary)
+        self.filenames.append(filename)
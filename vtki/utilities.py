@@ -14,6 +14,7 @@ from vtk.util.numpy_support import numpy_to_vtk
 import os
 
 import vtki
+from vtki.progress import update_algorithm
 
 
 POINT_DATA_FIELD = 0
@@ -227,7 +228,7 @@ def read(filename):
     def legacy(filename):
         reader = vtk.vtkDataSetReader()
         reader.SetFileName(filename)
-        reader.Update()
+        update_algorithm(reader)
         return reader.GetOutputDataObject(0)
     ext = os.path.splitext(filename)[1].lower()
     if ext in '.vtk':